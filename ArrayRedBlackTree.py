@@ -0,0 +1,485 @@
+from array import array
+from RedBlackTree import RED, BLACK
+
+NIL = 0
+
+class ArrayRedBlackTree:
+    """
+    A red-black tree whose nodes live in parallel arrays instead of objects.
+
+    Node ``i`` is described by ``keys[i]``, ``left[i]``, ``right[i]``,
+    ``parent[i]`` and ``color[i]``; index 0 is the shared nil sentinel.
+    Links are 32-bit ints and colors are bytes, so each element costs about
+    21 bytes of structure (plus amortized array slack) on top of its key,
+    about a quarter of what a slotted ``Node`` costs (see RedBlackTree).
+    Freed slots are chained through ``right`` and reused by later inserts.
+    """
+
+    def __init__(self, data_type):
+        self.data_type = data_type
+        self.keys = [None]
+        self.left = array('i', [NIL])
+        self.right = array('i', [NIL])
+        self.parent = array('i', [NIL])
+        self.color = bytearray([BLACK])
+        self.root = NIL
+        self._free = NIL
+
+    def _allocate(self, key):
+        index = self._free
+        if index != NIL:
+            self._free = self.right[index]
+            self.keys[index] = key
+            self.left[index] = NIL
+            self.right[index] = NIL
+            self.parent[index] = NIL
+            self.color[index] = RED
+            return index
+        self.keys.append(key)
+        self.left.append(NIL)
+        self.right.append(NIL)
+        self.parent.append(NIL)
+        self.color.append(RED)
+        return len(self.keys) - 1
+
+    def _release(self, index):
+        self.keys[index] = None
+        self.right[index] = self._free
+        self._free = index
+
+    def first(self):
+        if self.root == NIL:
+            return None
+        return self.keys[self._minimum(self.root)]
+
+    def last(self):
+        if self.root == NIL:
+            return None
+        return self.keys[self._maximum(self.root)]
+
+    def _minimum(self, index):
+        left = self.left
+        while left[index] != NIL:
+            index = left[index]
+        return index
+
+    def _maximum(self, index):
+        right = self.right
+        while right[index] != NIL:
+            index = right[index]
+        return index
+
+    def floor(self, key):
+        keys, left, right = self.keys, self.left, self.right
+        index = self.root
+        result = None
+        while index != NIL:
+            node_key = keys[index]
+            if key == node_key:
+                return node_key
+            if key < node_key:
+                index = left[index]
+            else:
+                result = node_key
+                index = right[index]
+        return result
+
+    def ceiling(self, key):
+        keys, left, right = self.keys, self.left, self.right
+        index = self.root
+        result = None
+        while index != NIL:
+            node_key = keys[index]
+            if key == node_key:
+                return node_key
+            if key > node_key:
+                index = right[index]
+            else:
+                result = node_key
+                index = left[index]
+        return result
+
+    def higher(self, key):
+        keys, left, right = self.keys, self.left, self.right
+        index = self.root
+        result = None
+        while index != NIL:
+            node_key = keys[index]
+            if key < node_key:
+                result = node_key
+                index = left[index]
+            else:
+                index = right[index]
+        return result
+
+    def lower(self, key):
+        keys, left, right = self.keys, self.left, self.right
+        index = self.root
+        result = None
+        while index != NIL:
+            node_key = keys[index]
+            if key > node_key:
+                result = node_key
+                index = right[index]
+            else:
+                index = left[index]
+        return result
+
+    def lookup(self, key):
+        keys, left, right = self.keys, self.left, self.right
+        index = self.root
+        while index != NIL:
+            node_key = keys[index]
+            if node_key == key:
+                return index
+            if key < node_key:
+                index = left[index]
+            else:
+                index = right[index]
+        return NIL
+
+    def contains(self, key):
+        return self.lookup(key) != NIL
+
+    def pollFirst(self):
+        if self.root == NIL:
+            return None
+        index = self._minimum(self.root)
+        key = self.keys[index]
+        self._delete_index(index)
+        return key
+
+    def pollLast(self):
+        if self.root == NIL:
+            return None
+        index = self._maximum(self.root)
+        key = self.keys[index]
+        self._delete_index(index)
+        return key
+
+    def insert(self, key):
+        keys, left, right = self.keys, self.left, self.right
+        parent = NIL
+        current = self.root
+        while current != NIL:
+            parent = current
+            node_key = keys[current]
+            if key < node_key:
+                current = left[current]
+            elif key > node_key:
+                current = right[current]
+            else:
+                return False
+
+        index = self._allocate(key)
+        self.parent[index] = parent
+        if parent == NIL:
+            self.root = index
+        elif key < keys[parent]:
+            left[parent] = index
+        else:
+            right[parent] = index
+        self._insert_fixup(index)
+        return True
+
+    def _insert_fixup(self, z):
+        left, right, parent, color = self.left, self.right, self.parent, self.color
+        while color[parent[z]] == RED:
+            p = parent[z]
+            g = parent[p]
+            if p == left[g]:
+                y = right[g]
+                if color[y] == RED:
+                    color[p] = BLACK
+                    color[y] = BLACK
+                    color[g] = RED
+                    z = g
+                else:
+                    if z == right[p]:
+                        z = p
+                        self._left_rotate(z)
+                        p = parent[z]
+                        g = parent[p]
+                    color[p] = BLACK
+                    color[g] = RED
+                    self._right_rotate(g)
+            else:
+                y = left[g]
+                if color[y] == RED:
+                    color[p] = BLACK
+                    color[y] = BLACK
+                    color[g] = RED
+                    z = g
+                else:
+                    if z == left[p]:
+                        z = p
+                        self._right_rotate(z)
+                        p = parent[z]
+                        g = parent[p]
+                    color[p] = BLACK
+                    color[g] = RED
+                    self._left_rotate(g)
+        color[self.root] = BLACK
+
+    def delete(self, key):
+        index = self.lookup(key)
+        if index == NIL:
+            return False
+        self._delete_index(index)
+        return True
+
+    def _delete_index(self, z):
+        left, right, parent, color = self.left, self.right, self.parent, self.color
+        y = z
+        original_color = color[y]
+        if left[z] == NIL:
+            x = right[z]
+            self._transplant(z, x)
+        elif right[z] == NIL:
+            x = left[z]
+            self._transplant(z, x)
+        else:
+            y = self._minimum(right[z])
+            original_color = color[y]
+            x = right[y]
+            if parent[y] == z:
+                parent[x] = y
+            else:
+                self._transplant(y, right[y])
+                right[y] = right[z]
+                parent[right[y]] = y
+            self._transplant(z, y)
+            left[y] = left[z]
+            parent[left[y]] = y
+            color[y] = color[z]
+
+        if original_color == BLACK:
+            self._delete_fixup(x)
+        self._release(z)
+
+    def _transplant(self, u, v):
+        parent = self.parent
+        p = parent[u]
+        if p == NIL:
+            self.root = v
+        elif u == self.left[p]:
+            self.left[p] = v
+        else:
+            self.right[p] = v
+        parent[v] = p
+
+    def _delete_fixup(self, x):
+        left, right, parent, color = self.left, self.right, self.parent, self.color
+        while x != self.root and color[x] == BLACK:
+            p = parent[x]
+            if x == left[p]:
+                w = right[p]
+                if color[w] == RED:
+                    color[w] = BLACK
+                    color[p] = RED
+                    self._left_rotate(p)
+                    w = right[p]
+                if color[left[w]] == BLACK and color[right[w]] == BLACK:
+                    color[w] = RED
+                    x = p
+                else:
+                    if color[right[w]] == BLACK:
+                        color[left[w]] = BLACK
+                        color[w] = RED
+                        self._right_rotate(w)
+                        w = right[p]
+                    color[w] = color[p]
+                    color[p] = BLACK
+                    color[right[w]] = BLACK
+                    self._left_rotate(p)
+                    x = self.root
+            else:
+                w = left[p]
+                if color[w] == RED:
+                    color[w] = BLACK
+                    color[p] = RED
+                    self._right_rotate(p)
+                    w = left[p]
+                if color[right[w]] == BLACK and color[left[w]] == BLACK:
+                    color[w] = RED
+                    x = p
+                else:
+                    if color[left[w]] == BLACK:
+                        color[right[w]] = BLACK
+                        color[w] = RED
+                        self._left_rotate(w)
+                        w = left[p]
+                    color[w] = color[p]
+                    color[p] = BLACK
+                    color[left[w]] = BLACK
+                    self._right_rotate(p)
+                    x = self.root
+        color[x] = BLACK
+
+    def _left_rotate(self, x):
+        left, right, parent = self.left, self.right, self.parent
+        y = right[x]
+        right[x] = left[y]
+        if left[y] != NIL:
+            parent[left[y]] = x
+        p = parent[x]
+        parent[y] = p
+        if p == NIL:
+            self.root = y
+        elif x == left[p]:
+            left[p] = y
+        else:
+            right[p] = y
+        left[y] = x
+        parent[x] = y
+
+    def _right_rotate(self, y):
+        left, right, parent = self.left, self.right, self.parent
+        x = left[y]
+        left[y] = right[x]
+        if right[x] != NIL:
+            parent[right[x]] = y
+        p = parent[y]
+        parent[x] = p
+        if p == NIL:
+            self.root = x
+        elif y == right[p]:
+            right[p] = x
+        else:
+            left[p] = x
+        right[x] = y
+        parent[y] = x
+
+    def __iter__(self):
+        return self.KeysIterator(self, self._start_index(None, True, False))
+
+    def __reversed__(self):
+        return self.KeysIterator(self, self._start_index(None, True, True), reverse=True)
+
+    def _start_index(self, start, inclusive, reverse):
+        if self.root == NIL:
+            return NIL
+        if start is None:
+            return self._maximum(self.root) if reverse else self._minimum(self.root)
+        keys, left, right = self.keys, self.left, self.right
+        index = self.root
+        result = NIL
+        while index != NIL:
+            node_key = keys[index]
+            if reverse:
+                if node_key < start or (inclusive and node_key == start):
+                    result = index
+                    index = right[index]
+                else:
+                    index = left[index]
+            elif node_key > start or (inclusive and node_key == start):
+                result = index
+                index = left[index]
+            else:
+                index = right[index]
+        return result
+
+    def iter_from(self, key, inclusive=True, reverse=False):
+        return self.KeysIterator(self, self._start_index(key, inclusive, reverse), reverse)
+
+    def iter_batches(self, size, reverse=False, start=None, inclusive=True):
+        keys, parent = self.keys, self.parent
+        first, second = (self.right, self.left) if reverse else (self.left, self.right)
+        index = self._start_index(start, inclusive, reverse)
+        batch = []
+        append = batch.append
+        while index != NIL:
+            append(keys[index])
+            child = second[index]
+            if child != NIL:
+                index = child
+                while first[index] != NIL:
+                    index = first[index]
+            else:
+                up = parent[index]
+                while up != NIL and index == second[up]:
+                    index = up
+                    up = parent[index]
+                index = up
+            if len(batch) == size:
+                yield batch
+                batch = []
+                append = batch.append
+        if batch:
+            yield batch
+
+    class KeysIterator:
+        def __init__(self, tree, index, reverse=False):
+            self.tree = tree
+            self.index = index
+            self.reverse = reverse
+
+        def __iter__(self):
+            return self
+
+        def __next__(self):
+            index = self.index
+            if index == NIL:
+                raise StopIteration
+            tree = self.tree
+            key = tree.keys[index]
+            if self.reverse:
+                first, second = tree.right, tree.left
+            else:
+                first, second = tree.left, tree.right
+            child = second[index]
+            if child != NIL:
+                index = child
+                while first[index] != NIL:
+                    index = first[index]
+            else:
+                parent = tree.parent
+                up = parent[index]
+                while up != NIL and index == second[up]:
+                    index = up
+                    up = parent[index]
+                index = up
+            self.index = index
+            return key
+
+    def load_sorted(self, keys):
+        """
+        Replaces the contents of the tree with keys, which must be a strictly
+        increasing sequence, in linear time. The i-th key is stored in slot
+        i + 1, so the arrays are allocated once at their final size.
+        """
+        n = len(keys)
+        self.keys = [None]
+        self.keys.extend(keys)
+        self.left = array('i', bytes(4 * (n + 1)))
+        self.right = array('i', bytes(4 * (n + 1)))
+        self.parent = array('i', bytes(4 * (n + 1)))
+        self.color = bytearray([BLACK]) * (n + 1)
+        self._free = NIL
+        left, right, parent, color = self.left, self.right, self.parent, self.color
+        red_depth = (n + 1).bit_length() - 1
+
+        def build(lo, hi, depth, up):
+            if lo >= hi:
+                return NIL
+            mid = (lo + hi) // 2
+            index = mid + 1
+            parent[index] = up
+            if depth == red_depth:
+                color[index] = RED
+            left[index] = build(lo, mid, depth + 1, index)
+            right[index] = build(mid + 1, hi, depth + 1, index)
+            return index
+
+        self.root = build(0, n, 0, NIL)
+
+    def clone(self):
+        new_tree = ArrayRedBlackTree(self.data_type)
+        new_tree.keys = self.keys.copy()
+        new_tree.left = array('i', self.left)
+        new_tree.right = array('i', self.right)
+        new_tree.parent = array('i', self.parent)
+        new_tree.color = bytearray(self.color)
+        new_tree.root = self.root
+        new_tree._free = self._free
+        return new_tree
@@ -0,0 +1,356 @@
+from bisect import bisect_left, bisect_right
+from itertools import islice
+
+class BTreeLeaf:
+    """
+    A leaf of a BTree: a sorted list of keys, linked to its neighbouring leaves.
+    """
+    __slots__ = ('keys', 'prev', 'next')
+
+    def __init__(self, keys, prev=None, next=None):
+        self.keys = keys
+        self.prev = prev
+        self.next = next
+
+class BTreeNode:
+    """
+    An internal node of a BTree. ``children[i]`` holds the keys k with ``keys[i - 1] <= k < keys[i]``
+    and ``sizes[i]`` counts them.
+    """
+    __slots__ = ('keys', 'children', 'sizes')
+
+    def __init__(self, keys, children, sizes):
+        self.keys = keys
+        self.children = children
+        self.sizes = sizes
+
+class BTree:
+    """
+    A sorted set stored as a B+tree whose nodes are plain Python lists searched with bisect.
+
+    Every key lives in a leaf holding up to node_size keys, and every internal node has up to
+    node_size children, so a lookup makes about log(n) / log(node_size) node visits, each one a
+    C-level bisect, instead of one attribute load and comparison per level of a binary tree. Nodes
+    other than the root hold at least node_size // 2 entries: an overfull node is split in half and
+    an underfull one is merged with a neighbour (and split again if the merge is too large).
+    Internal nodes keep the size of each child, which gives rank and select in O(log n), and the
+    leaves are doubly linked, so iteration and navigation past the end of a leaf never go back up.
+    """
+
+    _NODE_SIZE = 64
+
+    def __init__(self, data_type, node_size=None):
+        if node_size is None:
+            node_size = self._NODE_SIZE
+        if node_size < 4:
+            raise ValueError(f"node_size must be at least 4, {node_size} provided")
+        self.data_type = data_type
+        self.node_size = node_size
+        self.root = BTreeLeaf([])
+
+    def _leaf(self, key):
+        node = self.root
+        while type(node) is BTreeNode:
+            node = node.children[bisect_right(node.keys, key)]
+        return node
+
+    def _path(self, key):
+        """
+        Descends towards key, returning the (node, child index) pairs passed and the leaf reached.
+        """
+        path = []
+        node = self.root
+        while type(node) is BTreeNode:
+            i = bisect_right(node.keys, key)
+            path.append((node, i))
+            node = node.children[i]
+        return path, node
+
+    def _edge(self, last):
+        """
+        Descends to the first or last leaf, returning the path and the leaf like _path.
+        """
+        path = []
+        node = self.root
+        while type(node) is BTreeNode:
+            i = len(node.children) - 1 if last else 0
+            path.append((node, i))
+            node = node.children[i]
+        return path, node
+
+    def first(self):
+        node = self.root
+        while type(node) is BTreeNode:
+            node = node.children[0]
+        return node.keys[0] if node.keys else None
+
+    def last(self):
+        node = self.root
+        while type(node) is BTreeNode:
+            node = node.children[-1]
+        return node.keys[-1] if node.keys else None
+
+    def floor(self, key):
+        leaf = self._leaf(key)
+        j = bisect_right(leaf.keys, key)
+        if j:
+            return leaf.keys[j - 1]
+        return None if leaf.prev is None else leaf.prev.keys[-1]
+
+    def lower(self, key):
+        leaf = self._leaf(key)
+        j = bisect_left(leaf.keys, key)
+        if j:
+            return leaf.keys[j - 1]
+        return None if leaf.prev is None else leaf.prev.keys[-1]
+
+    def ceiling(self, key):
+        leaf = self._leaf(key)
+        j = bisect_left(leaf.keys, key)
+        if j < len(leaf.keys):
+            return leaf.keys[j]
+        return None if leaf.next is None else leaf.next.keys[0]
+
+    def higher(self, key):
+        leaf = self._leaf(key)
+        j = bisect_right(leaf.keys, key)
+        if j < len(leaf.keys):
+            return leaf.keys[j]
+        return None if leaf.next is None else leaf.next.keys[0]
+
+    def contains(self, key):
+        keys = self._leaf(key).keys
+        j = bisect_left(keys, key)
+        return j < len(keys) and keys[j] == key
+
+    def get(self, key):
+        keys = self._leaf(key).keys
+        j = bisect_left(keys, key)
+        return keys[j] if j < len(keys) and keys[j] == key else None
+
+    def rank(self, key, inclusive=False):
+        node = self.root
+        rank = 0
+        while type(node) is BTreeNode:
+            i = bisect_right(node.keys, key)
+            rank += sum(node.sizes[:i])
+            node = node.children[i]
+        return rank + (bisect_right(node.keys, key) if inclusive else bisect_left(node.keys, key))
+
+    def select(self, index):
+        node = self.root
+        if index < 0:
+            return None
+        while type(node) is BTreeNode:
+            for i, size in enumerate(node.sizes):
+                if index < size:
+                    break
+                index -= size
+            else:
+                return None
+            node = node.children[i]
+        return node.keys[index] if index < len(node.keys) else None
+
+    def insertIfAbsent(self, key):
+        path, leaf = self._path(key)
+        keys = leaf.keys
+        j = bisect_left(keys, key)
+        if j < len(keys) and keys[j] == key:
+            return keys[j]
+        keys.insert(j, key)
+        for node, i in path:
+            node.sizes[i] += 1
+        if len(keys) > self.node_size:
+            self._split(path, leaf)
+        return None
+
+    def insert(self, key):
+        return self.insertIfAbsent(key) is None
+
+    def _split(self, path, node):
+        """
+        Splits an overfull node in half and inserts the new right half into its parent, splitting
+        ancestors in turn while they overflow.
+        """
+        while True:
+            if type(node) is BTreeLeaf:
+                half = len(node.keys) // 2
+                right = BTreeLeaf(node.keys[half:], node, node.next)
+                del node.keys[half:]
+                if node.next is not None:
+                    node.next.prev = right
+                node.next = right
+                separator = right.keys[0]
+                left_size, right_size = half, len(right.keys)
+            else:
+                half = len(node.children) // 2
+                separator = node.keys[half - 1]
+                right = BTreeNode(node.keys[half:], node.children[half:], node.sizes[half:])
+                del node.keys[half - 1:], node.children[half:], node.sizes[half:]
+                left_size, right_size = sum(node.sizes), sum(right.sizes)
+            if not path:
+                self.root = BTreeNode([separator], [node, right], [left_size, right_size])
+                return
+            parent, i = path.pop()
+            parent.keys.insert(i, separator)
+            parent.children.insert(i + 1, right)
+            parent.sizes[i] = left_size
+            parent.sizes.insert(i + 1, right_size)
+            if len(parent.children) <= self.node_size:
+                return
+            node = parent
+
+    def delete(self, key):
+        path, leaf = self._path(key)
+        keys = leaf.keys
+        j = bisect_left(keys, key)
+        if j == len(keys) or keys[j] != key:
+            return False
+        self._remove(path, leaf, j)
+        return True
+
+    def _remove(self, path, leaf, j):
+        del leaf.keys[j]
+        for node, i in path:
+            node.sizes[i] -= 1
+        minimum = self.node_size // 2
+        node = leaf
+        while path and len(node.keys if type(node) is BTreeLeaf else node.children) < minimum:
+            parent, i = path.pop()
+            self._rebalance(parent, i)
+            node = parent
+        root = self.root
+        if type(root) is BTreeNode and len(root.children) == 1:
+            self.root = root.children[0]
+
+    def _rebalance(self, parent, i):
+        """
+        Merges the underfull child i of parent with a neighbour, splitting the result evenly again if
+        it would overflow.
+        """
+        if len(parent.children) == 1:
+            return
+        a = i if i + 1 < len(parent.children) else i - 1
+        left, right = parent.children[a], parent.children[a + 1]
+        if type(left) is BTreeLeaf:
+            keys = left.keys + right.keys
+            if len(keys) > self.node_size:
+                half = len(keys) // 2
+                left.keys, right.keys = keys[:half], keys[half:]
+                parent.keys[a] = right.keys[0]
+                parent.sizes[a], parent.sizes[a + 1] = half, len(keys) - half
+                return
+            left.keys = keys
+            left.next = right.next
+            if right.next is not None:
+                right.next.prev = left
+        else:
+            keys = left.keys + [parent.keys[a]] + right.keys
+            children = left.children + right.children
+            sizes = left.sizes + right.sizes
+            if len(children) > self.node_size:
+                half = len(children) // 2
+                left.keys, left.children, left.sizes = keys[:half - 1], children[:half], sizes[:half]
+                right.keys, right.children, right.sizes = keys[half:], children[half:], sizes[half:]
+                parent.keys[a] = keys[half - 1]
+                parent.sizes[a], parent.sizes[a + 1] = sum(left.sizes), sum(right.sizes)
+                return
+            left.keys, left.children, left.sizes = keys, children, sizes
+        parent.sizes[a] += parent.sizes[a + 1]
+        del parent.keys[a], parent.children[a + 1], parent.sizes[a + 1]
+
+    def pollFirst(self):
+        path, leaf = self._edge(False)
+        if not leaf.keys:
+            return None
+        key = leaf.keys[0]
+        self._remove(path, leaf, 0)
+        return key
+
+    def pollLast(self):
+        path, leaf = self._edge(True)
+        if not leaf.keys:
+            return None
+        key = leaf.keys[-1]
+        self._remove(path, leaf, len(leaf.keys) - 1)
+        return key
+
+    def __iter__(self):
+        leaf = self._edge(False)[1]
+        while leaf is not None:
+            yield from leaf.keys
+            leaf = leaf.next
+
+    def __reversed__(self):
+        leaf = self._edge(True)[1]
+        while leaf is not None:
+            yield from reversed(leaf.keys)
+            leaf = leaf.prev
+
+    def iter_from(self, key, inclusive=True, reverse=False):
+        leaf = self._leaf(key)
+        if reverse:
+            j = bisect_right(leaf.keys, key) if inclusive else bisect_left(leaf.keys, key)
+            yield from reversed(leaf.keys[:j])
+            leaf = leaf.prev
+            while leaf is not None:
+                yield from reversed(leaf.keys)
+                leaf = leaf.prev
+        else:
+            j = bisect_left(leaf.keys, key) if inclusive else bisect_right(leaf.keys, key)
+            yield from leaf.keys[j:]
+            leaf = leaf.next
+            while leaf is not None:
+                yield from leaf.keys
+                leaf = leaf.next
+
+    def iter_batches(self, size, reverse=False, start=None, inclusive=True):
+        if start is not None:
+            keys = self.iter_from(start, inclusive, reverse)
+        else:
+            keys = self.__reversed__() if reverse else self.__iter__()
+        batch = list(islice(keys, size))
+        while batch:
+            yield batch
+            batch = list(islice(keys, size))
+
+    def _node_count(self, n):
+        """
+        Returns how many nodes to spread n entries over when bulk loading: enough to fill them to three
+        quarters, or fewer if that would leave them under half full.
+        """
+        count = -(-n // max(2, self.node_size * 3 // 4))
+        if count > 1 and n // count < self.node_size // 2:
+            count = -(-n // self.node_size)
+        return count or 1
+
+    def load_sorted(self, keys):
+        """
+        Replaces the contents of the tree with keys, which must be a strictly increasing sequence, in
+        linear time. Nodes are filled to three quarters so that later inserts do not split at once.
+        """
+        keys = list(keys)
+        n = len(keys)
+        count = self._node_count(n)
+        nodes = [BTreeLeaf(keys[i * n // count:(i + 1) * n // count]) for i in range(count)]
+        for left, right in zip(nodes, nodes[1:]):
+            left.next = right
+            right.prev = left
+        mins = [leaf.keys[0] if leaf.keys else None for leaf in nodes]
+        sizes = [len(leaf.keys) for leaf in nodes]
+        while len(nodes) > 1:
+            m = len(nodes)
+            count = self._node_count(m)
+            parents, parent_mins, parent_sizes = [], [], []
+            for c in range(count):
+                lo, hi = c * m // count, (c + 1) * m // count
+                parents.append(BTreeNode(mins[lo + 1:hi], nodes[lo:hi], sizes[lo:hi]))
+                parent_mins.append(mins[lo])
+                parent_sizes.append(sum(sizes[lo:hi]))
+            nodes, mins, sizes = parents, parent_mins, parent_sizes
+        self.root = nodes[0]
+
+    def clone(self):
+        new_tree = BTree(self.data_type, self.node_size)
+        new_tree.load_sorted(list(self))
+        return new_tree
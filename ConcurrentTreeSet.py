@@ -0,0 +1,435 @@
+import threading
+from TreeSet import TreeSet
+
+class ReadWriteLock:
+    """
+    A writer-preferring readers-writer lock: any number of readers may hold it at once, a writer holds
+    it alone, and once a writer is waiting new readers queue behind it so writers cannot starve.
+
+    The lock is not reentrant; a thread must not take the read lock while it holds the write lock, nor
+    the other way round.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+        self._read_lock = self._Guard(self.acquireRead, self.releaseRead)
+        self._write_lock = self._Guard(self.acquireWrite, self.releaseWrite)
+
+    def acquireRead(self):
+        with self._cond:
+            while self._writer or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+
+    def releaseRead(self):
+        with self._cond:
+            self._readers -= 1
+            if self._readers == 0:
+                self._cond.notify_all()
+
+    def acquireWrite(self):
+        with self._cond:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+
+    def releaseWrite(self):
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+    def readLock(self):
+        """
+        Returns a context manager that holds the lock shared for the duration of a with block.
+        """
+        return self._read_lock
+
+    def writeLock(self):
+        """
+        Returns a context manager that holds the lock exclusively for the duration of a with block.
+        """
+        return self._write_lock
+
+    class _Guard:
+        def __init__(self, acquire, release):
+            self._acquire = acquire
+            self._release = release
+
+        def __enter__(self):
+            self._acquire()
+
+        def __exit__(self, *exc_info):
+            self._release()
+
+class ConcurrentTreeSet:
+    """
+    A thread-safe TreeSet that lets readers run concurrently.
+
+    By default the set is guarded by a ReadWriteLock: queries share the read lock and changes take the
+    write lock. With snapshot_reads=True the set uses the persistent backend instead: each change is
+    applied to an O(1) clone of the current version, which is then published by a single reference
+    assignment. Queries take no lock at all and always see one complete version, and a change that
+    raises leaves the published version untouched. Writers are serialized by a plain mutex in both modes.
+
+    Batch operations (addAll, removeAll, retainAll) hold the lock once for the whole batch and are atomic
+    with respect to readers.
+    """
+
+    def __init__(self, data_type, collection=None, backend=None, validation="cached", snapshot_reads=False):
+        """
+        Initializes a new ConcurrentTreeSet.
+
+        Args:
+            data_type (type): The type of elements to be stored in the set.
+            collection (iterable, optional): A collection of elements to be added to the set.
+            backend (str, optional): The TreeSet backend. Defaults to "persistent" when snapshot_reads is
+                True and to "rbtree" otherwise.
+            validation (str, optional): The TreeSet validation mode. Defaults to "cached".
+            snapshot_reads (bool, optional): Whether queries read lock-free from immutable versions.
+                Defaults to False.
+
+        Raises:
+            TypeError: If data_type is not a valid class or if an element of the collection is of the wrong type.
+            ValueError: If backend or validation is not a known name, or if snapshot_reads is requested
+                with a backend other than "persistent".
+        """
+        if backend is None:
+            backend = "persistent" if snapshot_reads else "rbtree"
+        elif snapshot_reads and backend != "persistent":
+            raise ValueError(f"snapshot_reads requires the 'persistent' backend, {backend!r} provided")
+        self._snapshot_reads = snapshot_reads
+        self._set = TreeSet(data_type, collection, backend=backend, validation=validation)
+        if snapshot_reads:
+            self._write_lock = threading.Lock()
+        else:
+            self._lock = ReadWriteLock()
+            self._read_lock = self._lock.readLock()
+            self._write_lock = self._lock.writeLock()
+
+    def _read(self, method, *args):
+        if self._snapshot_reads:
+            return method(self._set, *args)
+        with self._read_lock:
+            return method(self._set, *args)
+
+    def _write(self, method, *args):
+        with self._write_lock:
+            if self._snapshot_reads:
+                tree_set = self._set.clone()
+                result = method(tree_set, *args)
+                self._set = tree_set
+                return result
+            return method(self._set, *args)
+
+    def add(self, key):
+        """
+        Adds an element to the set.
+
+        Args:
+            key: The element to add.
+
+        Returns:
+            bool: True if the element was added, False if it was already present.
+        """
+        return self._write(TreeSet.add, key)
+
+    def addAll(self, keys):
+        """
+        Atomically adds a collection of elements to the set under a single lock acquisition.
+
+        Args:
+            keys (iterable): The collection of elements to add.
+
+        Returns:
+            bool: True if the set was modified, False otherwise.
+        """
+        if not isinstance(keys, (TreeSet, list, tuple)):
+            keys = list(keys)
+        return self._write(TreeSet.addAll, keys)
+
+    def remove(self, key):
+        """
+        Removes an element from the set.
+
+        Args:
+            key: The element to remove.
+
+        Returns:
+            bool: True if the element was removed, False if it was not present.
+        """
+        return self._write(TreeSet.remove, key)
+
+    def removeAll(self, keys):
+        """
+        Atomically removes a collection of elements from the set under a single lock acquisition.
+
+        Args:
+            keys (iterable): A TreeSet or any iterable of elements.
+
+        Returns:
+            bool: True if the set was modified, False otherwise.
+        """
+        if not isinstance(keys, (TreeSet, list, tuple)):
+            keys = list(keys)
+        return self._write(TreeSet.removeAll, keys)
+
+    def retainAll(self, keys):
+        """
+        Atomically removes the elements that are not in another collection under a single lock acquisition.
+
+        Args:
+            keys (iterable): A TreeSet or any iterable of elements.
+
+        Returns:
+            bool: True if the set was modified, False otherwise.
+        """
+        if not isinstance(keys, (TreeSet, list, tuple)):
+            keys = list(keys)
+        return self._write(TreeSet.retainAll, keys)
+
+    def clear(self):
+        """
+        Removes all elements from the set.
+        """
+        self._write(TreeSet.clear)
+
+    def pollFirst(self):
+        """
+        Atomically retrieves and removes the first (lowest) element, or returns None if the set is empty.
+
+        Returns:
+            The first element, or None if the set is empty.
+        """
+        return self._write(TreeSet.pollFirst)
+
+    def pollLast(self):
+        """
+        Atomically retrieves and removes the last (highest) element, or returns None if the set is empty.
+
+        Returns:
+            The last element, or None if the set is empty.
+        """
+        return self._write(TreeSet.pollLast)
+
+    def pollFirstN(self, count):
+        """
+        Atomically retrieves and removes the count lowest elements, or all of them if the set is smaller.
+
+        Returns:
+            list: The removed elements in ascending order.
+        """
+        return self._write(TreeSet.pollFirstN, count)
+
+    def pollLastN(self, count):
+        """
+        Atomically retrieves and removes the count highest elements, or all of them if the set is smaller.
+
+        Returns:
+            list: The removed elements in descending order.
+        """
+        return self._write(TreeSet.pollLastN, count)
+
+    def contains(self, key):
+        """
+        Checks if the set contains a specific element.
+
+        Args:
+            key: The element to check for.
+
+        Returns:
+            bool: True if the element is present, False otherwise.
+        """
+        return self._read(TreeSet.contains, key)
+
+    def get(self, key):
+        """
+        Retrieves the stored element equal to the given element.
+
+        Returns:
+            The instance held by the set, or None if no equal element is present.
+        """
+        return self._read(TreeSet.get, key)
+
+    def intern(self, key):
+        """
+        Atomically returns the canonical instance of an element, adding the element first if no equal one
+        is present.
+
+        Returns:
+            The instance held by the set: the stored element equal to key, or key itself if it was added.
+        """
+        return self._write(TreeSet.intern, key)
+
+    def size(self):
+        """
+        Returns the number of elements in the set.
+
+        Returns:
+            int: The number of elements in the set.
+        """
+        return self._read(TreeSet.size)
+
+    def isEmpty(self):
+        """
+        Checks if the set is empty.
+
+        Returns:
+            bool: True if the set is empty, False otherwise.
+        """
+        return self._read(TreeSet.isEmpty)
+
+    def first(self):
+        """
+        Retrieves the first (lowest) element in the set.
+
+        Returns:
+            The first element.
+
+        Raises:
+            NoSuchElementException: If the set is empty.
+        """
+        return self._read(TreeSet.first)
+
+    def last(self):
+        """
+        Retrieves the last (highest) element in the set.
+
+        Returns:
+            The last element.
+
+        Raises:
+            NoSuchElementException: If the set is empty.
+        """
+        return self._read(TreeSet.last)
+
+    def floor(self, key):
+        """
+        Retrieves the greatest element less than or equal to the given element.
+
+        Args:
+            key: The element to compare.
+
+        Returns:
+            The matching element, or None if there is no such element.
+        """
+        return self._read(TreeSet.floor, key)
+
+    def ceiling(self, key):
+        """
+        Retrieves the least element greater than or equal to the given element.
+
+        Args:
+            key: The element to compare.
+
+        Returns:
+            The matching element, or None if there is no such element.
+        """
+        return self._read(TreeSet.ceiling, key)
+
+    def higher(self, key):
+        """
+        Retrieves the least element strictly greater than the given element.
+
+        Args:
+            key: The element to compare.
+
+        Returns:
+            The matching element, or None if there is no such element.
+        """
+        return self._read(TreeSet.higher, key)
+
+    def lower(self, key):
+        """
+        Retrieves the greatest element strictly less than the given element.
+
+        Args:
+            key: The element to compare.
+
+        Returns:
+            The matching element, or None if there is no such element.
+        """
+        return self._read(TreeSet.lower, key)
+
+    def rank(self, key):
+        """
+        Returns the number of elements strictly less than the given element.
+
+        Args:
+            key: The element to compare.
+
+        Returns:
+            int: The number of smaller elements.
+        """
+        return self._read(TreeSet.rank, key)
+
+    def select(self, index):
+        """
+        Returns the element at the given position in ascending order.
+
+        Args:
+            index (int): The zero-based position.
+
+        Returns:
+            The element at that position.
+
+        Raises:
+            IndexError: If index is out of range.
+        """
+        return self._read(TreeSet.select, index)
+
+    def snapshot(self):
+        """
+        Returns a consistent, independent TreeSet copy of the current contents.
+
+        The copy takes O(1) with snapshot_reads and O(n) under the read lock otherwise.
+
+        Returns:
+            TreeSet: A TreeSet holding the elements present at the time of the call.
+        """
+        return self._read(TreeSet.clone)
+
+    def __iter__(self):
+        """
+        Returns an iterator over a consistent snapshot of the set in ascending order; later changes are
+        not reflected.
+
+        Returns:
+            iterator: An iterator over the elements in ascending order.
+        """
+        if self._snapshot_reads:
+            return iter(self._set)
+        return iter(self._read(list))
+
+    def iterator(self):
+        """
+        Returns an iterator over a consistent snapshot of the set in ascending order.
+
+        Returns:
+            iterator: An iterator over the elements in ascending order.
+        """
+        return self.__iter__()
+
+    def __reversed__(self):
+        """
+        Returns an iterator over a consistent snapshot of the set in descending order.
+
+        Returns:
+            iterator: An iterator over the elements in descending order.
+        """
+        if self._snapshot_reads:
+            return reversed(self._set)
+        return reversed(self._read(list))
+
+    def descendingIterator(self):
+        """
+        Returns an iterator over a consistent snapshot of the set in descending order.
+
+        Returns:
+            iterator: An iterator over the elements in descending order.
+        """
+        return self.__reversed__()
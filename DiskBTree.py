@@ -0,0 +1,507 @@
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import weakref
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from itertools import islice
+
+PAGE_HEADER = struct.Struct("<BxxxIqq")
+LEAF = 1
+INTERNAL = 2
+NONE = -1
+
+class DiskPage:
+    """
+    A page of a DiskBTree decoded into Python lists. A leaf holds sorted keys and the numbers of its
+    neighbouring leaves; an internal page holds separator keys and the numbers of its children, with
+    ``children[i]`` holding the keys k with ``keys[i - 1] <= k < keys[i]``.
+    """
+    __slots__ = ('number', 'leaf', 'keys', 'children', 'prev', 'next', 'dirty')
+
+    def __init__(self, number, leaf, keys, children=None, prev=NONE, next=NONE):
+        self.number = number
+        self.leaf = leaf
+        self.keys = keys
+        self.children = children
+        self.prev = prev
+        self.next = next
+        self.dirty = False
+
+def _release(buffer, file):
+    buffer.close()
+    file.close()
+
+class DiskBTree:
+    """
+    A sorted int or float set stored as a B+tree of fixed-size pages in a memory-mapped file, for sets
+    that do not fit in memory as node objects.
+
+    A page starts with a 24-byte header (its kind, its entry count and, for a leaf, the numbers of the
+    previous and next leaves) followed by int64 or float64 keys and, for an internal page, int64 child
+    page numbers. With 4 KiB pages a leaf holds 509 keys and an internal page 255 children, so a
+    billion keys are at most four pages deep. Pages other than the root stay at least half full, as in
+    BTree.
+
+    Pages are decoded into DiskPage objects on first use and kept in an LRU cache of cache_pages
+    pages; a changed page is written back to the mapping when it is evicted, so memory use is bounded
+    by the cache whatever the size of the set. Iteration reads leaves through their next and prev links
+    without admitting them to the cache, so a full scan does not evict the pages that point queries
+    keep hot, and load_sorted writes the leaves in key order, so a scan of a bulk-loaded set reads the
+    file sequentially. cacheStats reports the hits and misses.
+
+    The file is an unnamed temporary file in directory, removed when the tree is garbage collected; it
+    is working storage, not a persistent format (see DurableTreeSet for that). Ints are stored as
+    int64; inserting one outside that range raises OverflowError.
+    """
+
+    _CODES = {int: "q", float: "d"}
+    # Tells TreeSet that the keys live outside Python memory, so bulk loads are streamed into
+    # load_sorted rather than collected in a list first.
+    external = True
+    # Larger than the number of pages any single operation touches, so the pages an operation holds
+    # are never evicted before it marks them dirty.
+    _MIN_CACHE_PAGES = 64
+
+    def __init__(self, data_type, directory=None, cache_pages=1024, page_size=4096):
+        if data_type not in self._CODES:
+            raise TypeError(f"the 'disk' TreeSet backend stores int or float, {data_type.__name__} provided")
+        if page_size < 512 or page_size % 8:
+            raise ValueError(f"page_size must be a multiple of 8 of at least 512, {page_size} provided")
+        if cache_pages < self._MIN_CACHE_PAGES:
+            raise ValueError(f"cache_pages must be at least {self._MIN_CACHE_PAGES}, {cache_pages} provided")
+        self.data_type = data_type
+        self.directory = directory
+        self.cache_pages = cache_pages
+        self.page_size = page_size
+        self._code = self._CODES[data_type]
+        self._leaf_size = (page_size - PAGE_HEADER.size) // 8
+        self._node_size = (page_size - PAGE_HEADER.size + 8) // 16
+        self._file = tempfile.TemporaryFile(dir=directory)
+        os.ftruncate(self._file.fileno(), page_size * self._MIN_CACHE_PAGES)
+        self._map = mmap.mmap(self._file.fileno(), page_size * self._MIN_CACHE_PAGES)
+        weakref.finalize(self, _release, self._map, self._file)
+        self._cache = OrderedDict()
+        self._hits = self._misses = self._evictions = self._writes = 0
+        self._reset()
+
+    def _reset(self):
+        self._cache.clear()
+        self._pages = 0
+        self._free = []
+        self._root = self._new_page(True).number
+
+    def _allocate(self):
+        if self._free:
+            return self._free.pop()
+        number = self._pages
+        self._pages += 1
+        end = self._pages * self.page_size
+        if end > len(self._map):
+            self._map.resize(max(end, 2 * len(self._map)))
+        return number
+
+    def _new_page(self, leaf):
+        page = DiskPage(self._allocate(), leaf, [], None if leaf else [])
+        page.dirty = True
+        self._admit(page)
+        return page
+
+    def _free_page(self, page):
+        del self._cache[page.number]
+        self._free.append(page.number)
+
+    def _admit(self, page):
+        cache = self._cache
+        cache[page.number] = page
+        if len(cache) > self.cache_pages:
+            _, evicted = cache.popitem(last=False)
+            self._evictions += 1
+            if evicted.dirty:
+                self._write(evicted)
+
+    def _page(self, number):
+        """
+        Returns a page through the cache, reading it from the mapping on a miss.
+        """
+        page = self._cache.get(number)
+        if page is not None:
+            self._hits += 1
+            self._cache.move_to_end(number)
+            return page
+        self._misses += 1
+        page = self._read(number)
+        self._admit(page)
+        return page
+
+    def _scan(self, number):
+        """
+        Returns a page for a sequential scan: from the cache if it is there, otherwise read without
+        admitting it.
+        """
+        page = self._cache.get(number)
+        if page is not None:
+            self._hits += 1
+            return page
+        self._misses += 1
+        return self._read(number)
+
+    def _decode(self, code, start, count):
+        values = array(code)
+        values.frombytes(self._map[start:start + 8 * count])
+        if sys.byteorder != "little":
+            values.byteswap()
+        return values.tolist()
+
+    def _read(self, number):
+        offset = number * self.page_size
+        kind, count, prev, next = PAGE_HEADER.unpack_from(self._map, offset)
+        start = offset + PAGE_HEADER.size
+        if kind == LEAF:
+            return DiskPage(number, True, self._decode(self._code, start, count), None, prev, next)
+        keys = self._decode(self._code, start, count - 1)
+        return DiskPage(number, False, keys, self._decode("q", start + 8 * (count - 1), count))
+
+    def _write(self, page):
+        keys = array(self._code, page.keys)
+        if page.leaf:
+            header = PAGE_HEADER.pack(LEAF, len(keys), page.prev, page.next)
+            body = [keys]
+        else:
+            header = PAGE_HEADER.pack(INTERNAL, len(page.children), NONE, NONE)
+            body = [keys, array("q", page.children)]
+        if sys.byteorder != "little":
+            for values in body:
+                values.byteswap()
+        data = header + b"".join(values.tobytes() for values in body)
+        offset = page.number * self.page_size
+        self._map[offset:offset + len(data)] = data
+        page.dirty = False
+        self._writes += 1
+
+    def cacheStats(self):
+        """
+        Reports the page cache counters since the tree was created.
+
+        Returns:
+            dict: "hits", "misses" (pages read from the mapping), "hit_rate", "evictions", "writes" (pages
+                written back), "cached_pages", "cache_pages" (the capacity) and "file_pages".
+        """
+        lookups = self._hits + self._misses
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / lookups if lookups else 0.0,
+            "evictions": self._evictions,
+            "writes": self._writes,
+            "cached_pages": len(self._cache),
+            "cache_pages": self.cache_pages,
+            "file_pages": self._pages,
+        }
+
+    def _leaf(self, key):
+        # _page inlined for the cache hits that make up most of a descent.
+        cache = self._cache
+        number = self._root
+        while True:
+            page = cache.get(number)
+            if page is None:
+                page = self._page(number)
+            else:
+                self._hits += 1
+                cache.move_to_end(number)
+            if page.leaf:
+                return page
+            number = page.children[bisect_right(page.keys, key)]
+
+    def _path(self, key):
+        """
+        Descends towards key, returning the (page, child index) pairs passed and the leaf reached.
+        """
+        cache = self._cache
+        path = []
+        number = self._root
+        while True:
+            page = cache.get(number)
+            if page is None:
+                page = self._page(number)
+            else:
+                self._hits += 1
+                cache.move_to_end(number)
+            if page.leaf:
+                return path, page
+            i = bisect_right(page.keys, key)
+            path.append((page, i))
+            number = page.children[i]
+
+    def _edge(self, last):
+        path = []
+        page = self._page(self._root)
+        while not page.leaf:
+            i = len(page.children) - 1 if last else 0
+            path.append((page, i))
+            page = self._page(page.children[i])
+        return path, page
+
+    def first(self):
+        keys = self._edge(False)[1].keys
+        return keys[0] if keys else None
+
+    def last(self):
+        keys = self._edge(True)[1].keys
+        return keys[-1] if keys else None
+
+    def floor(self, key):
+        leaf = self._leaf(key)
+        j = bisect_right(leaf.keys, key)
+        if j:
+            return leaf.keys[j - 1]
+        return None if leaf.prev == NONE else self._page(leaf.prev).keys[-1]
+
+    def lower(self, key):
+        leaf = self._leaf(key)
+        j = bisect_left(leaf.keys, key)
+        if j:
+            return leaf.keys[j - 1]
+        return None if leaf.prev == NONE else self._page(leaf.prev).keys[-1]
+
+    def ceiling(self, key):
+        leaf = self._leaf(key)
+        j = bisect_left(leaf.keys, key)
+        if j < len(leaf.keys):
+            return leaf.keys[j]
+        return None if leaf.next == NONE else self._page(leaf.next).keys[0]
+
+    def higher(self, key):
+        leaf = self._leaf(key)
+        j = bisect_right(leaf.keys, key)
+        if j < len(leaf.keys):
+            return leaf.keys[j]
+        return None if leaf.next == NONE else self._page(leaf.next).keys[0]
+
+    def contains(self, key):
+        keys = self._leaf(key).keys
+        j = bisect_left(keys, key)
+        return j < len(keys) and keys[j] == key
+
+    def insert(self, key):
+        if self._code == "q" and not -2**63 <= key < 2**63:
+            raise OverflowError(f"{key} does not fit in int64")
+        path, leaf = self._path(key)
+        keys = leaf.keys
+        j = bisect_left(keys, key)
+        if j < len(keys) and keys[j] == key:
+            return False
+        keys.insert(j, key)
+        leaf.dirty = True
+        if len(keys) > self._leaf_size:
+            self._split(path, leaf)
+        return True
+
+    def _split(self, path, page):
+        """
+        Splits an overfull page in half and inserts the new right half into its parent, splitting
+        ancestors in turn while they overflow.
+        """
+        while True:
+            right = self._new_page(page.leaf)
+            if page.leaf:
+                half = len(page.keys) // 2
+                right.keys = page.keys[half:]
+                del page.keys[half:]
+                right.prev, right.next = page.number, page.next
+                if page.next != NONE:
+                    following = self._page(page.next)
+                    following.prev = right.number
+                    following.dirty = True
+                page.next = right.number
+                separator = right.keys[0]
+            else:
+                half = len(page.children) // 2
+                separator = page.keys[half - 1]
+                right.keys, right.children = page.keys[half:], page.children[half:]
+                del page.keys[half - 1:], page.children[half:]
+            page.dirty = True
+            if not path:
+                root = self._new_page(False)
+                root.keys, root.children = [separator], [page.number, right.number]
+                self._root = root.number
+                return
+            parent, i = path.pop()
+            parent.keys.insert(i, separator)
+            parent.children.insert(i + 1, right.number)
+            parent.dirty = True
+            if len(parent.children) <= self._node_size:
+                return
+            page = parent
+
+    def delete(self, key):
+        path, leaf = self._path(key)
+        keys = leaf.keys
+        j = bisect_left(keys, key)
+        if j == len(keys) or keys[j] != key:
+            return False
+        self._remove(path, leaf, j)
+        return True
+
+    def _remove(self, path, leaf, j):
+        del leaf.keys[j]
+        leaf.dirty = True
+        page = leaf
+        while path and (len(page.keys) < self._leaf_size // 2 if page.leaf
+                        else len(page.children) < self._node_size // 2):
+            parent, i = path.pop()
+            self._rebalance(parent, i)
+            page = parent
+        root = self._page(self._root)
+        if not root.leaf and len(root.children) == 1:
+            self._root = root.children[0]
+            self._free_page(root)
+
+    def _rebalance(self, parent, i):
+        """
+        Merges the underfull child i of parent with a neighbour, splitting the result evenly again if
+        it would overflow.
+        """
+        if len(parent.children) == 1:
+            return
+        a = i if i + 1 < len(parent.children) else i - 1
+        left, right = self._page(parent.children[a]), self._page(parent.children[a + 1])
+        left.dirty = right.dirty = parent.dirty = True
+        if left.leaf:
+            keys = left.keys + right.keys
+            if len(keys) > self._leaf_size:
+                half = len(keys) // 2
+                left.keys, right.keys = keys[:half], keys[half:]
+                parent.keys[a] = right.keys[0]
+                return
+            left.keys = keys
+            left.next = right.next
+            if right.next != NONE:
+                following = self._page(right.next)
+                following.prev = left.number
+                following.dirty = True
+        else:
+            keys = left.keys + [parent.keys[a]] + right.keys
+            children = left.children + right.children
+            if len(children) > self._node_size:
+                half = len(children) // 2
+                left.keys, left.children = keys[:half - 1], children[:half]
+                right.keys, right.children = keys[half:], children[half:]
+                parent.keys[a] = keys[half - 1]
+                return
+            left.keys, left.children = keys, children
+        del parent.keys[a], parent.children[a + 1]
+        self._free_page(right)
+
+    def pollFirst(self):
+        path, leaf = self._edge(False)
+        if not leaf.keys:
+            return None
+        key = leaf.keys[0]
+        self._remove(path, leaf, 0)
+        return key
+
+    def pollLast(self):
+        path, leaf = self._edge(True)
+        if not leaf.keys:
+            return None
+        key = leaf.keys[-1]
+        self._remove(path, leaf, len(leaf.keys) - 1)
+        return key
+
+    def _forward(self, leaf, start):
+        yield from leaf.keys[start:]
+        while leaf.next != NONE:
+            leaf = self._scan(leaf.next)
+            yield from leaf.keys
+
+    def _backward(self, leaf, stop):
+        yield from reversed(leaf.keys[:stop])
+        while leaf.prev != NONE:
+            leaf = self._scan(leaf.prev)
+            yield from reversed(leaf.keys)
+
+    def __iter__(self):
+        return self._forward(self._edge(False)[1], 0)
+
+    def __reversed__(self):
+        leaf = self._edge(True)[1]
+        return self._backward(leaf, len(leaf.keys))
+
+    def iter_from(self, key, inclusive=True, reverse=False):
+        leaf = self._leaf(key)
+        if reverse:
+            return self._backward(leaf, bisect_right(leaf.keys, key) if inclusive else bisect_left(leaf.keys, key))
+        return self._forward(leaf, bisect_left(leaf.keys, key) if inclusive else bisect_right(leaf.keys, key))
+
+    def iter_batches(self, size, reverse=False, start=None, inclusive=True):
+        if start is not None:
+            keys = self.iter_from(start, inclusive, reverse)
+        else:
+            keys = self.__reversed__() if reverse else self.__iter__()
+        batch = list(islice(keys, size))
+        while batch:
+            yield batch
+            batch = list(islice(keys, size))
+
+    @staticmethod
+    def _runs(items, fill, limit):
+        """
+        Cuts items into lists of fill items, evening out the last two so that neither is under half of
+        limit, and yields each list with a flag marking the last one.
+        """
+        items = iter(items)
+        current = list(islice(items, fill))
+        following = list(islice(items, fill))
+        while following:
+            upcoming = list(islice(items, fill))
+            if not upcoming and len(following) < limit // 2:
+                merged = current + following
+                if len(merged) <= limit:
+                    yield merged, True
+                else:
+                    half = len(merged) // 2
+                    yield merged[:half], False
+                    yield merged[half:], True
+                return
+            yield current, False
+            current, following = following, upcoming
+        yield current, True
+
+    def load_sorted(self, keys):
+        """
+        Replaces the contents of the tree with keys, a strictly increasing iterable that is consumed
+        once, in linear time and without holding more than a page of keys in memory at a time. Pages are
+        written straight to the mapping, filled to three quarters, leaves first and in key order.
+        """
+        self._reset()
+        root = self._root
+        mins, numbers = [], []
+        number = NONE
+        for run, last in self._runs(keys, self._leaf_size * 3 // 4, self._leaf_size):
+            page = DiskPage(root if number == NONE else self._allocate(), True, run, None, number)
+            if not last:
+                page.next = page.number + 1
+            self._write(page)
+            mins.append(run[0] if run else None)
+            numbers.append(page.number)
+            number = page.number
+        while len(numbers) > 1:
+            entries = zip(mins, numbers)
+            mins, numbers = [], []
+            for run, _ in self._runs(entries, self._node_size * 3 // 4, self._node_size):
+                page = DiskPage(self._allocate(), False, [key for key, _ in run[1:]], [child for _, child in run])
+                self._write(page)
+                mins.append(run[0][0])
+                numbers.append(page.number)
+        self._cache.clear()
+        self._root = numbers[0]
+
+    def clone(self):
+        new_tree = DiskBTree(self.data_type, self.directory, self.cache_pages, self.page_size)
+        new_tree.load_sorted(iter(self))
+        return new_tree
@@ -0,0 +1,508 @@
+import os
+import pickle
+import struct
+import time
+import zlib
+from TreeSet import TreeSet
+import TreeSetSnapshot
+from Exceptions import StreamCorruptedException
+
+LOG_MAGIC = b"TWAL"
+LOG_VERSION = 1
+LOG_HEADER = struct.Struct("<4sH2x")
+RECORD = struct.Struct("<cII")
+
+ADD = b"+"
+REMOVE = b"-"
+ADD_ALL = b"A"
+REMOVE_ALL = b"R"
+CLEAR = b"C"
+
+class DurableTreeSet:
+    """
+    A TreeSet whose changes survive a process crash, kept in a directory as a snapshot plus a write-ahead log.
+
+    Every change is applied to an in-memory TreeSet and then appended to the log as a record: an operation
+    code, the payload length, a CRC-32 and the pickled element (or list of elements, for batch operations).
+    Records are buffered and written as a group once group_commit of them are pending, or once the oldest
+    has waited commit_interval seconds, and with fsync=True each group is forced to disk with one fsync. A
+    group commit of 1 makes every change durable before the call returns; a larger one trades the last few
+    changes before a crash for far fewer fsyncs. sync() commits the pending records at any time.
+
+    Once the log holds at least compact_every changed elements, and at least as many as the last snapshot,
+    it is compacted: the whole set is written as a sorted TreeSetSnapshot file, which replaces the previous
+    one atomically, and the log is emptied. Each compaction writes at most twice as many elements as were
+    logged since the previous one, so it costs O(1) amortized per change, and a restart replays at most
+    that many changes on top of the bulk-loaded snapshot.
+
+    On opening, the snapshot is bulk-loaded in linear time and the log replayed on top of it. Replay stops
+    at the first incomplete or corrupt record, which a crash in the middle of a write leaves at the end of
+    the log, and the log is truncated there. Every record sets the state of its elements rather than
+    changing it relatively, so replaying a log that was already compacted into the snapshot (after a crash
+    between the two steps of a compaction) gives the same set.
+
+    Only one DurableTreeSet may have a directory open at a time, and the set cannot have a key, comparator
+    or reverse order, since snapshot files cannot store them.
+    """
+
+    SNAPSHOT = "snapshot.tset"
+    LOG = "wal.log"
+
+    def __init__(self, directory, data_type, backend="rbtree", validation="cached", group_commit=1,
+                 commit_interval=None, fsync=True, compact_every=100_000):
+        """
+        Opens a DurableTreeSet, creating the directory if needed and recovering its contents.
+
+        Args:
+            directory (str): Where the snapshot and the log are kept.
+            data_type (type): The type of elements to be stored in the set.
+            backend (str, optional): The TreeSet backend. Defaults to "rbtree".
+            validation (str, optional): The TreeSet validation mode. Defaults to "cached".
+            group_commit (int, optional): How many records are buffered before they are written to the log.
+                Defaults to 1.
+            commit_interval (float, optional): Also commits the buffered records once the oldest is this many
+                seconds old, checked whenever a record is added. Defaults to None (no time limit).
+            fsync (bool, optional): Whether each commit and compaction is forced to disk; without it the data
+                survives a process crash but not necessarily an operating system crash. Defaults to True.
+            compact_every (int, optional): The minimum number of changed elements logged before the log is
+                compacted, or None to compact only when compact() is called. Defaults to 100000.
+
+        Raises:
+            TypeError: If data_type is not a valid class or differs from the data type of the stored set.
+            ValueError: If backend or validation is not a known name, or group_commit or compact_every is
+                not positive.
+            StreamCorruptedException: If the snapshot or the log is not a valid file.
+        """
+        if group_commit < 1:
+            raise ValueError(f"group_commit must be positive, {group_commit} provided")
+        if compact_every is not None and compact_every < 1:
+            raise ValueError(f"compact_every must be positive, {compact_every} provided")
+        os.makedirs(directory, exist_ok=True)
+        self._snapshot_path = os.path.join(directory, self.SNAPSHOT)
+        self._log_path = os.path.join(directory, self.LOG)
+        self._group_commit = group_commit
+        self._commit_interval = commit_interval
+        self._fsync = fsync
+        self._compact_every = compact_every
+        self._pending = bytearray()
+        self._pending_records = 0
+        self._pending_since = None
+        start = time.perf_counter()
+        self._set = self._load_snapshot(data_type, backend, validation)
+        self._snapshot_size = self._set.size()
+        records, self._logged = self._replay()
+        self._recovery = {
+            "snapshot_elements": self._snapshot_size,
+            "replayed_records": records,
+            "seconds": time.perf_counter() - start,
+        }
+        self._file = open(self._log_path, "ab")
+
+    def _load_snapshot(self, data_type, backend, validation):
+        if not os.path.exists(self._snapshot_path):
+            return TreeSet(data_type, backend=backend, validation=validation)
+        tree_set = TreeSet.load(self._snapshot_path, backend=backend, validation=validation)
+        if tree_set._type is not data_type:
+            raise TypeError(f"The stored set holds {tree_set._type.__name__}, {data_type.__name__} provided")
+        return tree_set
+
+    def _replay(self):
+        """
+        Applies the records of the log to the set, truncating an incomplete or corrupt tail.
+
+        Returns:
+            tuple: The number of records applied and the number of changed elements they carried.
+        """
+        try:
+            with open(self._log_path, "rb") as file:
+                data = file.read()
+        except FileNotFoundError:
+            data = b""
+        if len(data) < LOG_HEADER.size:
+            self._reset_log()
+            return 0, 0
+        magic, version = LOG_HEADER.unpack_from(data)
+        if magic != LOG_MAGIC:
+            raise StreamCorruptedException("not a TreeSet log")
+        if version != LOG_VERSION:
+            raise StreamCorruptedException(f"unsupported TreeSet log version {version}")
+        tree_set = self._set
+        applied = changes = 0
+        offset = LOG_HEADER.size
+        while offset + RECORD.size <= len(data):
+            operation, size, checksum = RECORD.unpack_from(data, offset)
+            start = offset + RECORD.size
+            payload = data[start:start + size]
+            if len(payload) != size or zlib.crc32(payload, zlib.crc32(operation)) != checksum:
+                break
+            if operation == CLEAR:
+                tree_set.clear()
+                changes += 1
+            else:
+                keys = pickle.loads(payload)
+                if operation == ADD:
+                    tree_set.add(keys)
+                elif operation == REMOVE:
+                    tree_set.remove(keys)
+                elif operation == ADD_ALL:
+                    tree_set.addAll(keys)
+                elif operation == REMOVE_ALL:
+                    tree_set.removeAll(keys)
+                else:
+                    raise StreamCorruptedException(f"unknown TreeSet log operation {operation!r}")
+                changes += len(keys) if operation in (ADD_ALL, REMOVE_ALL) else 1
+            applied += 1
+            offset = start + size
+        if offset < len(data):
+            with open(self._log_path, "r+b") as file:
+                file.truncate(offset)
+                if self._fsync:
+                    os.fsync(file.fileno())
+        return applied, changes
+
+    def _reset_log(self):
+        """
+        Replaces the log with an empty one.
+        """
+        with open(self._log_path, "wb") as file:
+            file.write(LOG_HEADER.pack(LOG_MAGIC, LOG_VERSION))
+            if self._fsync:
+                file.flush()
+                os.fsync(file.fileno())
+        if self._fsync:
+            TreeSetSnapshot.fsync_directory(self._log_path)
+
+    def _log(self, operation, payload=None, changes=1):
+        data = b"" if payload is None else pickle.dumps(payload, pickle.HIGHEST_PROTOCOL)
+        self._pending += RECORD.pack(operation, len(data), zlib.crc32(data, zlib.crc32(operation)))
+        self._pending += data
+        self._pending_records += 1
+        self._logged += changes
+        if self._pending_since is None:
+            self._pending_since = time.monotonic()
+        if self._compact_every is not None and self._logged >= max(self._compact_every, self._snapshot_size):
+            self.compact()
+        elif self._pending_records >= self._group_commit or (
+                self._commit_interval is not None and time.monotonic() - self._pending_since >= self._commit_interval):
+            self.sync()
+
+    def sync(self):
+        """
+        Writes the buffered records to the log, forcing them to disk when the set was opened with fsync=True.
+        """
+        if not self._pending:
+            return
+        self._file.write(self._pending)
+        self._file.flush()
+        if self._fsync:
+            os.fsync(self._file.fileno())
+        self._pending.clear()
+        self._pending_records = 0
+        self._pending_since = None
+
+    def compact(self):
+        """
+        Writes the whole set as a snapshot, in O(n), and empties the log, including the buffered records.
+        """
+        TreeSetSnapshot.write(self._snapshot_path, self._set._type, list(self._set), fsync=self._fsync)
+        self._file.close()
+        self._reset_log()
+        self._file = open(self._log_path, "ab")
+        self._pending.clear()
+        self._pending_records = 0
+        self._pending_since = None
+        self._logged = 0
+        self._snapshot_size = self._set.size()
+
+    def close(self):
+        """
+        Commits the buffered records and closes the log. The set must not be used afterwards.
+        """
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def recoveryStats(self):
+        """
+        Reports how the set was recovered when it was opened.
+
+        Returns:
+            dict: "snapshot_elements" (the elements bulk-loaded from the snapshot), "replayed_records" (the
+                log records applied on top of it) and "seconds" (the time both took).
+        """
+        return dict(self._recovery)
+
+    def loggedChanges(self):
+        """
+        Returns the number of changed elements logged since the last compaction, including the buffered ones.
+
+        Returns:
+            int: The number of changes, counting each element of a batch operation.
+        """
+        return self._logged
+
+    def add(self, key):
+        """
+        Adds an element to the set.
+
+        Args:
+            key: The element to add.
+
+        Returns:
+            bool: True if the element was added, False if it was already present.
+        """
+        added = self._set.add(key)
+        if added:
+            self._log(ADD, key)
+        return added
+
+    def addAll(self, keys):
+        """
+        Adds a collection of elements to the set, logged as a single record.
+
+        Args:
+            keys (iterable): The collection of elements to add.
+
+        Returns:
+            bool: True if the set was modified, False otherwise.
+        """
+        keys = list(keys)
+        changed = self._set.addAll(keys)
+        if changed:
+            self._log(ADD_ALL, keys, len(keys))
+        return changed
+
+    def remove(self, key):
+        """
+        Removes an element from the set.
+
+        Args:
+            key: The element to remove.
+
+        Returns:
+            bool: True if the element was removed, False if it was not present.
+        """
+        removed = self._set.remove(key)
+        if removed:
+            self._log(REMOVE, key)
+        return removed
+
+    def removeAll(self, keys):
+        """
+        Removes a collection of elements from the set, logged as a single record.
+
+        Args:
+            keys (iterable): The collection of elements to remove.
+
+        Returns:
+            bool: True if the set was modified, False otherwise.
+        """
+        keys = list(keys)
+        changed = self._set.removeAll(keys)
+        if changed:
+            self._log(REMOVE_ALL, keys, len(keys))
+        return changed
+
+    def clear(self):
+        """
+        Removes all elements from the set.
+        """
+        if not self._set.isEmpty():
+            self._set.clear()
+            self._log(CLEAR)
+
+    def intern(self, key):
+        """
+        Returns the canonical instance of an element, adding the element first if no equal one is present.
+
+        Returns:
+            The instance held by the set: the stored element equal to key, or key itself if it was added.
+        """
+        size = self._set.size()
+        stored = self._set.intern(key)
+        if self._set.size() != size:
+            self._log(ADD, key)
+        return stored
+
+    def pollFirst(self):
+        """
+        Retrieves and removes the first (lowest) element, or returns None if the set is empty.
+
+        Returns:
+            The first element, or None if the set is empty.
+        """
+        key = self._set.pollFirst()
+        if key is not None:
+            self._log(REMOVE, key)
+        return key
+
+    def pollLast(self):
+        """
+        Retrieves and removes the last (highest) element, or returns None if the set is empty.
+
+        Returns:
+            The last element, or None if the set is empty.
+        """
+        key = self._set.pollLast()
+        if key is not None:
+            self._log(REMOVE, key)
+        return key
+
+    def pollFirstN(self, count):
+        """
+        Retrieves and removes the count lowest elements, or all of them if the set is smaller.
+
+        Returns:
+            list: The removed elements in ascending order.
+        """
+        keys = self._set.pollFirstN(count)
+        if keys:
+            self._log(REMOVE_ALL, keys, len(keys))
+        return keys
+
+    def pollLastN(self, count):
+        """
+        Retrieves and removes the count highest elements, or all of them if the set is smaller.
+
+        Returns:
+            list: The removed elements in descending order.
+        """
+        keys = self._set.pollLastN(count)
+        if keys:
+            self._log(REMOVE_ALL, keys, len(keys))
+        return keys
+
+    def contains(self, key):
+        """
+        Checks if the set contains a specific element.
+
+        Args:
+            key: The element to check for.
+
+        Returns:
+            bool: True if the element is present, False otherwise.
+        """
+        return self._set.contains(key)
+
+    def get(self, key):
+        """
+        Retrieves the stored element equal to the given element.
+
+        Returns:
+            The instance held by the set, or None if no equal element is present.
+        """
+        return self._set.get(key)
+
+    def size(self):
+        """
+        Returns the number of elements in the set.
+
+        Returns:
+            int: The number of elements in the set.
+        """
+        return self._set.size()
+
+    def isEmpty(self):
+        """
+        Checks if the set is empty.
+
+        Returns:
+            bool: True if the set is empty, False otherwise.
+        """
+        return self._set.isEmpty()
+
+    def first(self):
+        """
+        Retrieves the first (lowest) element in the set.
+
+        Raises:
+            NoSuchElementException: If the set is empty.
+        """
+        return self._set.first()
+
+    def last(self):
+        """
+        Retrieves the last (highest) element in the set.
+
+        Raises:
+            NoSuchElementException: If the set is empty.
+        """
+        return self._set.last()
+
+    def floor(self, key):
+        """
+        Retrieves the greatest element less than or equal to the given element, or None if there is no such element.
+        """
+        return self._set.floor(key)
+
+    def ceiling(self, key):
+        """
+        Retrieves the least element greater than or equal to the given element, or None if there is no such element.
+        """
+        return self._set.ceiling(key)
+
+    def higher(self, key):
+        """
+        Retrieves the least element strictly greater than the given element, or None if there is no such element.
+        """
+        return self._set.higher(key)
+
+    def lower(self, key):
+        """
+        Retrieves the greatest element strictly less than the given element, or None if there is no such element.
+        """
+        return self._set.lower(key)
+
+    def rank(self, key):
+        """
+        Returns the number of elements strictly less than the given element.
+        """
+        return self._set.rank(key)
+
+    def select(self, index):
+        """
+        Returns the element at the given position in ascending order.
+
+        Raises:
+            IndexError: If index is out of range.
+        """
+        return self._set.select(index)
+
+    def snapshot(self):
+        """
+        Returns an independent, in-memory TreeSet copy of the current contents, in O(n).
+
+        Returns:
+            TreeSet: A TreeSet holding the elements present at the time of the call.
+        """
+        return self._set.clone()
+
+    def __iter__(self):
+        """
+        Returns an iterator over the elements in ascending order.
+        """
+        return iter(self._set)
+
+    def iterator(self, fromElement=None, inclusive=True):
+        """
+        Returns an iterator over the elements in ascending order, optionally starting at fromElement.
+        """
+        return self._set.iterator(fromElement, inclusive)
+
+    def __reversed__(self):
+        """
+        Returns an iterator over the elements in descending order.
+        """
+        return reversed(self._set)
+
+    def descendingIterator(self, fromElement=None, inclusive=True):
+        """
+        Returns an iterator over the elements in descending order, optionally starting at fromElement.
+        """
+        return self._set.descendingIterator(fromElement, inclusive)
@@ -23,4 +23,22 @@ class NullPointerException(Exception):
     """
     Exception raised when attempting to use a null reference.
     """
-    pass
\ No newline at end of file
+    pass
+
+class UnsupportedOperationException(Exception):
+    """
+    Exception raised when an operation is not supported by the TreeSet's backend.
+    """
+    pass
+
+class IllegalArgumentException(Exception):
+    """
+    Exception raised when an element or range bound falls outside the allowed range.
+    """
+    pass
+
+class StreamCorruptedException(Exception):
+    """
+    Exception raised when a saved TreeSet file has a bad header, an unknown version or a checksum mismatch.
+    """
+    pass
@@ -0,0 +1,280 @@
+import sys
+from RedBlackTree import RedBlackTree, Node, RED, BLACK
+
+class OperationStats:
+    """
+    The work done by one tree operation, or accumulated over many.
+    """
+    __slots__ = ('operation', 'comparisons', 'rotations', 'fixup_iterations')
+
+    def __init__(self, operation):
+        self.operation = operation
+        self.comparisons = 0
+        self.rotations = 0
+        self.fixup_iterations = 0
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"OperationStats({self.as_dict()})"
+
+class CountingKey:
+    """
+    Wraps a search key and counts every comparison made against it.
+    """
+    __slots__ = ('key', 'stats')
+
+    def __init__(self, key, stats):
+        self.key = key
+        self.stats = stats
+
+    def __lt__(self, other):
+        self.stats.comparisons += 1
+        return self.key < other
+
+    def __gt__(self, other):
+        self.stats.comparisons += 1
+        return self.key > other
+
+    def __le__(self, other):
+        self.stats.comparisons += 1
+        return self.key <= other
+
+    def __ge__(self, other):
+        self.stats.comparisons += 1
+        return self.key >= other
+
+    def __eq__(self, other):
+        self.stats.comparisons += 1
+        return self.key == other
+
+    def __ne__(self, other):
+        self.stats.comparisons += 1
+        return self.key != other
+
+    __hash__ = None
+
+    def __getattr__(self, name):
+        # Lets a key type whose comparison methods read attributes of the other operand compare
+        # against the probe; such comparisons run on the node's key and are not counted.
+        return getattr(self.key, name)
+
+class InstrumentedRedBlackTree(RedBlackTree):
+    """
+    A RedBlackTree that counts key comparisons, rotations and fixup loop iterations per operation.
+
+    A plain RedBlackTree is switched into this class by assigning its ``__class__`` (see enable) and
+    back again by disable, so trees that are not instrumented run the unmodified code and pay nothing.
+    Searches wrap the key in a CountingKey; the fixups are copies of the base loops with counters.
+    After each operation ``stats`` holds its counts, ``totals`` accumulates them, and the callback,
+    if any, is called with the OperationStats. Work done outside the counted operations (a join, for
+    instance) goes to a throwaway ``stats``.
+    """
+
+    def __init__(self, data_type):
+        super().__init__(data_type)
+        self.callback = None
+        self.stats = OperationStats(None)
+        self.totals = OperationStats("total")
+
+    @staticmethod
+    def enable(tree, callback=None, totals=None):
+        """
+        Switches a RedBlackTree to instrumented mode, reporting each operation to callback and adding
+        it to totals (a fresh OperationStats if not given).
+        """
+        tree.__class__ = InstrumentedRedBlackTree
+        tree.callback = callback
+        tree.stats = OperationStats(None)
+        tree.totals = OperationStats("total") if totals is None else totals
+
+    @staticmethod
+    def disable(tree):
+        tree.__class__ = RedBlackTree
+        del tree.callback, tree.stats, tree.totals
+
+    def _begin(self, operation):
+        self.stats = OperationStats(operation)
+        return self.stats
+
+    def _end(self, result):
+        stats, totals = self.stats, self.totals
+        totals.comparisons += stats.comparisons
+        totals.rotations += stats.rotations
+        totals.fixup_iterations += stats.fixup_iterations
+        if self.callback is not None:
+            self.callback(stats)
+        return result
+
+    def _search(self, operation, method, key):
+        return self._end(method(self, CountingKey(key, self._begin(operation))))
+
+    def insert(self, key):
+        return self.insertIfAbsent(key, "insert") is None
+
+    def insertIfAbsent(self, key, operation="insertIfAbsent"):
+        # The probe is stored in the new node and unwrapped again by _insert_fixup once it is linked in.
+        return self._end(RedBlackTree.insertIfAbsent(self, CountingKey(key, self._begin(operation))))
+
+    def get(self, key):
+        return self._search("get", RedBlackTree.get, key)
+
+    def delete(self, key):
+        return self._search("delete", RedBlackTree.delete, key)
+
+    def contains(self, key):
+        return self._search("contains", RedBlackTree.contains, key)
+
+    def floor(self, key):
+        return self._search("floor", RedBlackTree.floor, key)
+
+    def ceiling(self, key):
+        return self._search("ceiling", RedBlackTree.ceiling, key)
+
+    def higher(self, key):
+        return self._search("higher", RedBlackTree.higher, key)
+
+    def lower(self, key):
+        return self._search("lower", RedBlackTree.lower, key)
+
+    def rank(self, key, inclusive=False):
+        return self._end(RedBlackTree.rank(self, CountingKey(key, self._begin("rank")), inclusive))
+
+    def pollFirst(self):
+        self._begin("pollFirst")
+        return self._end(RedBlackTree.pollFirst(self))
+
+    def pollLast(self):
+        self._begin("pollLast")
+        return self._end(RedBlackTree.pollLast(self))
+
+    def _left_rotate(self, x):
+        self.stats.rotations += 1
+        RedBlackTree._left_rotate(self, x)
+
+    def _right_rotate(self, y):
+        self.stats.rotations += 1
+        RedBlackTree._right_rotate(self, y)
+
+    def _insert_fixup(self, z):
+        if type(z.key) is CountingKey:
+            z.key = z.key.key
+        stats = self.stats
+        while z.parent and z.parent.color == RED:
+            stats.fixup_iterations += 1
+            if z.parent == z.parent.parent.left:
+                y = z.parent.parent.right
+                if y.color == RED:
+                    z.parent.color = BLACK
+                    y.color = BLACK
+                    z.parent.parent.color = RED
+                    z = z.parent.parent
+                else:
+                    if z == z.parent.right:
+                        z = z.parent
+                        self._left_rotate(z)
+                    z.parent.color = BLACK
+                    z.parent.parent.color = RED
+                    self._right_rotate(z.parent.parent)
+            else:
+                y = z.parent.parent.left
+                if y.color == RED:
+                    z.parent.color = BLACK
+                    y.color = BLACK
+                    z.parent.parent.color = RED
+                    z = z.parent.parent
+                else:
+                    if z == z.parent.left:
+                        z = z.parent
+                        self._right_rotate(z)
+                    z.parent.color = BLACK
+                    z.parent.parent.color = RED
+                    self._left_rotate(z.parent.parent)
+
+        self.root.color = BLACK
+        return z
+
+    def _delete_fixup(self, x, parent):
+        stats = self.stats
+        while x != self.root and x.color == BLACK:
+            stats.fixup_iterations += 1
+            if x == parent.left:
+                w = parent.right
+                if w.color == RED:
+                    w.color = BLACK
+                    parent.color = RED
+                    self._left_rotate(parent)
+                    w = parent.right
+                if w.left.color == BLACK and w.right.color == BLACK:
+                    w.color = RED
+                    x = parent
+                    parent = x.parent
+                else:
+                    if w.right.color == BLACK:
+                        w.left.color = BLACK
+                        w.color = RED
+                        self._right_rotate(w)
+                        w = parent.right
+                    w.color = parent.color
+                    parent.color = BLACK
+                    w.right.color = BLACK
+                    self._left_rotate(parent)
+                    x = self.root
+            else:
+                w = parent.left
+                if w.color == RED:
+                    w.color = BLACK
+                    parent.color = RED
+                    self._right_rotate(parent)
+                    w = parent.left
+                if w.right.color == BLACK and w.left.color == BLACK:
+                    w.color = RED
+                    x = parent
+                    parent = x.parent
+                else:
+                    if w.left.color == BLACK:
+                        w.right.color = BLACK
+                        w.color = RED
+                        self._left_rotate(w)
+                        w = parent.left
+                    w.color = parent.color
+                    parent.color = BLACK
+                    w.left.color = BLACK
+                    self._right_rotate(parent)
+                    x = self.root
+        if x != self.nil:
+            x.color = BLACK
+
+def shape(tree):
+    """
+    Measures a RedBlackTree in O(n).
+
+    Returns:
+        dict: The height (the number of nodes on the longest root-to-leaf path), the black-height
+            (black nodes on any root-to-nil path, not counting nil), the number of nodes and the bytes
+            used by the nodes themselves, excluding their keys.
+    """
+    nil = tree.nil
+    height = 0
+    stack = [(tree.root, 1)] if tree.root != nil else []
+    while stack:
+        node, depth = stack.pop()
+        if depth > height:
+            height = depth
+        if node.left != nil:
+            stack.append((node.left, depth + 1))
+        if node.right != nil:
+            stack.append((node.right, depth + 1))
+    black_height = 0
+    node = tree.root
+    while node != nil:
+        black_height += node.color == BLACK
+        node = node.left
+    size = tree.root.size
+    return {
+        "height": height,
+        "black_height": black_height,
+        "nodes": size,
+        "node_bytes": size * sys.getsizeof(Node()),
+    }
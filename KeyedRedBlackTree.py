@@ -0,0 +1,234 @@
+from itertools import islice
+from RedBlackTree import RedBlackTree, ValueNode, BLACK
+
+class KeyedRedBlackTree(RedBlackTree):
+    """
+    A RedBlackTree ordered by a sort key computed once per element, optionally in reverse.
+
+    Each node is a ValueNode whose ``key`` is the element's sort key and whose ``value`` is the
+    element itself, so every descent, rotation, split and join of the base class compares only the
+    cached sort keys and the elements' own comparison methods are never called. The tree always
+    keeps the sort keys in ascending order; with reverse=True the public methods present it
+    mirrored (first is the largest, floor searches upwards, and so on), so a descending set needs
+    no wrapper objects around its elements or keys.
+    """
+
+    def __init__(self, data_type, key=None, reverse=False):
+        super().__init__(data_type)
+        self.key = key
+        self.reverse = reverse
+
+    def _sort(self, element):
+        return element if self.key is None else self.key(element)
+
+    @staticmethod
+    def _value(node):
+        return None if node is None else node.value
+
+    def first(self):
+        return self._value(self._max if self.reverse else self._min)
+
+    def last(self):
+        return self._value(self._min if self.reverse else self._max)
+
+    def floor(self, element):
+        find = self._ceiling if self.reverse else self._floor
+        return self._value(find(self.root, self._sort(element)))
+
+    def ceiling(self, element):
+        find = self._floor if self.reverse else self._ceiling
+        return self._value(find(self.root, self._sort(element)))
+
+    def higher(self, element):
+        find = self._lower if self.reverse else self._higher
+        return self._value(find(self.root, self._sort(element)))
+
+    def lower(self, element):
+        find = self._higher if self.reverse else self._lower
+        return self._value(find(self.root, self._sort(element)))
+
+    def lookup(self, element):
+        return self._lookup(self.root, self._sort(element))
+
+    def insertIfAbsent(self, element):
+        key = self._sort(element)
+        nil = self.nil
+        parent = None
+        node = self.root
+        left = False
+        while node != nil:
+            parent = node
+            if key < node.key:
+                node = node.left
+                left = True
+            elif key > node.key:
+                node = node.right
+                left = False
+            else:
+                return node.value
+        self._link(ValueNode(key, element), parent, left)
+        return None
+
+    def get(self, element):
+        node = self._lookup(self.root, self._sort(element))
+        return None if node == self.nil else node.value
+
+    def pollFirst(self):
+        node = self._max if self.reverse else self._min
+        if node is None:
+            return None
+        self._delete_node(node)
+        return node.value
+
+    def pollLast(self):
+        node = self._min if self.reverse else self._max
+        if node is None:
+            return None
+        self._delete_node(node)
+        return node.value
+
+    def _poll_many(self, count, reverse):
+        if count <= 0 or self._min is None:
+            return []
+        if count < self._FEW_POLLS:
+            poll = self.pollLast if reverse else self.pollFirst
+            return [poll() for _ in range(min(count, self.root.size))]
+        values = list(islice(self._values(reverse), count))
+        if len(values) == self.root.size:
+            self.root = self.nil
+        else:
+            low, _, _, high, _ = self._split(self.root, self._black_height(self.root), self._sort(values[-1]))
+            self.root = low if reverse != self.reverse else high
+        self._reset_ends()
+        self._mod_count += 1
+        return values
+
+    def rank(self, element, inclusive=False):
+        key = self._sort(element)
+        if self.reverse:
+            return self.root.size - RedBlackTree.rank(self, key, not inclusive)
+        return RedBlackTree.rank(self, key, inclusive)
+
+    def select(self, index):
+        if self.reverse:
+            index = self.root.size - 1 - index
+        return self._value(self._select(index))
+
+    class ValuesIterator(RedBlackTree.KeysIterator):
+        """
+        Iterates like KeysIterator but yields each node's value.
+        """
+
+        def __next__(self):
+            node = self.node
+            RedBlackTree.KeysIterator.__next__(self)
+            return node.value
+
+    def _values(self, reverse, start=None, inclusive=True):
+        reverse = reverse != self.reverse
+        if start is None:
+            node = self._max if reverse else self._min
+        else:
+            node = self._start_node(self._sort(start), inclusive, reverse)
+        return self.ValuesIterator(node, self.nil, reverse)
+
+    def __iter__(self):
+        return self._values(False)
+
+    def __reversed__(self):
+        return self._values(True)
+
+    def iter_from(self, element, inclusive=True, reverse=False):
+        return self._values(reverse, element, inclusive)
+
+    def iter_batches(self, size, reverse=False, start=None, inclusive=True):
+        values = self._values(reverse, start, inclusive)
+        batch = list(islice(values, size))
+        while batch:
+            yield batch
+            batch = list(islice(values, size))
+
+    def load_sorted(self, elements):
+        """
+        Replaces the contents of the tree with elements, which must be distinct and in the tree's
+        order, in linear time.
+        """
+        nil = self.nil
+        nodes = [ValueNode(self._sort(element), element, BLACK, nil, nil) for element in elements]
+        if self.reverse:
+            nodes.reverse()
+        self._link_sorted(nodes)
+
+    def _with_root(self, root):
+        tree = KeyedRedBlackTree(self.data_type, self.key, self.reverse)
+        tree.root = root
+        tree._reset_ends()
+        return tree
+
+    def _clone_recursive(self, node, nil):
+        if node == nil:
+            return nil
+        new_node = ValueNode(node.key, node.value, node.color,
+                             self._clone_recursive(node.left, nil), self._clone_recursive(node.right, nil),
+                             size=node.size)
+        if new_node.left != nil:
+            new_node.left.parent = new_node
+        if new_node.right != nil:
+            new_node.right.parent = new_node
+        return new_node
+
+    def split(self, element):
+        """
+        Splits the tree around element like RedBlackTree.split, returning the trees before and after
+        it in this tree's order.
+        """
+        root = self.root
+        low, _, found, high, _ = self._split(root, self._black_height(root), self._sort(element))
+        self.root = self.nil
+        self._min = self._max = None
+        self._mod_count += 1
+        low, high = self._with_root(low), self._with_root(high)
+        if self.reverse:
+            low, high = high, low
+        return low, self._value(found), high
+
+    @staticmethod
+    def join(left, right):
+        """
+        Concatenates two trees where every element of left comes before every element of right in
+        their order.
+        """
+        if left.reverse:
+            left, right = right, left
+        return RedBlackTree.join(left, right)
+
+    class Cursor(RedBlackTree.Cursor):
+        """
+        A RedBlackTree.Cursor that takes elements and answers in the tree's order.
+        """
+
+        def _move(self, found, start):
+            if found is None:
+                self.node = start
+                return None
+            self.node = found
+            return found.value
+
+        def floor(self, element):
+            find = RedBlackTree.Cursor.ceiling if self.tree.reverse else RedBlackTree.Cursor.floor
+            return find(self, self.tree._sort(element))
+
+        def ceiling(self, element):
+            find = RedBlackTree.Cursor.floor if self.tree.reverse else RedBlackTree.Cursor.ceiling
+            return find(self, self.tree._sort(element))
+
+        def higher(self, element):
+            find = RedBlackTree.Cursor.lower if self.tree.reverse else RedBlackTree.Cursor.higher
+            return find(self, self.tree._sort(element))
+
+        def lower(self, element):
+            find = RedBlackTree.Cursor.higher if self.tree.reverse else RedBlackTree.Cursor.lower
+            return find(self, self.tree._sort(element))
+
+        def contains(self, element):
+            return RedBlackTree.Cursor.contains(self, self.tree._sort(element))
@@ -0,0 +1,255 @@
+from bisect import bisect_left, bisect_right
+from TreeSetSnapshot import Snapshot
+from Exceptions import *
+
+class MappedTreeSet:
+    """
+    A read-only sorted set served straight from a file written by TreeSet.save, as returned by
+    TreeSet.load(path, mapped=True).
+
+    The file is memory-mapped and no tree nodes are built: queries binary-search the mapped sorted
+    buffer in O(log n), and for record encodings only the elements actually compared are decoded.
+    Opening the set costs O(1) beyond the checksum pass, which can be skipped with verify=False.
+    Methods that would modify the set raise UnsupportedOperationException.
+    """
+
+    def __init__(self, path, verify=True):
+        """
+        Maps a saved TreeSet file.
+
+        Args:
+            path (str): The file to open.
+            verify (bool, optional): Whether to check the file's CRC-32 first. Defaults to True.
+
+        Raises:
+            StreamCorruptedException: If the file is not a valid TreeSet file.
+        """
+        self._snapshot = Snapshot(path, verify)
+        self._type = self._snapshot.data_type
+        self._keys = self._snapshot.keys
+        self._size = self._snapshot.count
+
+    def _check(self, key):
+        if key is None:
+            raise NullPointerException()
+        if not isinstance(key, self._type):
+            raise TypeError(f"Element must be instance of {self._type.__name__}, {type(key).__name__} provided")
+
+    def _unsupported(self, *args):
+        raise UnsupportedOperationException("a mapped TreeSet is read-only")
+
+    add = addAll = remove = removeAll = retainAll = clear = pollFirst = pollLast = _unsupported
+
+    def size(self):
+        """
+        Returns the number of elements in the set.
+
+        Returns:
+            int: The number of elements in the set.
+        """
+        return self._size
+
+    def isEmpty(self):
+        """
+        Checks if the set is empty.
+
+        Returns:
+            bool: True if the set is empty, False otherwise.
+        """
+        return self._size == 0
+
+    def contains(self, key):
+        """
+        Checks if the set contains a specific element.
+
+        Args:
+            key: The element to check for.
+
+        Returns:
+            bool: True if the element is present, False otherwise.
+        """
+        self._check(key)
+        index = bisect_left(self._keys, key)
+        return index < self._size and self._keys[index] == key
+
+    def first(self):
+        """
+        Retrieves the first (lowest) element.
+
+        Returns:
+            The first element.
+
+        Raises:
+            NoSuchElementException: If the set is empty.
+        """
+        if self._size == 0:
+            raise NoSuchElementException()
+        return self._keys[0]
+
+    def last(self):
+        """
+        Retrieves the last (highest) element.
+
+        Returns:
+            The last element.
+
+        Raises:
+            NoSuchElementException: If the set is empty.
+        """
+        if self._size == 0:
+            raise NoSuchElementException()
+        return self._keys[self._size - 1]
+
+    def floor(self, key):
+        """
+        Retrieves the greatest element less than or equal to the given element.
+
+        Args:
+            key: The element to compare.
+
+        Returns:
+            The matching element, or None if there is no such element.
+        """
+        self._check(key)
+        index = bisect_right(self._keys, key)
+        return self._keys[index - 1] if index else None
+
+    def lower(self, key):
+        """
+        Retrieves the greatest element strictly less than the given element.
+
+        Args:
+            key: The element to compare.
+
+        Returns:
+            The matching element, or None if there is no such element.
+        """
+        self._check(key)
+        index = bisect_left(self._keys, key)
+        return self._keys[index - 1] if index else None
+
+    def ceiling(self, key):
+        """
+        Retrieves the least element greater than or equal to the given element.
+
+        Args:
+            key: The element to compare.
+
+        Returns:
+            The matching element, or None if there is no such element.
+        """
+        self._check(key)
+        index = bisect_left(self._keys, key)
+        return self._keys[index] if index < self._size else None
+
+    def higher(self, key):
+        """
+        Retrieves the least element strictly greater than the given element.
+
+        Args:
+            key: The element to compare.
+
+        Returns:
+            The matching element, or None if there is no such element.
+        """
+        self._check(key)
+        index = bisect_right(self._keys, key)
+        return self._keys[index] if index < self._size else None
+
+    def rank(self, key):
+        """
+        Returns the number of elements strictly less than the given element.
+
+        Args:
+            key: The element to compare.
+
+        Returns:
+            int: The number of smaller elements.
+        """
+        self._check(key)
+        return bisect_left(self._keys, key)
+
+    def select(self, index):
+        """
+        Returns the element at the given position in ascending order.
+
+        Args:
+            index (int): The zero-based position.
+
+        Returns:
+            The element at that position.
+
+        Raises:
+            IndexError: If index is out of range.
+        """
+        if not 0 <= index < self._size:
+            raise IndexError("TreeSet index out of range")
+        return self._keys[index]
+
+    def __iter__(self):
+        """
+        Returns an iterator over the elements in ascending order.
+
+        Returns:
+            iterator: An iterator over the elements in ascending order.
+        """
+        return iter(self._keys)
+
+    def iterator(self, fromElement=None, inclusive=True):
+        """
+        Returns an iterator over the elements in ascending order.
+
+        Args:
+            fromElement (optional): If given, iteration starts at the least element greater than or equal to
+                (or strictly greater than, if inclusive is False) this element.
+            inclusive (bool, optional): Whether fromElement itself is returned if present. Defaults to True.
+
+        Returns:
+            iterator: An iterator over the elements in ascending order.
+        """
+        if fromElement is None:
+            return self.__iter__()
+        self._check(fromElement)
+        start = bisect_left(self._keys, fromElement) if inclusive else bisect_right(self._keys, fromElement)
+        keys = self._keys
+        return (keys[index] for index in range(start, self._size))
+
+    def __reversed__(self):
+        """
+        Returns an iterator over the elements in descending order.
+
+        Returns:
+            iterator: An iterator over the elements in descending order.
+        """
+        return reversed(self._keys)
+
+    def descendingIterator(self, fromElement=None, inclusive=True):
+        """
+        Returns an iterator over the elements in descending order.
+
+        Args:
+            fromElement (optional): If given, iteration starts at the greatest element less than or equal to
+                (or strictly less than, if inclusive is False) this element.
+            inclusive (bool, optional): Whether fromElement itself is returned if present. Defaults to True.
+
+        Returns:
+            iterator: An iterator over the elements in descending order.
+        """
+        if fromElement is None:
+            return self.__reversed__()
+        self._check(fromElement)
+        stop = bisect_right(self._keys, fromElement) if inclusive else bisect_left(self._keys, fromElement)
+        keys = self._keys
+        return (keys[index] for index in range(stop - 1, -1, -1))
+
+    def close(self):
+        """
+        Unmaps the file. The set must not be used afterwards.
+        """
+        self._snapshot.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
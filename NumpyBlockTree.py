@@ -0,0 +1,282 @@
+from bisect import bisect_left, bisect_right
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class NumpyBlockTree:
+    """
+    A sorted int or float set stored as a list of sorted NumPy blocks instead of tree nodes.
+
+    Each block holds between _LOAD // 2 and 2 * _LOAD values (int64 or float64) and is never modified
+    in place: an insert or delete replaces the one block it touches, which costs O(log n + _LOAD) and
+    lets clone() share every block. ``_maxes`` keeps the largest value of each block as a Python
+    number, so a scalar query is one bisect over the blocks and one searchsorted inside a block.
+    The batch queries (contains_many, floor_many, ceiling_many, rank_many) run a single searchsorted
+    over the concatenated blocks, which is cached until the next change.
+
+    Ints are stored as int64; inserting one outside that range raises OverflowError.
+    """
+
+    _LOAD = 512
+    _DTYPES = {int: "int64", float: "float64"}
+    _KINDS = {int: "iu", float: "f"}
+
+    def __init__(self, data_type):
+        if np is None:
+            raise ImportError("the 'numpy' TreeSet backend requires NumPy")
+        if data_type not in self._DTYPES:
+            raise TypeError(f"the 'numpy' TreeSet backend stores int or float, {data_type.__name__} provided")
+        self.data_type = data_type
+        self.dtype = np.dtype(self._DTYPES[data_type])
+        self._blocks = []
+        self._maxes = []
+        self._flat = None
+        self._offsets = None
+
+    def _changed(self):
+        self._flat = None
+        self._offsets = None
+
+    def _array(self):
+        """
+        Returns all values as one sorted array, concatenating the blocks on first use after a change.
+        """
+        if self._flat is None:
+            self._flat = np.concatenate(self._blocks) if self._blocks else np.empty(0, self.dtype)
+        return self._flat
+
+    def _positions(self):
+        """
+        Returns the global index of the first value of each block, followed by the total count.
+        """
+        if self._offsets is None:
+            offsets = [0]
+            for block in self._blocks:
+                offsets.append(offsets[-1] + len(block))
+            self._offsets = offsets
+        return self._offsets
+
+    def _locate(self, key, right):
+        """
+        Finds the first value greater than key (right) or greater than or equal to key (left).
+
+        Returns:
+            tuple: The block index and the position within that block; the block index equals the
+                number of blocks if there is no such value.
+        """
+        i = bisect_right(self._maxes, key) if right else bisect_left(self._maxes, key)
+        if i == len(self._blocks):
+            return i, 0
+        block = self._blocks[i]
+        # Keys below the block, including ints below the int64 range, are placed without searchsorted.
+        if key < block[0]:
+            return i, 0
+        return i, int(np.searchsorted(block, key, 'right' if right else 'left'))
+
+    def _at(self, i, p):
+        if i == len(self._blocks):
+            return None
+        return self._blocks[i][p].item()
+
+    def _before(self, i, p):
+        if p > 0:
+            return self._blocks[i][p - 1].item()
+        if i > 0:
+            return self._maxes[i - 1]
+        return None
+
+    def first(self):
+        if not self._blocks:
+            return None
+        return self._blocks[0][0].item()
+
+    def last(self):
+        if not self._blocks:
+            return None
+        return self._maxes[-1]
+
+    def floor(self, key):
+        return self._before(*self._locate(key, True))
+
+    def lower(self, key):
+        return self._before(*self._locate(key, False))
+
+    def ceiling(self, key):
+        return self._at(*self._locate(key, False))
+
+    def higher(self, key):
+        return self._at(*self._locate(key, True))
+
+    def contains(self, key):
+        i, p = self._locate(key, False)
+        return i < len(self._blocks) and self._blocks[i][p] == key
+
+    def rank(self, key, inclusive=False):
+        i, p = self._locate(key, inclusive)
+        return self._positions()[i] + p
+
+    def select(self, index):
+        offsets = self._positions()
+        if index < 0 or index >= offsets[-1]:
+            return None
+        i = bisect_right(offsets, index) - 1
+        return self._blocks[i][index - offsets[i]].item()
+
+    def insert(self, key):
+        key = self.data_type(key)
+        blocks = self._blocks
+        if not blocks:
+            blocks.append(np.array([key], self.dtype))
+            self._maxes.append(blocks[0][0].item())
+            self._changed()
+            return True
+        i, p = self._locate(key, False)
+        if i == len(blocks):
+            i -= 1
+            p = len(blocks[i])
+        elif blocks[i][p] == key:
+            return False
+        self._replace(i, np.insert(blocks[i], p, key))
+        return True
+
+    def _replace(self, i, block):
+        """
+        Puts a changed block back at index i, splitting it if it grew too large and merging it with a
+        neighbour if it shrank too small.
+        """
+        blocks, maxes, load = self._blocks, self._maxes, self._LOAD
+        if len(block) > 2 * load:
+            blocks[i:i + 1] = [block[:load], block[load:]]
+            maxes[i:i + 1] = [block[load - 1].item(), block[-1].item()]
+        elif len(block) < load // 2 and len(blocks) > 1:
+            j = i if i + 1 < len(blocks) else i - 1
+            pair = [block if k == i else blocks[k] for k in (j, j + 1)]
+            merged = np.concatenate(pair)
+            if len(merged) > 2 * load:
+                half = len(merged) // 2
+                blocks[j:j + 2] = [merged[:half], merged[half:]]
+                maxes[j:j + 2] = [merged[half - 1].item(), merged[-1].item()]
+            else:
+                blocks[j:j + 2] = [merged]
+                maxes[j:j + 2] = [merged[-1].item()]
+        elif len(block) == 0:
+            del blocks[i]
+            del maxes[i]
+        else:
+            blocks[i] = block
+            maxes[i] = block[-1].item()
+        self._changed()
+
+    def delete(self, key):
+        i, p = self._locate(key, False)
+        if i == len(self._blocks) or self._blocks[i][p] != key:
+            return False
+        self._replace(i, np.delete(self._blocks[i], p))
+        return True
+
+    def pollFirst(self):
+        if not self._blocks:
+            return None
+        key = self._blocks[0][0].item()
+        self._replace(0, self._blocks[0][1:])
+        return key
+
+    def pollLast(self):
+        if not self._blocks:
+            return None
+        key = self._maxes[-1]
+        self._replace(len(self._blocks) - 1, self._blocks[-1][:-1])
+        return key
+
+    def load_sorted(self, keys):
+        values = np.asarray(keys, self.dtype) if len(keys) else np.empty(0, self.dtype)
+        load = self._LOAD
+        self._blocks = [values[i:i + load] for i in range(0, len(values), load)]
+        self._maxes = [block[-1].item() for block in self._blocks]
+        self._changed()
+        self._flat = values
+
+    def clone(self):
+        new_tree = NumpyBlockTree(self.data_type)
+        new_tree._blocks = self._blocks.copy()
+        new_tree._maxes = self._maxes.copy()
+        new_tree._flat = self._flat
+        new_tree._offsets = self._offsets
+        return new_tree
+
+    def __iter__(self):
+        for block in self._blocks:
+            yield from block.tolist()
+
+    def __reversed__(self):
+        for block in reversed(self._blocks):
+            yield from block[::-1].tolist()
+
+    def iter_from(self, key, inclusive=True, reverse=False):
+        blocks = self._blocks
+        if reverse:
+            i, p = self._locate(key, inclusive)
+            if i < len(blocks):
+                yield from blocks[i][:p][::-1].tolist()
+            for block in reversed(blocks[:i]):
+                yield from block[::-1].tolist()
+        else:
+            i, p = self._locate(key, not inclusive)
+            if i < len(blocks):
+                yield from blocks[i][p:].tolist()
+            for block in blocks[i + 1:]:
+                yield from block.tolist()
+
+    def iter_batches(self, size, reverse=False, start=None, inclusive=True):
+        if start is not None:
+            keys = self.iter_from(start, inclusive, reverse)
+        else:
+            keys = self.__reversed__() if reverse else self.__iter__()
+        batch = []
+        for key in keys:
+            batch.append(key)
+            if len(batch) == size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _queries(self, keys):
+        queries = np.asarray(keys)
+        if len(queries) and queries.dtype.kind not in self._KINDS[self.data_type]:
+            raise TypeError(f"Queries must be {self.data_type.__name__} values, {queries.dtype} provided")
+        return queries
+
+    def contains_many(self, keys):
+        queries = self._queries(keys)
+        values = self._array()
+        if len(values) == 0:
+            return [False] * len(queries)
+        positions = np.minimum(np.searchsorted(values, queries), len(values) - 1)
+        return (values[positions] == queries).tolist()
+
+    def ceiling_many(self, keys):
+        queries = self._queries(keys)
+        values = self._array()
+        positions = np.searchsorted(values, queries, 'left')
+        return self._pick(values, positions, positions >= len(values))
+
+    def floor_many(self, keys):
+        queries = self._queries(keys)
+        values = self._array()
+        positions = np.searchsorted(values, queries, 'right') - 1
+        return self._pick(values, positions, positions < 0)
+
+    def rank_many(self, keys):
+        return np.searchsorted(self._array(), self._queries(keys), 'left').tolist()
+
+    @staticmethod
+    def _pick(values, positions, missing):
+        if len(values) == 0:
+            return [None] * len(positions)
+        result = values[np.clip(positions, 0, len(values) - 1)].tolist()
+        for index in np.flatnonzero(missing).tolist():
+            result[index] = None
+        return result
@@ -0,0 +1,487 @@
+import gc
+from RedBlackTree import RED, BLACK
+
+class PersistentNode:
+    """
+    A red-black tree node without a parent pointer, so that it can be shared
+    between snapshots. ``owner`` is the token of the only tree allowed to
+    modify the node in place; any other tree copies it first.
+    """
+    __slots__ = ('key', 'left', 'right', 'color', 'size', 'owner')
+
+    def __init__(self, key=None, color=RED, left=None, right=None, size=1, owner=None):
+        self.key = key
+        self.left = left
+        self.right = right
+        self.color = color
+        self.size = size
+        self.owner = owner
+
+NIL = PersistentNode(key=None, color=BLACK, size=0)
+
+class PersistentRedBlackTree:
+    """
+    A copy-on-write red-black tree whose clone() is O(1).
+
+    A clone shares every node with the original and both trees take a fresh
+    ownership token, so from then on a mutation copies exactly the nodes it
+    would modify: the search path plus the siblings recolored or rotated by
+    the fixups, O(log n) in all. Nodes have no parent pointers; insert and
+    delete keep the search path on an explicit stack instead.
+    """
+
+    def __init__(self, data_type):
+        self.nil = NIL
+        self.data_type = data_type
+        self.root = NIL
+        self._token = object()
+
+    def _own(self, node):
+        if node.owner is self._token:
+            return node
+        return PersistentNode(node.key, node.color, node.left, node.right, node.size, self._token)
+
+    def _own_child(self, parent, left):
+        child = parent.left if left else parent.right
+        if child == NIL or child.owner is self._token:
+            return child
+        child = self._own(child)
+        if left:
+            parent.left = child
+        else:
+            parent.right = child
+        return child
+
+    def _own_path(self, path):
+        """
+        Replaces the nodes of a root-to-node path by owned ones, in place.
+        """
+        parent = None
+        for i, node in enumerate(path):
+            owned = self._own(node)
+            if owned is not node:
+                if parent is None:
+                    self.root = owned
+                elif parent.left is node:
+                    parent.left = owned
+                else:
+                    parent.right = owned
+                path[i] = owned
+            parent = owned
+
+    def _replace_child(self, parent, old, new):
+        if parent is None:
+            self.root = new
+        elif parent.left is old:
+            parent.left = new
+        else:
+            parent.right = new
+
+    def _left_rotate(self, x, parent):
+        y = x.right
+        x.right = y.left
+        y.left = x
+        self._replace_child(parent, x, y)
+        y.size = x.size
+        x.size = x.left.size + x.right.size + 1
+        return y
+
+    def _right_rotate(self, y, parent):
+        x = y.left
+        y.left = x.right
+        x.right = y
+        self._replace_child(parent, y, x)
+        x.size = y.size
+        y.size = y.left.size + y.right.size + 1
+        return x
+
+    def first(self):
+        if self.root == NIL:
+            return None
+        return self._minimum(self.root).key
+
+    def last(self):
+        if self.root == NIL:
+            return None
+        return self._maximum(self.root).key
+
+    def _minimum(self, node):
+        while node.left != NIL:
+            node = node.left
+        return node
+
+    def _maximum(self, node):
+        while node.right != NIL:
+            node = node.right
+        return node
+
+    def floor(self, key):
+        node = self.root
+        result = None
+        while node != NIL:
+            if key == node.key:
+                return node.key
+            if key < node.key:
+                node = node.left
+            else:
+                result = node.key
+                node = node.right
+        return result
+
+    def ceiling(self, key):
+        node = self.root
+        result = None
+        while node != NIL:
+            if key == node.key:
+                return node.key
+            if key > node.key:
+                node = node.right
+            else:
+                result = node.key
+                node = node.left
+        return result
+
+    def higher(self, key):
+        node = self.root
+        result = None
+        while node != NIL:
+            if key < node.key:
+                result = node.key
+                node = node.left
+            else:
+                node = node.right
+        return result
+
+    def lower(self, key):
+        node = self.root
+        result = None
+        while node != NIL:
+            if key > node.key:
+                result = node.key
+                node = node.right
+            else:
+                node = node.left
+        return result
+
+    def lookup(self, key):
+        node = self.root
+        while node != NIL and node.key != key:
+            if key < node.key:
+                node = node.left
+            else:
+                node = node.right
+        return node
+
+    def contains(self, key):
+        return self.lookup(key) != NIL
+
+    def rank(self, key, inclusive=False):
+        node = self.root
+        rank = 0
+        while node != NIL:
+            if key < node.key:
+                node = node.left
+            elif key > node.key:
+                rank += node.left.size + 1
+                node = node.right
+            else:
+                return rank + node.left.size + (1 if inclusive else 0)
+        return rank
+
+    def select(self, index):
+        if index < 0 or index >= self.root.size:
+            return None
+        node = self.root
+        while True:
+            left_size = node.left.size
+            if index < left_size:
+                node = node.left
+            elif index > left_size:
+                index -= left_size + 1
+                node = node.right
+            else:
+                return node.key
+
+    def insert(self, key):
+        path = []
+        node = self.root
+        while node != NIL:
+            path.append(node)
+            if key < node.key:
+                node = node.left
+            elif key > node.key:
+                node = node.right
+            else:
+                return False
+
+        self._own_path(path)
+        z = PersistentNode(key, RED, NIL, NIL, 1, self._token)
+        if not path:
+            self.root = z
+        else:
+            parent = path[-1]
+            if key < parent.key:
+                parent.left = z
+            else:
+                parent.right = z
+            for node in path:
+                node.size += 1
+        self._insert_fixup(z, path)
+        return True
+
+    def _insert_fixup(self, z, path):
+        while path and path[-1].color == RED:
+            p = path.pop()
+            g = path.pop()
+            great = path[-1] if path else None
+            if p is g.left:
+                if g.right.color == RED:
+                    u = self._own_child(g, False)
+                    p.color = BLACK
+                    u.color = BLACK
+                    g.color = RED
+                    z = g
+                    continue
+                if z is p.right:
+                    self._left_rotate(p, g)
+                    z, p = p, z
+                p.color = BLACK
+                g.color = RED
+                self._right_rotate(g, great)
+            else:
+                if g.left.color == RED:
+                    u = self._own_child(g, True)
+                    p.color = BLACK
+                    u.color = BLACK
+                    g.color = RED
+                    z = g
+                    continue
+                if z is p.left:
+                    self._right_rotate(p, g)
+                    z, p = p, z
+                p.color = BLACK
+                g.color = RED
+                self._left_rotate(g, great)
+            break
+        if self.root.color == RED:
+            self.root = self._own(self.root)
+            self.root.color = BLACK
+
+    def delete(self, key):
+        path = []
+        node = self.root
+        while node != NIL and node.key != key:
+            path.append(node)
+            node = node.left if key < node.key else node.right
+        if node == NIL:
+            return False
+        path.append(node)
+        self._own_path(path)
+        self._delete_path(path)
+        return True
+
+    def _delete_path(self, path):
+        """
+        Removes the last node of an owned root-to-node path.
+        """
+        z = path[-1]
+        if z.left != NIL and z.right != NIL:
+            # Move the successor's key into z and remove the successor instead.
+            node = self._own_child(z, False)
+            path.append(node)
+            while node.left != NIL:
+                node = self._own_child(node, True)
+                path.append(node)
+            z.key = node.key
+        y = path.pop()
+        x = y.left if y.left != NIL else y.right
+        parent = path[-1] if path else None
+        is_left = parent is not None and parent.left is y
+        self._replace_child(parent, y, x)
+        for node in path:
+            node.size -= 1
+        if y.color == BLACK:
+            self._delete_fixup(x, path, is_left)
+
+    def _delete_fixup(self, x, path, is_left):
+        while path and x.color == BLACK:
+            parent = path[-1]
+            grandparent = path[-2] if len(path) > 1 else None
+            if is_left:
+                w = self._own_child(parent, False)
+                if w.color == RED:
+                    w.color = BLACK
+                    parent.color = RED
+                    self._left_rotate(parent, grandparent)
+                    path.insert(len(path) - 1, w)
+                    grandparent = w
+                    w = self._own_child(parent, False)
+                if w.left.color == BLACK and w.right.color == BLACK:
+                    w.color = RED
+                    x = path.pop()
+                    is_left = bool(path) and path[-1].left is x
+                    continue
+                if w.right.color == BLACK:
+                    self._own_child(w, True).color = BLACK
+                    w.color = RED
+                    w = self._right_rotate(w, parent)
+                w.color = parent.color
+                parent.color = BLACK
+                self._own_child(w, False).color = BLACK
+                self._left_rotate(parent, grandparent)
+            else:
+                w = self._own_child(parent, True)
+                if w.color == RED:
+                    w.color = BLACK
+                    parent.color = RED
+                    self._right_rotate(parent, grandparent)
+                    path.insert(len(path) - 1, w)
+                    grandparent = w
+                    w = self._own_child(parent, True)
+                if w.right.color == BLACK and w.left.color == BLACK:
+                    w.color = RED
+                    x = path.pop()
+                    is_left = bool(path) and path[-1].left is x
+                    continue
+                if w.left.color == BLACK:
+                    self._own_child(w, False).color = BLACK
+                    w.color = RED
+                    w = self._left_rotate(w, parent)
+                w.color = parent.color
+                parent.color = BLACK
+                self._own_child(w, True).color = BLACK
+                self._right_rotate(parent, grandparent)
+            return
+        if x != NIL and x.color == RED:
+            if path:
+                x = self._own_child(path[-1], is_left)
+            else:
+                x = self.root = self._own(x)
+            x.color = BLACK
+
+    def pollFirst(self):
+        if self.root == NIL:
+            return None
+        path = [self.root]
+        while path[-1].left != NIL:
+            path.append(path[-1].left)
+        key = path[-1].key
+        self._own_path(path)
+        self._delete_path(path)
+        return key
+
+    def pollLast(self):
+        if self.root == NIL:
+            return None
+        path = [self.root]
+        while path[-1].right != NIL:
+            path.append(path[-1].right)
+        key = path[-1].key
+        self._own_path(path)
+        self._delete_path(path)
+        return key
+
+    def load_sorted(self, keys):
+        token = self._token
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            nodes = [PersistentNode(key, BLACK, NIL, NIL, 1, token) for key in keys]
+        finally:
+            if gc_enabled:
+                gc.enable()
+        red_depth = (len(nodes) + 1).bit_length() - 1
+
+        def build(lo, hi, depth):
+            mid = (lo + hi) // 2
+            node = nodes[mid]
+            if depth == red_depth:
+                node.color = RED
+            if lo < mid:
+                node.left = build(lo, mid, depth + 1)
+            if mid + 1 < hi:
+                node.right = build(mid + 1, hi, depth + 1)
+            node.size = hi - lo
+            return node
+
+        self.root = build(0, len(nodes), 0) if nodes else NIL
+
+    def clone(self):
+        new_tree = PersistentRedBlackTree(self.data_type)
+        new_tree.root = self.root
+        self._token = object()
+        return new_tree
+
+    def __iter__(self):
+        return self.KeysIterator(self.root, reverse=False)
+
+    def __reversed__(self):
+        return self.KeysIterator(self.root, reverse=True)
+
+    def iter_from(self, key, inclusive=True, reverse=False):
+        iterator = self.KeysIterator(NIL, reverse)
+        iterator._seek(self.root, key, inclusive)
+        return iterator
+
+    def iter_batches(self, size, reverse=False, start=None, inclusive=True):
+        iterator = self.__reversed__() if reverse else self.__iter__()
+        if start is not None:
+            iterator = self.iter_from(start, inclusive, reverse)
+        batch = []
+        for key in iterator:
+            batch.append(key)
+            if len(batch) == size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    class KeysIterator:
+        """
+        Iterates with an explicit stack of pending ancestors, since shared
+        nodes cannot point back to a parent. After clone() the version being
+        iterated stays intact, since neither tree modifies shared nodes in
+        place; a tree that modifies nodes it owns while one of its own
+        iterators is running gives no such guarantee.
+        """
+
+        def __init__(self, node, reverse=False):
+            self.stack = []
+            self.reverse = reverse
+            self._descend(node)
+
+        def __iter__(self):
+            return self
+
+        def __next__(self):
+            if not self.stack:
+                raise StopIteration
+            node = self.stack.pop()
+            self._descend(node.left if self.reverse else node.right)
+            return node.key
+
+        def _descend(self, node):
+            stack = self.stack
+            if self.reverse:
+                while node != NIL:
+                    stack.append(node)
+                    node = node.right
+            else:
+                while node != NIL:
+                    stack.append(node)
+                    node = node.left
+
+        def _seek(self, node, key, inclusive):
+            stack = self.stack
+            while node != NIL:
+                if self.reverse:
+                    if node.key < key or (inclusive and node.key == key):
+                        stack.append(node)
+                        node = node.right
+                    else:
+                        node = node.left
+                elif node.key > key or (inclusive and node.key == key):
+                    stack.append(node)
+                    node = node.left
+                else:
+                    node = node.right
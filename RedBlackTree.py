@@ -1,57 +1,107 @@
-from enum import Enum
-class Color(Enum):
-    RED = 0
-    BLACK = 1
+import gc
+
+RED = 0
+BLACK = 1
 
 class Node:
-    def __init__(self, data_type, key=None, color=Color.RED, left=None, right=None, parent=None):
-        self.color = color
+    """
+    A red-black tree node.
+
+    Nodes are slotted and keep their color as a plain int, so a node costs a
+    fixed 80 bytes (CPython 3.11, 64-bit) on top of its key instead of a
+    per-node ``__dict__`` plus an ``Enum`` member and a ``data_type`` reference.
+    ``size`` is the number of nodes in the subtree rooted here (0 for nil),
+    which gives rank and select in O(log n).
+    """
+    __slots__ = ('key', 'left', 'right', 'parent', 'color', 'size')
+
+    def __init__(self, key=None, color=RED, left=None, right=None, parent=None, size=1):
+        self.key = key
         self.left = left
         self.right = right
-        self.key = key if key is None else data_type(key)
         self.parent = parent
-        self.data_type = data_type
+        self.color = color
+        self.size = size
+
+class ValueNode(Node):
+    """
+    A node that carries a value alongside the key it is ordered by.
+    """
+    __slots__ = ('value',)
+
+    def __init__(self, key=None, value=None, color=RED, left=None, right=None, parent=None, size=1):
+        super().__init__(key, color, left, right, parent, size)
+        self.value = value
+
+# The nil sentinel is shared by every tree and never modified, so subtrees
+# can move between trees (split, join) without relinking their leaves.
+NIL = Node(key=None, color=BLACK, size=0)
 
 class RedBlackTree:
+    # Below this many keys, pollFirstN and pollLastN delete them one by one
+    # rather than split the tree.
+    _FEW_POLLS = 32
+
     def __init__(self, data_type):
-        self.nil = Node(data_type=data_type, key=None, color=Color.BLACK)
+        self.nil = NIL
         self.data_type = data_type
         self.root = self.nil
+        self._mod_count = 0
+        # The nodes holding the smallest and largest keys (None when empty),
+        # kept up to date by insert and _delete_node so that first, last and
+        # the polls need no descent.
+        self._min = None
+        self._max = None
+
+    def _reset_ends(self):
+        """
+        Recomputes the min and max pointers after the root was replaced wholesale.
+        """
+        if self.root == self.nil:
+            self._min = self._max = None
+        else:
+            self._min = self._minimum(self.root)
+            self._max = self._maximum(self.root)
     
     def first(self):
-        if self.root == self.nil:
+        if self._min is None:
             return None
-        return self._minimum(self.root).key
+        return self._min.key
 
     def floor(self, key):
-        return self._floor(self.root, key)
-
-    def _floor(self, node, key):
-        if node == self.nil:
-            return None
-        if key == node.key:
-            return node.key
-        if key < node.key:
-            return self._floor(node.left, key)
-    
-        floor_key = self._floor(node.right, key)
-        return floor_key if floor_key is not None else node.key
+        node = self._floor(self.root, key)
+        return None if node is None else node.key
+
+    def _floor(self, node, key, best=None):
+        nil = self.nil
+        while node != nil:
+            if key == node.key:
+                return node
+            if key < node.key:
+                node = node.left
+            else:
+                best = node
+                node = node.right
+        return best
     
     def higher(self, key):
-        return self._higher(self.root, key)
-
-    def _higher(self, node, key):
-        if node == self.nil:
-            return None
-        if key < node.key:
-            higher_key = self._higher(node.left, key)
-            return higher_key if higher_key is not None else node.key
-        return self._higher(node.right, key)
+        node = self._higher(self.root, key)
+        return None if node is None else node.key
+
+    def _higher(self, node, key, best=None):
+        nil = self.nil
+        while node != nil:
+            if key < node.key:
+                best = node
+                node = node.left
+            else:
+                node = node.right
+        return best
     
     def last(self):
-        if self.root == self.nil:
+        if self._max is None:
             return None
-        return self._maximum(self.root).key
+        return self._max.key
 
     def _maximum(self, node):
         while node != self.nil and node.right != self.nil:
@@ -59,121 +109,229 @@ class RedBlackTree:
         return node
     
     def lower(self, key):
-        return self._lower(self.root, key)
-
-    def _lower(self, node, key):
-        if node == self.nil:
-            return None
-        if key > node.key:
-            lower_key = self._lower(node.right, key)
-            return lower_key if lower_key is not None else node.key
-        return self._lower(node.left, key)
+        node = self._lower(self.root, key)
+        return None if node is None else node.key
+
+    def _lower(self, node, key, best=None):
+        nil = self.nil
+        while node != nil:
+            if key > node.key:
+                best = node
+                node = node.right
+            else:
+                node = node.left
+        return best
 
     def pollFirst(self):
-        if self.root == self.nil:
+        node = self._min
+        if node is None:
             return None
-        first_key = self.first()
-        self.delete(first_key)
-        return first_key
+        self._delete_node(node)
+        return node.key
     
     def pollLast(self):
-        if self.root == self.nil:
-            return None
-        last_key = self._last()
-        self.delete(last_key)
-        return last_key
-
-    def _last(self):
-        if self.root == self.nil:
+        node = self._max
+        if node is None:
             return None
-        return self._maximum(self.root).key
+        self._delete_node(node)
+        return node.key
+
+    def pollFirstN(self, count):
+        """
+        Removes and returns the count smallest keys in ascending order (all of
+        them if there are fewer) in O(count + log n): the keys are read by
+        walking from the minimum, then the tree is split once after the last.
+        """
+        return self._poll_many(count, False)
+
+    def pollLastN(self, count):
+        """
+        Removes and returns the count largest keys in descending order (all of
+        them if there are fewer) in O(count + log n).
+        """
+        return self._poll_many(count, True)
+
+    def _poll_many(self, count, reverse):
+        if count <= 0 or self._min is None:
+            return []
+        if count < self._FEW_POLLS:
+            poll = self.pollLast if reverse else self.pollFirst
+            return [poll() for _ in range(min(count, self.root.size))]
+        keys = []
+        for batch in self.iter_batches(count, reverse):
+            keys = batch
+            break
+        if len(keys) == self.root.size:
+            self.root = self.nil
+        else:
+            low, _, _, high, _ = self._split(self.root, self._black_height(self.root), keys[-1])
+            self.root = low if reverse else high
+        self._reset_ends()
+        self._mod_count += 1
+        return keys
     
     def ceiling(self, key):
-        return self._ceiling(self.root, key)
-
-    def _ceiling(self, node, key):
-        if node == self.nil:
-            return None
-        if key == node.key:
-            return node.key
-        if key > node.key:
-            return self._ceiling(node.right, key)
-        
-        ceiling_key = self._ceiling(node.left, key)
-        return ceiling_key if ceiling_key is not None else node.key
+        node = self._ceiling(self.root, key)
+        return None if node is None else node.key
+
+    def _ceiling(self, node, key, best=None):
+        nil = self.nil
+        while node != nil:
+            if key == node.key:
+                return node
+            if key > node.key:
+                node = node.right
+            else:
+                best = node
+                node = node.left
+        return best
 
     def lookup(self, key):
         return self._lookup(self.root, key)
 
     def _lookup(self, node, key):
-        if node == self.nil or node.key == key:
-            return node
-        if key < node.key:
-            return self._lookup(node.left, key)
-        else:
-            return self._lookup(node.right, key)
+        nil = self.nil
+        while node != nil and node.key != key:
+            if key < node.key:
+                node = node.left
+            else:
+                node = node.right
+        return node
+
+    def rank(self, key, inclusive=False):
+        """
+        Returns the number of keys less than key (or less than or equal to key
+        when inclusive is True).
+        """
+        nil = self.nil
+        node = self.root
+        rank = 0
+        while node != nil:
+            if key < node.key:
+                node = node.left
+            elif key > node.key:
+                rank += node.left.size + 1
+                node = node.right
+            else:
+                return rank + node.left.size + (1 if inclusive else 0)
+        return rank
+
+    def select(self, index):
+        """
+        Returns the key at position index (0-based) in ascending order, or None
+        if index is out of range.
+        """
+        node = self._select(index)
+        return None if node is None else node.key
+
+    def _select(self, index):
+        if index < 0 or index >= self.root.size:
+            return None
+        node = self.root
+        while True:
+            left_size = node.left.size
+            if index < left_size:
+                node = node.left
+            elif index > left_size:
+                index -= left_size + 1
+                node = node.right
+            else:
+                return node
 
     def insert(self, key):
-        new_node = Node(data_type=self.data_type, key=key)
+        return self.insertIfAbsent(key) is None
+
+    def insertIfAbsent(self, key):
+        """
+        Returns the stored key equal to key, or inserts key and returns None,
+        in a single descent. The node is only allocated once the descent has
+        shown that key is new, and it stores the caller's object as is.
+        """
+        nil = self.nil
         parent = None
-        current = self.root
-
-        while current != self.nil:
-            parent = current
-            if new_node.key < current.key:
-                current = current.left
-            elif new_node.key > current.key:
-                current = current.right
+        node = self.root
+        left = False
+        while node != nil:
+            parent = node
+            if key < node.key:
+                node = node.left
+                left = True
+            elif key > node.key:
+                node = node.right
+                left = False
             else:
-                return False
-
+                return node.key
+        self._link(Node(key), parent, left)
+        return None
+
+    def get(self, key):
+        """
+        Returns the stored key equal to key, or None.
+        """
+        node = self._lookup(self.root, key)
+        return None if node == self.nil else node.key
+
+    def _link(self, new_node, parent, left):
+        """
+        Hangs a new node below parent (as its left child if left, at the root
+        if parent is None) and rebalances.
+        """
         new_node.parent = parent
         if parent is None:
             self.root = new_node
-        elif new_node.key < parent.key:
+            self._min = self._max = new_node
+        elif left:
             parent.left = new_node
+            if parent is self._min:
+                self._min = new_node
         else:
             parent.right = new_node
+            if parent is self._max:
+                self._max = new_node
 
         new_node.left = self.nil
         new_node.right = self.nil
-        new_node.color = Color.RED
+        new_node.color = RED
+        while parent is not None:
+            parent.size += 1
+            parent = parent.parent
 
         self._insert_fixup(new_node)
-        return True
+        self._mod_count += 1
 
     def _insert_fixup(self, z):
-        while z.parent and z.parent.color == Color.RED:
+        while z.parent and z.parent.color == RED:
             if z.parent == z.parent.parent.left:
                 y = z.parent.parent.right
-                if y.color == Color.RED:
-                    z.parent.color = Color.BLACK
-                    y.color = Color.BLACK
-                    z.parent.parent.color = Color.RED
+                if y.color == RED:
+                    z.parent.color = BLACK
+                    y.color = BLACK
+                    z.parent.parent.color = RED
                     z = z.parent.parent
                 else:
                     if z == z.parent.right:
                         z = z.parent
                         self._left_rotate(z)
-                    z.parent.color = Color.BLACK
-                    z.parent.parent.color = Color.RED
+                    z.parent.color = BLACK
+                    z.parent.parent.color = RED
                     self._right_rotate(z.parent.parent)
             else:
                 y = z.parent.parent.left
-                if y.color == Color.RED:
-                    z.parent.color = Color.BLACK
-                    y.color = Color.BLACK
-                    z.parent.parent.color = Color.RED
+                if y.color == RED:
+                    z.parent.color = BLACK
+                    y.color = BLACK
+                    z.parent.parent.color = RED
                     z = z.parent.parent
                 else:
                     if z == z.parent.left:
                         z = z.parent
                         self._right_rotate(z)
-                    z.parent.color = Color.BLACK
-                    z.parent.parent.color = Color.RED
+                    z.parent.color = BLACK
+                    z.parent.parent.color = RED
                     self._left_rotate(z.parent.parent)
 
-        self.root.color = Color.BLACK
+        self.root.color = BLACK
+        return z
     
     def contains(self, key):
         node = self.lookup(key)
@@ -185,22 +343,39 @@ class RedBlackTree:
         node = self.lookup(key)
         if node is None or node == self.nil:
             return False
+        self._delete_node(node)
+        return True
 
+    def _delete_node(self, node):
+        nil = self.nil
+        # The minimum has no left child, so its successor is the leftmost node
+        # of its right subtree or else its parent; the maximum mirrors this.
+        # Deletion relinks nodes rather than moving keys, so both stay valid.
+        if node is self._min:
+            self._min = node.parent if node.right == nil else self._minimum(node.right)
+        if node is self._max:
+            self._max = node.parent if node.left == nil else self._maximum(node.left)
         y = node
         original_color = y.color
-        if node.left == self.nil:
+        if node.left == nil:
+            self._shrink_path(node)
             x = node.right
+            x_parent = node.parent
             self._transplant(node, node.right)
-        elif node.right == self.nil:
+        elif node.right == nil:
+            self._shrink_path(node)
             x = node.left
+            x_parent = node.parent
             self._transplant(node, node.left)
         else:
             y = self._minimum(node.right)
+            self._shrink_path(y)
             original_color = y.color
             x = y.right
             if y.parent == node:
-                x.parent = y
+                x_parent = y
             else:
+                x_parent = y.parent
                 self._transplant(y, y.right)
                 y.right = node.right
                 y.right.parent = y
@@ -208,10 +383,17 @@ class RedBlackTree:
             y.left = node.left
             y.left.parent = y
             y.color = node.color
+            y.size = node.size
 
-        if original_color == Color.BLACK:
-            self._delete_fixup(x)
-        return True
+        if original_color == BLACK:
+            self._delete_fixup(x, x_parent)
+        self._mod_count += 1
+
+    def _shrink_path(self, node):
+        parent = node.parent
+        while parent is not None:
+            parent.size -= 1
+            parent = parent.parent
 
     def _transplant(self, u, v):
         if u.parent is None:
@@ -220,54 +402,59 @@ class RedBlackTree:
             u.parent.left = v
         else:
             u.parent.right = v
-        if v is not None:
+        if v != self.nil:
             v.parent = u.parent
 
-    def _delete_fixup(self, x):
-        while x != self.root and x.color == Color.BLACK:
-            if x == x.parent.left:
-                w = x.parent.right
-                if w.color == Color.RED:
-                    w.color = Color.BLACK
-                    x.parent.color = Color.RED
-                    self._left_rotate(x.parent)
-                    w = x.parent.right
-                if w.left.color == Color.BLACK and w.right.color == Color.BLACK:
-                    w.color = Color.RED
-                    x = x.parent
+    def _delete_fixup(self, x, parent):
+        # x may be the shared nil sentinel, so its parent is passed explicitly
+        # and never written to the sentinel.
+        while x != self.root and x.color == BLACK:
+            if x == parent.left:
+                w = parent.right
+                if w.color == RED:
+                    w.color = BLACK
+                    parent.color = RED
+                    self._left_rotate(parent)
+                    w = parent.right
+                if w.left.color == BLACK and w.right.color == BLACK:
+                    w.color = RED
+                    x = parent
+                    parent = x.parent
                 else:
-                    if w.right.color == Color.BLACK:
-                        w.left.color = Color.BLACK
-                        w.color = Color.RED
+                    if w.right.color == BLACK:
+                        w.left.color = BLACK
+                        w.color = RED
                         self._right_rotate(w)
-                        w = x.parent.right
-                    w.color = x.parent.color
-                    x.parent.color = Color.BLACK
-                    w.right.color = Color.BLACK
-                    self._left_rotate(x.parent)
+                        w = parent.right
+                    w.color = parent.color
+                    parent.color = BLACK
+                    w.right.color = BLACK
+                    self._left_rotate(parent)
                     x = self.root
             else:
-                w = x.parent.left
-                if w.color == Color.RED:
-                    w.color = Color.BLACK
-                    x.parent.color = Color.RED
-                    self._right_rotate(x.parent)
-                    w = x.parent.left
-                if w.right.color == Color.BLACK and w.left.color == Color.BLACK:
-                    w.color = Color.RED
-                    x = x.parent
+                w = parent.left
+                if w.color == RED:
+                    w.color = BLACK
+                    parent.color = RED
+                    self._right_rotate(parent)
+                    w = parent.left
+                if w.right.color == BLACK and w.left.color == BLACK:
+                    w.color = RED
+                    x = parent
+                    parent = x.parent
                 else:
-                    if w.left.color == Color.BLACK:
-                        w.right.color = Color.BLACK
-                        w.color = Color.RED
+                    if w.left.color == BLACK:
+                        w.right.color = BLACK
+                        w.color = RED
                         self._left_rotate(w)
-                        w = x.parent.left
-                    w.color = x.parent.color
-                    x.parent.color = Color.BLACK
-                    w.left.color = Color.BLACK
-                    self._right_rotate(x.parent)
+                        w = parent.left
+                    w.color = parent.color
+                    parent.color = BLACK
+                    w.left.color = BLACK
+                    self._right_rotate(parent)
                     x = self.root
-        x.color = Color.BLACK
+        if x != self.nil:
+            x.color = BLACK
 
     def _left_rotate(self, x):
         if x is None:
@@ -287,7 +474,8 @@ class RedBlackTree:
             x.parent.right = y
         y.left = x
         x.parent = y
-
+        y.size = x.size
+        x.size = x.left.size + x.right.size + 1
 
     def _right_rotate(self, y):
         if y is None:
@@ -307,6 +495,8 @@ class RedBlackTree:
             y.parent.left = x
         x.right = y
         y.parent = x
+        x.size = y.size
+        y.size = y.left.size + y.right.size + 1
 
     def _minimum(self, node):
         while node is not None and node.left != self.nil:
@@ -314,48 +504,424 @@ class RedBlackTree:
         return node
     
     def __iter__(self):
-        return self.KeysIterator(self.root, self.nil)
+        return self.KeysIterator(self._minimum(self.root) if self.root != self.nil else None, self.nil)
     
     def __reversed__(self):
-        return self.KeysIterator(self.root, self.nil, reverse=True)
+        return self.KeysIterator(self._maximum(self.root) if self.root != self.nil else None, self.nil, reverse=True)
+
+    def _start_node(self, start, inclusive, reverse):
+        if reverse:
+            if start is None:
+                return self._maximum(self.root) if self.root != self.nil else None
+            return self._floor(self.root, start) if inclusive else self._lower(self.root, start)
+        if start is None:
+            return self._minimum(self.root) if self.root != self.nil else None
+        return self._ceiling(self.root, start) if inclusive else self._higher(self.root, start)
+
+    def iter_from(self, key, inclusive=True, reverse=False):
+        """
+        Returns an iterator that starts at the first key at or after key (at
+        or before it when reverse is True), located in O(log n).
+        """
+        return self.KeysIterator(self._start_node(key, inclusive, reverse), self.nil, reverse)
+
+    def iter_batches(self, size, reverse=False, start=None, inclusive=True):
+        """
+        Yields the keys in lists of up to size keys, optionally starting at
+        start. Successors are found by following parent pointers inline, so a
+        full scan costs one generator step per batch rather than per key.
+        """
+        nil = self.nil
+        node = self._start_node(start, inclusive, reverse)
+        batch = []
+        append = batch.append
+        while node is not None:
+            append(node.key)
+            if reverse:
+                if node.left != nil:
+                    node = node.left
+                    while node.right != nil:
+                        node = node.right
+                else:
+                    parent = node.parent
+                    while parent is not None and node == parent.left:
+                        node = parent
+                        parent = node.parent
+                    node = parent
+            elif node.right != nil:
+                node = node.right
+                while node.left != nil:
+                    node = node.left
+            else:
+                parent = node.parent
+                while parent is not None and node == parent.right:
+                    node = parent
+                    parent = node.parent
+                node = parent
+            if len(batch) == size:
+                yield batch
+                batch = []
+                append = batch.append
+        if batch:
+            yield batch
 
     class KeysIterator:
+        """
+        Iterates from a starting node by following parent pointers, so it
+        needs O(1) memory and an amortized O(1) step per key.
+        """
+
         def __init__(self, node, nil, reverse=False):
-            self.stack = []
+            self.node = node
             self.nil = nil
             self.reverse = reverse
-            if reverse:
-                self._traverse_right(node)
-            else:
-                self._traverse_left(node)
+
         def __iter__(self):
             return self
 
         def __next__(self):
-            if not self.stack:
+            node = self.node
+            if node is None:
                 raise StopIteration
-            node = self.stack.pop()
             key = node.key
+            nil = self.nil
             if self.reverse:
-                self._traverse_right(node.left)
+                if node.left != nil:
+                    node = node.left
+                    while node.right != nil:
+                        node = node.right
+                else:
+                    parent = node.parent
+                    while parent is not None and node == parent.left:
+                        node = parent
+                        parent = node.parent
+                    node = parent
+            elif node.right != nil:
+                node = node.right
+                while node.left != nil:
+                    node = node.left
             else:
-                self._traverse_left(node.right)
+                parent = node.parent
+                while parent is not None and node == parent.right:
+                    node = parent
+                    parent = node.parent
+                node = parent
+            self.node = node
             return key
 
-        def _traverse_left(self, node):
-            while node != self.nil:
-                self.stack.append(node)
-                node = node.left
+    def load_sorted(self, keys):
+        """
+        Replaces the contents of the tree with keys, which must be a strictly
+        increasing sequence, in linear time and without any rotation.
+
+        The tree is built by recursive bisection, so every nil leaf sits at one
+        of two adjacent depths; nodes on the deepest, partially filled level are
+        colored red and all others black, which keeps the black-height uniform.
+        """
+        nil = self.nil
+        # Allocating millions of linked nodes would otherwise trigger repeated
+        # full collections that traverse the whole (still growing) tree.
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            nodes = [Node(key, BLACK, nil, nil) for key in keys]
+        finally:
+            if gc_enabled:
+                gc.enable()
+        self._link_sorted(nodes)
+
+    def _link_sorted(self, nodes):
+        """
+        Replaces the contents of the tree with nodes, black and in key order,
+        linked into a balanced tree (see load_sorted).
+        """
+        nil = self.nil
+        red_depth = (len(nodes) + 1).bit_length() - 1
+
+        def build(lo, hi, depth):
+            mid = (lo + hi) // 2
+            node = nodes[mid]
+            if depth == red_depth:
+                node.color = RED
+            if lo < mid:
+                child = build(lo, mid, depth + 1)
+                node.left = child
+                child.parent = node
+            if mid + 1 < hi:
+                child = build(mid + 1, hi, depth + 1)
+                node.right = child
+                child.parent = node
+            node.size = hi - lo
+            return node
 
-        def _traverse_right(self, node):
-            while node != self.nil:
-                self.stack.append(node)
-                node = node.right
+        self.root = build(0, len(nodes), 0) if nodes else nil
+        self._reset_ends()
+        self._mod_count += 1
+
+    def _black_height(self, node):
+        height = 0
+        while node != self.nil:
+            if node.color == BLACK:
+                height += 1
+            node = node.left
+        return height
+
+    def _join(self, left, left_height, node, right, right_height):
+        """
+        Joins two detached, black-rooted subtrees with black heights
+        left_height and right_height around node, where every key in left
+        is less than node.key and every key in right is greater. Grafts node
+        onto the spine of the taller tree at the matching black height and
+        repairs it with the insert fixup, in O(|left_height - right_height| + 1).
+        Returns the new root and its black height.
+        """
+        nil = self.nil
+        if left_height == right_height:
+            node.left = left
+            node.right = right
+            node.parent = None
+            node.color = BLACK
+            node.size = left.size + right.size + 1
+            if left != nil:
+                left.parent = node
+            if right != nil:
+                right.parent = node
+            return node, left_height + 1
+
+        if left_height > right_height:
+            parent, child, height = None, left, left_height
+            while child.color != BLACK or height != right_height:
+                if child.color == BLACK:
+                    height -= 1
+                parent, child = child, child.right
+            node.left = child
+            node.right = right
+            parent.right = node
+            taller, taller_height, attached = left, left_height, right
+        else:
+            parent, child, height = None, right, right_height
+            while child.color != BLACK or height != left_height:
+                if child.color == BLACK:
+                    height -= 1
+                parent, child = child, child.left
+            node.left = left
+            node.right = child
+            parent.left = node
+            taller, taller_height, attached = right, right_height, left
+
+        node.parent = parent
+        node.color = RED
+        node.size = node.left.size + node.right.size + 1
+        if node.left != nil:
+            node.left.parent = node
+        if node.right != nil:
+            node.right.parent = node
+        while parent is not None:
+            parent.size += attached.size + 1
+            parent = parent.parent
+        self.root = taller
+        z = self._insert_fixup(node)
+        # The fixup only raises the black height when it recolors its way up
+        # to the root.
+        return self.root, taller_height + (1 if z.parent is None else 0)
+
+    def _detach(self, node, height):
+        """
+        Makes node the black root of a standalone subtree; returns its black height.
+        """
+        if node == self.nil:
+            return 0
+        node.parent = None
+        if node.color == RED:
+            node.color = BLACK
+            return height + 1
+        return height
+
+    def _split(self, node, height, key):
+        nil = self.nil
+        if node == nil:
+            return nil, 0, None, nil, 0
+        child_height = height - (1 if node.color == BLACK else 0)
+        left, right = node.left, node.right
+        left_height = self._detach(left, child_height)
+        right_height = self._detach(right, child_height)
+        node.left = node.right = nil
+        if key == node.key:
+            node.parent = None
+            node.size = 1
+            return left, left_height, node, right, right_height
+        if key < node.key:
+            low, low_height, found, high, high_height = self._split(left, left_height, key)
+            high, high_height = self._join(high, high_height, node, right, right_height)
+            return low, low_height, found, high, high_height
+        low, low_height, found, high, high_height = self._split(right, right_height, key)
+        low, low_height = self._join(left, left_height, node, low, low_height)
+        return low, low_height, found, high, high_height
+
+    def _with_root(self, root):
+        tree = RedBlackTree(self.data_type)
+        tree.root = root
+        tree._reset_ends()
+        return tree
+
+    def split(self, key):
+        """
+        Splits the tree around key in O(log n) and returns (less, found, greater):
+        two trees holding the keys less than and greater than key, and the
+        stored key equal to key, or None. The nodes are moved, not copied, so
+        this tree is left empty.
+        """
+        root = self.root
+        low, _, found, high, _ = self._split(root, self._black_height(root), key)
+        self.root = self.nil
+        self._min = self._max = None
+        self._mod_count += 1
+        return self._with_root(low), None if found is None else found.key, self._with_root(high)
+
+    @staticmethod
+    def join(left, right):
+        """
+        Concatenates two trees where every key of left is less than every key
+        of right, in O(log n), and returns the result. The nodes are moved, so
+        both trees are left empty.
+        """
+        if left.root == NIL or right.root == NIL:
+            root = right.root if left.root == NIL else left.root
+        else:
+            if not left._maximum(left.root).key < right._minimum(right.root).key:
+                raise ValueError("every key of left must be less than every key of right")
+            pivot = right._minimum(right.root)
+            right._delete_node(pivot)
+            pivot.parent = None
+            pivot.left = pivot.right = NIL
+            root, _ = left._join(left.root, left._black_height(left.root), pivot,
+                                 right.root, right._black_height(right.root))
+        result = left._with_root(root)
+        for tree in (left, right):
+            tree.root = NIL
+            tree._min = tree._max = None
+            tree._mod_count += 1
+        return result
+
+    def cursor(self):
+        return self.Cursor(self)
+
+    class Cursor:
+        """
+        A finger into the tree that remembers the node of its last answer.
+
+        Each search climbs from the finger only until it reaches the smallest
+        subtree that must contain the answer, then descends from there, so a
+        query costs O(log d) where d is the distance (in elements) to the
+        previous answer. Any insertion or deletion in the tree moves the
+        finger back to the root before the next search.
+        """
+
+        def __init__(self, tree):
+            self.tree = tree
+            self.node = tree.root
+            self.mod_count = tree._mod_count
+
+        def _finger(self):
+            tree = self.tree
+            if self.mod_count != tree._mod_count:
+                self.node = tree.root
+                self.mod_count = tree._mod_count
+            return self.node
+
+        def _climb(self, node, key, upward):
+            """
+            Climbs from node to the smallest subtree that holds every element
+            between node.key and key. Returns that subtree's root and the
+            ancestor bounding it on the side of key (None at the root).
+            """
+            parent = node.parent
+            if upward:
+                while parent is not None:
+                    if node == parent.left and key < parent.key:
+                        return node, parent
+                    node = parent
+                    parent = node.parent
+            else:
+                while parent is not None:
+                    if node == parent.right and key > parent.key:
+                        return node, parent
+                    node = parent
+                    parent = node.parent
+            return node, None
+
+        def _move(self, found, start):
+            if found is None:
+                self.node = start
+                return None
+            self.node = found
+            return found.key
+
+        def floor(self, key):
+            tree = self.tree
+            node = self._finger()
+            if node == tree.nil:
+                return None
+            if key == node.key:
+                return self._move(node, node)
+            if key > node.key:
+                start, _ = self._climb(node, key, True)
+                return self._move(tree._floor(start, key), start)
+            start, bound = self._climb(node, key, False)
+            return self._move(tree._floor(start, key, bound), start)
+
+        def ceiling(self, key):
+            tree = self.tree
+            node = self._finger()
+            if node == tree.nil:
+                return None
+            if key == node.key:
+                return self._move(node, node)
+            if key < node.key:
+                start, _ = self._climb(node, key, False)
+                return self._move(tree._ceiling(start, key), start)
+            start, bound = self._climb(node, key, True)
+            return self._move(tree._ceiling(start, key, bound), start)
+
+        def higher(self, key):
+            tree = self.tree
+            node = self._finger()
+            if node == tree.nil:
+                return None
+            if key < node.key:
+                start, _ = self._climb(node, key, False)
+                return self._move(tree._higher(start, key), start)
+            start, bound = self._climb(node, key, True)
+            return self._move(tree._higher(start, key, bound), start)
+
+        def lower(self, key):
+            tree = self.tree
+            node = self._finger()
+            if node == tree.nil:
+                return None
+            if key > node.key:
+                start, _ = self._climb(node, key, True)
+                return self._move(tree._lower(start, key), start)
+            start, bound = self._climb(node, key, False)
+            return self._move(tree._lower(start, key, bound), start)
+
+        def contains(self, key):
+            tree = self.tree
+            node = self._finger()
+            if node == tree.nil:
+                return False
+            if key == node.key:
+                return True
+            start, _ = self._climb(node, key, key > node.key)
+            found = tree._lookup(start, key)
+            if found == tree.nil:
+                self.node = start
+                return False
+            self.node = found
+            return True
 
     def clone(self):
-        new_tree = RedBlackTree(self.data_type)
-        new_tree.root = self._clone_recursive(self.root, new_tree.nil)
-        return new_tree
+        return self._with_root(self._clone_recursive(self.root, self.nil))
 
     def _clone_recursive(self, node, nil):
         if node is None:
@@ -363,9 +929,9 @@ class RedBlackTree:
         if node.key is None:
             return nil
         new_node = Node(
-            data_type=node.data_type,
             key=node.key,
             color=node.color,
+            size=node.size,
             left=self._clone_recursive(node.left, nil),
             right=self._clone_recursive(node.right, nil),
             parent=nil if node.parent == nil else node.parent,
@@ -0,0 +1,555 @@
+import random
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from TreeSet import TreeSet
+from Exceptions import *
+
+def _merge_batch(keys, batch):
+    """
+    Returns the ascending union of a shard's ascending elements and an unordered batch.
+    """
+    return TreeSet._merge(keys, TreeSet._sorted_unique(batch), True, True, True)
+
+def _merge_keys(a, b, keep_a, keep_both, keep_b):
+    return TreeSet._merge(a, b, keep_a, keep_both, keep_b)
+
+def _filter_keys(predicate, keys):
+    return [key for key in keys if predicate(key)]
+
+def _apply(function, keys):
+    return function(keys)
+
+class ShardedTreeSet:
+    """
+    A sorted set that range-partitions its elements across several independent TreeSet shards.
+
+    Shard i holds the elements from splitter i - 1 (inclusive) up to splitter i (exclusive). The
+    splitters are picked by sampling the first batch added and are recomputed as exact quantiles
+    whenever a shard holds more than skew times its fair share, either because it grew or because
+    removals drained the others. Point operations go to a single shard;
+    navigation and ordered iteration continue into the neighbouring shards when a shard runs out.
+
+    With workers set, bulk addAll, the set algebra and the full scans (mapShards, filter) run one task
+    per shard in a ProcessPoolExecutor. Elements travel to the workers as sorted lists and come back
+    as sorted lists that are loaded in linear time, so only the per-shard merging and scanning runs
+    in parallel. Functions passed to mapShards and filter must then be picklable. Call close(), or use
+    the set as a context manager, to shut the pool down.
+    """
+
+    _SAMPLES_PER_SHARD = 32
+    _MIN_SHARD_SIZE = 64
+
+    def __init__(self, data_type, collection=None, shards=8, workers=None, skew=2.0, backend="rbtree", validation="cached"):
+        """
+        Initializes a new ShardedTreeSet.
+
+        Args:
+            data_type (type): The type of elements to be stored in the set.
+            collection (iterable, optional): A collection of elements to be added to the set.
+            shards (int, optional): The maximum number of shards. Defaults to 8.
+            workers (int, optional): The number of worker processes for bulk operations, or None to run
+                them in this process. Defaults to None.
+            skew (float, optional): How many times its fair share of the elements a shard may hold before
+                the set is rebalanced; must be greater than 1. Defaults to 2.
+            backend (str, optional): The TreeSet backend of the shards. Defaults to "rbtree".
+            validation (str, optional): The TreeSet validation mode of the shards. Defaults to "cached".
+
+        Raises:
+            TypeError: If data_type is not a valid class or if an element of the collection is of the wrong type.
+            ValueError: If backend or validation is not a known name, or shards, workers or skew is out of range.
+        """
+        if shards < 1:
+            raise ValueError(f"shards must be at least 1, {shards} provided")
+        if workers is not None and workers < 1:
+            raise ValueError(f"workers must be at least 1, {workers} provided")
+        if not skew > 1:
+            raise ValueError(f"skew must be greater than 1, {skew} provided")
+        self._template = TreeSet(data_type, backend=backend, validation=validation)
+        self._type = data_type
+        self._shard_count = shards
+        self._workers = workers
+        self._skew = skew
+        self._executor = None
+        self._splitters = []
+        self._shards = [self._template._empty_copy()]
+        self._size = 0
+        if collection is not None:
+            self.addAll(collection)
+
+    def _index(self, key):
+        """
+        Validates a key and returns the index of the shard whose range contains it.
+        """
+        self._template._check(key)
+        return bisect_right(self._splitters, key)
+
+    def _map(self, function, *iterables):
+        """
+        Applies function to the items of iterables, in the worker pool if there is one.
+
+        Returns:
+            list: The results in order.
+        """
+        if self._workers is None:
+            return list(map(function, *iterables))
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self._workers)
+        return list(self._executor.map(function, *iterables))
+
+    def _target_count(self, size):
+        """
+        Returns how many shards size elements should be spread over, so that no shard is below
+        _MIN_SHARD_SIZE unless there is only one.
+        """
+        return max(1, min(self._shard_count, -(-size // self._MIN_SHARD_SIZE)))
+
+    def _sample_splitters(self, keys):
+        """
+        Picks splitters for an unordered batch from a random sample of it.
+
+        Args:
+            keys (list): The batch, already validated.
+
+        Returns:
+            list: The distinct splitters in ascending order.
+        """
+        count = self._target_count(len(keys))
+        sample = TreeSet._sorted_unique(random.sample(keys, min(len(keys), count * self._SAMPLES_PER_SHARD)))
+        return TreeSet._sorted_unique([sample[len(sample) * i // count] for i in range(1, count)])
+
+    def _partition(self, keys):
+        """
+        Splits an ascending list of elements into one slice per shard.
+        """
+        bounds = [0] + [bisect_left(keys, splitter) for splitter in self._splitters] + [len(keys)]
+        return [keys[lo:hi] for lo, hi in zip(bounds, bounds[1:])]
+
+    def _shard_keys(self):
+        return [list(shard._rb) for shard in self._shards]
+
+    def _load_shards(self, key_lists):
+        """
+        Replaces the shards with new ones holding the given ascending lists.
+        """
+        self._shards = [self._template._with_keys(keys) for keys in key_lists]
+        self._size = sum(len(keys) for keys in key_lists)
+
+    def _with_shards(self, key_lists):
+        """
+        Creates a ShardedTreeSet configured like this one, with the same splitters and the given shard contents.
+        """
+        result = ShardedTreeSet(self._type, shards=self._shard_count, workers=self._workers, skew=self._skew,
+                                backend=self._template._backend, validation=self._template._validation)
+        result._template._valid_types = self._template._valid_types.copy()
+        result._splitters = self._splitters.copy()
+        result._load_shards(key_lists)
+        return result
+
+    def _rebalance_if_skewed(self, shard=None):
+        """
+        Rebalances the set if shard, by default the largest one, holds more than skew times its fair share.
+        """
+        if shard is None:
+            shard = max(self._shards, key=lambda shard: shard._size)
+        fair = max(self._size / self._shard_count, self._MIN_SHARD_SIZE)
+        if shard._size > self._skew * fair:
+            self.rebalance()
+
+    def rebalance(self):
+        """
+        Redistributes the elements evenly, with splitters at the exact quantiles, in O(n).
+        """
+        keys = list(self)
+        count = self._target_count(len(keys))
+        bounds = [len(keys) * i // count for i in range(count + 1)]
+        self._splitters = [keys[i] for i in bounds[1:-1]]
+        self._load_shards([keys[lo:hi] for lo, hi in zip(bounds, bounds[1:])])
+
+    def shardSizes(self):
+        """
+        Returns the number of elements in each shard, in key order.
+
+        Returns:
+            list: The shard sizes.
+        """
+        return [shard._size for shard in self._shards]
+
+    def add(self, key):
+        """
+        Adds an element to the set.
+
+        Args:
+            key: The element to add.
+
+        Returns:
+            bool: True if the element was added, False if it was already present.
+        """
+        shard = self._shards[self._index(key)]
+        if not shard.add(key):
+            return False
+        self._size += 1
+        self._rebalance_if_skewed(shard)
+        return True
+
+    def addAll(self, keys):
+        """
+        Adds a collection of elements to the set, merging each shard's part of it in parallel when the
+        set has workers.
+
+        Args:
+            keys (iterable): The collection of elements to add.
+
+        Returns:
+            bool: True if the set was modified, False otherwise.
+        """
+        keys = list(keys)
+        self._template._check_all(keys)
+        if not keys:
+            return False
+        if self._size == 0:
+            self._splitters = self._sample_splitters(keys)
+            self._shards = [self._template._empty_copy() for _ in range(len(self._splitters) + 1)]
+        splitters = self._splitters
+        parts = [[] for _ in self._shards]
+        for key in keys:
+            parts[bisect_right(splitters, key)].append(key)
+        size = self._size
+        if self._workers is None:
+            for shard, part in zip(self._shards, parts):
+                if part:
+                    shard.addAll(part)
+            self._size = sum(self.shardSizes())
+        else:
+            touched = [i for i, part in enumerate(parts) if part]
+            merged = self._map(_merge_batch, [list(self._shards[i]._rb) for i in touched], [parts[i] for i in touched])
+            for i, keys in zip(touched, merged):
+                self._shards[i] = self._template._with_keys(keys)
+            self._size = sum(self.shardSizes())
+        self._rebalance_if_skewed()
+        return self._size != size
+
+    def remove(self, key):
+        """
+        Removes an element from the set.
+
+        Args:
+            key: The element to remove.
+
+        Returns:
+            bool: True if the element was removed, False if it was not present.
+        """
+        if not self._shards[self._index(key)].remove(key):
+            return False
+        self._size -= 1
+        self._rebalance_if_skewed()
+        return True
+
+    def contains(self, key):
+        """
+        Checks if the set contains a specific element.
+
+        Args:
+            key: The element to check for.
+
+        Returns:
+            bool: True if the element is present, False otherwise.
+        """
+        return self._shards[self._index(key)].contains(key)
+
+    def size(self):
+        """
+        Returns the number of elements in the set.
+
+        Returns:
+            int: The number of elements in the set.
+        """
+        return self._size
+
+    def isEmpty(self):
+        """
+        Checks if the set is empty.
+
+        Returns:
+            bool: True if the set is empty, False otherwise.
+        """
+        return self._size == 0
+
+    def clear(self):
+        """
+        Removes all elements from the set and discards the splitters.
+        """
+        self._splitters = []
+        self._shards = [self._template._empty_copy()]
+        self._size = 0
+
+    def first(self):
+        """
+        Retrieves the first (lowest) element.
+
+        Returns:
+            The first element.
+
+        Raises:
+            NoSuchElementException: If the set is empty.
+        """
+        for shard in self._shards:
+            if shard._size:
+                return shard.first()
+        raise NoSuchElementException()
+
+    def last(self):
+        """
+        Retrieves the last (highest) element.
+
+        Returns:
+            The last element.
+
+        Raises:
+            NoSuchElementException: If the set is empty.
+        """
+        for shard in reversed(self._shards):
+            if shard._size:
+                return shard.last()
+        raise NoSuchElementException()
+
+    def pollFirst(self):
+        """
+        Retrieves and removes the first (lowest) element, or returns None if the set is empty.
+
+        Returns:
+            The first element, or None if the set is empty.
+        """
+        for shard in self._shards:
+            if shard._size:
+                key = shard.pollFirst()
+                self._size -= 1
+                self._rebalance_if_skewed()
+                return key
+        return None
+
+    def pollLast(self):
+        """
+        Retrieves and removes the last (highest) element, or returns None if the set is empty.
+
+        Returns:
+            The last element, or None if the set is empty.
+        """
+        for shard in reversed(self._shards):
+            if shard._size:
+                key = shard.pollLast()
+                self._size -= 1
+                self._rebalance_if_skewed()
+                return key
+        return None
+
+    def _below(self, index, result):
+        """
+        Returns result, or if it is None the last element of the nearest non-empty shard before index.
+        """
+        while result is None and index > 0:
+            index -= 1
+            if self._shards[index]._size:
+                return self._shards[index].last()
+        return result
+
+    def _above(self, index, result):
+        """
+        Returns result, or if it is None the first element of the nearest non-empty shard after index.
+        """
+        while result is None and index < len(self._shards) - 1:
+            index += 1
+            if self._shards[index]._size:
+                return self._shards[index].first()
+        return result
+
+    def floor(self, key):
+        """
+        Retrieves the greatest element less than or equal to the given element.
+
+        Args:
+            key: The element to compare.
+
+        Returns:
+            The matching element, or None if there is no such element.
+        """
+        index = self._index(key)
+        return self._below(index, self._shards[index].floor(key))
+
+    def lower(self, key):
+        """
+        Retrieves the greatest element strictly less than the given element.
+
+        Args:
+            key: The element to compare.
+
+        Returns:
+            The matching element, or None if there is no such element.
+        """
+        index = self._index(key)
+        return self._below(index, self._shards[index].lower(key))
+
+    def ceiling(self, key):
+        """
+        Retrieves the least element greater than or equal to the given element.
+
+        Args:
+            key: The element to compare.
+
+        Returns:
+            The matching element, or None if there is no such element.
+        """
+        index = self._index(key)
+        return self._above(index, self._shards[index].ceiling(key))
+
+    def higher(self, key):
+        """
+        Retrieves the least element strictly greater than the given element.
+
+        Args:
+            key: The element to compare.
+
+        Returns:
+            The matching element, or None if there is no such element.
+        """
+        index = self._index(key)
+        return self._above(index, self._shards[index].higher(key))
+
+    def __iter__(self):
+        """
+        Returns an iterator over the elements in ascending order, shard after shard.
+
+        Returns:
+            iterator: An iterator over the elements in ascending order.
+        """
+        for shard in self._shards:
+            yield from shard
+
+    def iterator(self):
+        """
+        Returns an iterator over the elements in ascending order.
+
+        Returns:
+            iterator: An iterator over the elements in ascending order.
+        """
+        return self.__iter__()
+
+    def __reversed__(self):
+        """
+        Returns an iterator over the elements in descending order, shard after shard.
+
+        Returns:
+            iterator: An iterator over the elements in descending order.
+        """
+        for shard in reversed(self._shards):
+            yield from reversed(shard)
+
+    def descendingIterator(self):
+        """
+        Returns an iterator over the elements in descending order.
+
+        Returns:
+            iterator: An iterator over the elements in descending order.
+        """
+        return self.__reversed__()
+
+    def _algebra(self, other, keep_a, keep_both, keep_b):
+        """
+        Merges each shard with the part of another collection in its range, one task per shard.
+        """
+        if isinstance(other, ShardedTreeSet):
+            keys = list(other)
+            if not issubclass(other._type, self._type):
+                self._template._check_all(keys)
+        else:
+            keys = self._template._other_keys(other)
+        merged = self._map(_merge_keys, self._shard_keys(), self._partition(keys),
+                           repeat(keep_a), repeat(keep_both), repeat(keep_b))
+        return self._with_shards(merged)
+
+    def union(self, other):
+        """
+        Returns a new set with the elements of this set and of another collection.
+
+        Args:
+            other (iterable): A ShardedTreeSet, a TreeSet or any iterable of elements.
+
+        Returns:
+            ShardedTreeSet: The union, with this set's splitters.
+        """
+        return self._algebra(other, True, True, True)
+
+    def intersection(self, other):
+        """
+        Returns a new set with the elements present both in this set and in another collection.
+
+        Args:
+            other (iterable): A ShardedTreeSet, a TreeSet or any iterable of elements.
+
+        Returns:
+            ShardedTreeSet: The intersection, with this set's splitters.
+        """
+        return self._algebra(other, False, True, False)
+
+    def difference(self, other):
+        """
+        Returns a new set with the elements of this set that are not in another collection.
+
+        Args:
+            other (iterable): A ShardedTreeSet, a TreeSet or any iterable of elements.
+
+        Returns:
+            ShardedTreeSet: The difference, with this set's splitters.
+        """
+        return self._algebra(other, True, False, False)
+
+    def symmetricDifference(self, other):
+        """
+        Returns a new set with the elements found in exactly one of this set and another collection.
+
+        Args:
+            other (iterable): A ShardedTreeSet, a TreeSet or any iterable of elements.
+
+        Returns:
+            ShardedTreeSet: The symmetric difference, with this set's splitters.
+        """
+        return self._algebra(other, True, False, True)
+
+    def mapShards(self, function):
+        """
+        Applies a function to the ascending list of elements of each shard, in parallel when the set has workers.
+
+        Args:
+            function (callable): Takes a list of elements; must be picklable when the set has workers.
+
+        Returns:
+            list: The results, one per shard in key order.
+        """
+        return self._map(_apply, repeat(function), self._shard_keys())
+
+    def filter(self, predicate):
+        """
+        Returns a new set with the elements that satisfy a predicate, scanning the shards in parallel
+        when the set has workers.
+
+        Args:
+            predicate (callable): Takes an element; must be picklable when the set has workers.
+
+        Returns:
+            ShardedTreeSet: The matching elements, with this set's splitters.
+        """
+        return self._with_shards(self._map(_filter_keys, repeat(predicate), self._shard_keys()))
+
+    def close(self):
+        """
+        Shuts down the worker pool, if one was started.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
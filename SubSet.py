@@ -0,0 +1,460 @@
+from Exceptions import *
+from InstrumentedRedBlackTree import InstrumentedRedBlackTree
+
+class SubSet:
+    """
+    A live, bounded and optionally descending view of a TreeSet, as returned by subSet, headSet,
+    tailSet and descendingSet.
+
+    The view copies nothing: every query goes to the backing set's tree and is clamped to the view's
+    bounds, iteration seeks to the first element in range in O(log n) and stops at the other bound,
+    and changes made through either the view or the set are visible in both.
+    """
+
+    def __init__(self, tree_set, low=None, lowInclusive=True, high=None, highInclusive=True, descending=False):
+        """
+        Initializes a view over a TreeSet.
+
+        Args:
+            tree_set (TreeSet): The backing set.
+            low (optional): The low bound in the set's order, or None if unbounded.
+            lowInclusive (bool, optional): Whether the low bound itself is in range.
+            high (optional): The high bound in the set's order, or None if unbounded.
+            highInclusive (bool, optional): Whether the high bound itself is in range.
+            descending (bool, optional): Whether the view presents elements in descending order.
+        """
+        self._set = tree_set
+        self._low = low
+        self._low_inclusive = lowInclusive
+        self._high = high
+        self._high_inclusive = highInclusive
+        self._descending = descending
+        # None in natural order; otherwise the set's comparison, used for every bound check.
+        self._before = tree_set._before
+
+    def _too_low(self, key):
+        low = self._low
+        if low is None:
+            return False
+        before = self._before
+        if before is None:
+            return key < low or (key == low and not self._low_inclusive)
+        return before(key, low) or (not self._low_inclusive and not before(low, key))
+
+    def _too_high(self, key):
+        high = self._high
+        if high is None:
+            return False
+        before = self._before
+        if before is None:
+            return key > high or (key == high and not self._high_inclusive)
+        return before(high, key) or (not self._high_inclusive and not before(key, high))
+
+    def _in_range(self, key):
+        return not self._too_low(key) and not self._too_high(key)
+
+    def _in_closed_range(self, key):
+        before = self._before
+        if before is None:
+            return (self._low is None or not key < self._low) and (self._high is None or not key > self._high)
+        return ((self._low is None or not before(key, self._low))
+                and (self._high is None or not before(self._high, key)))
+
+    def _lowest(self):
+        """
+        Returns the first element in range in the set's order, or None.
+        """
+        tree = self._set._rb
+        if self._low is None:
+            key = tree.first()
+        elif self._low_inclusive:
+            key = tree.ceiling(self._low)
+        else:
+            key = tree.higher(self._low)
+        return None if key is None or self._too_high(key) else key
+
+    def _highest(self):
+        """
+        Returns the last element in range in the set's order, or None.
+        """
+        tree = self._set._rb
+        if self._high is None:
+            key = tree.last()
+        elif self._high_inclusive:
+            key = tree.floor(self._high)
+        else:
+            key = tree.lower(self._high)
+        return None if key is None or self._too_low(key) else key
+
+    def _ceiling(self, key):
+        if self._too_low(key):
+            return self._lowest()
+        result = self._set._rb.ceiling(key)
+        return None if result is None or self._too_high(result) else result
+
+    def _higher(self, key):
+        if self._too_low(key):
+            return self._lowest()
+        result = self._set._rb.higher(key)
+        return None if result is None or self._too_high(result) else result
+
+    def _floor(self, key):
+        if self._too_high(key):
+            return self._highest()
+        result = self._set._rb.floor(key)
+        return None if result is None or self._too_low(result) else result
+
+    def _lower(self, key):
+        if self._too_high(key):
+            return self._highest()
+        result = self._set._rb.lower(key)
+        return None if result is None or self._too_low(result) else result
+
+    def _ascending(self):
+        tree = self._set._rb
+        keys = iter(tree) if self._low is None else tree.iter_from(self._low, self._low_inclusive)
+        if self._high is None:
+            yield from keys
+            return
+        for key in keys:
+            if self._too_high(key):
+                return
+            yield key
+
+    def _descending_keys(self):
+        tree = self._set._rb
+        keys = reversed(tree) if self._high is None else tree.iter_from(self._high, self._high_inclusive, reverse=True)
+        if self._low is None:
+            yield from keys
+            return
+        for key in keys:
+            if self._too_low(key):
+                return
+            yield key
+
+    def add(self, key):
+        """
+        Adds an element to the backing set.
+
+        Args:
+            key: The element to add.
+
+        Returns:
+            bool: True if the element was added, False if it was already present.
+
+        Raises:
+            IllegalArgumentException: If the element is outside the view's range.
+        """
+        self._set._check(key)
+        if not self._in_range(key):
+            raise IllegalArgumentException("key out of range")
+        return self._set.add(key)
+
+    def remove(self, key):
+        """
+        Removes an element from the backing set if it is within the view's range.
+
+        Args:
+            key: The element to remove.
+
+        Returns:
+            bool: True if the element was removed, False if it was not present in the view.
+        """
+        self._set._check(key)
+        if not self._in_range(key):
+            return False
+        return self._set.remove(key)
+
+    def contains(self, key):
+        """
+        Checks if the view contains a specific element.
+
+        Args:
+            key: The element to check for.
+
+        Returns:
+            bool: True if the element is present and within range, False otherwise.
+        """
+        self._set._check(key)
+        return self._in_range(key) and self._set._rb.contains(key)
+
+    def clear(self):
+        """
+        Removes every element within the view's range from the backing set.
+
+        On backends that support split and join this cuts the range out in O(log n) plus the cost of
+        discarding the removed nodes; otherwise the elements are removed one by one.
+        """
+        tree_set = self._set
+        tree = tree_set._rb
+        if not hasattr(tree, "split"):
+            for key in list(self._ascending()):
+                tree_set.remove(key)
+            return
+        empty = tree._with_root(tree.nil)
+        kept = []
+        if self._low is None:
+            low, rest = empty, tree
+        else:
+            low, found, rest = tree.split(self._low)
+            kept.append(found)
+        if self._high is None:
+            high = tree._with_root(tree.nil)
+        else:
+            _, found, high = rest.split(self._high)
+            kept.append(found)
+        tree = type(tree).join(low, high)
+        for key in kept:
+            if key is not None and not self._in_range(key):
+                tree.insert(key)
+        if tree_set._instrumentation is not None:
+            InstrumentedRedBlackTree.enable(tree, *tree_set._instrumentation)
+        tree_set._rb = tree
+        tree_set._size = tree.root.size
+
+    def size(self):
+        """
+        Returns the number of elements in the view, in O(log n) when the backend keeps subtree sizes.
+
+        Returns:
+            int: The number of elements in range.
+        """
+        tree = self._set._rb
+        if not hasattr(tree, "rank"):
+            return sum(1 for _ in self._ascending())
+        if self._high is None:
+            high = self._set._size
+        else:
+            high = tree.rank(self._high, self._high_inclusive)
+        low = 0 if self._low is None else tree.rank(self._low, not self._low_inclusive)
+        return max(high - low, 0)
+
+    def isEmpty(self):
+        """
+        Checks if the view is empty.
+
+        Returns:
+            bool: True if no element of the backing set is within range.
+        """
+        return self._lowest() is None
+
+    def first(self):
+        """
+        Retrieves the first element of the view.
+
+        Returns:
+            The first element in the view's order.
+
+        Raises:
+            NoSuchElementException: If the view is empty.
+        """
+        key = self._highest() if self._descending else self._lowest()
+        if key is None:
+            raise NoSuchElementException()
+        return key
+
+    def last(self):
+        """
+        Retrieves the last element of the view.
+
+        Returns:
+            The last element in the view's order.
+
+        Raises:
+            NoSuchElementException: If the view is empty.
+        """
+        key = self._lowest() if self._descending else self._highest()
+        if key is None:
+            raise NoSuchElementException()
+        return key
+
+    def floor(self, key):
+        """
+        Retrieves the greatest element in the view less than or equal to the given element, in the view's order.
+
+        Args:
+            key: The element to compare.
+
+        Returns:
+            The matching element, or None if there is no such element.
+        """
+        self._set._check(key)
+        return self._ceiling(key) if self._descending else self._floor(key)
+
+    def ceiling(self, key):
+        """
+        Retrieves the least element in the view greater than or equal to the given element, in the view's order.
+
+        Args:
+            key: The element to compare.
+
+        Returns:
+            The matching element, or None if there is no such element.
+        """
+        self._set._check(key)
+        return self._floor(key) if self._descending else self._ceiling(key)
+
+    def higher(self, key):
+        """
+        Retrieves the least element in the view strictly greater than the given element, in the view's order.
+
+        Args:
+            key: The element to compare.
+
+        Returns:
+            The matching element, or None if there is no such element.
+        """
+        self._set._check(key)
+        return self._lower(key) if self._descending else self._higher(key)
+
+    def lower(self, key):
+        """
+        Retrieves the greatest element in the view strictly less than the given element, in the view's order.
+
+        Args:
+            key: The element to compare.
+
+        Returns:
+            The matching element, or None if there is no such element.
+        """
+        self._set._check(key)
+        return self._higher(key) if self._descending else self._lower(key)
+
+    def pollFirst(self):
+        """
+        Retrieves and removes the first element of the view, or returns None if the view is empty.
+
+        Returns:
+            The first element, or None if the view is empty.
+        """
+        key = self._highest() if self._descending else self._lowest()
+        if key is not None:
+            self._set.remove(key)
+        return key
+
+    def pollLast(self):
+        """
+        Retrieves and removes the last element of the view, or returns None if the view is empty.
+
+        Returns:
+            The last element, or None if the view is empty.
+        """
+        key = self._lowest() if self._descending else self._highest()
+        if key is not None:
+            self._set.remove(key)
+        return key
+
+    def __iter__(self):
+        """
+        Returns an iterator over the elements of the view in the view's order.
+
+        Returns:
+            iterator: An iterator over the elements in range.
+        """
+        return self._descending_keys() if self._descending else self._ascending()
+
+    def iterator(self):
+        """
+        Returns an iterator over the elements of the view in the view's order.
+
+        Returns:
+            iterator: An iterator over the elements in range.
+        """
+        return self.__iter__()
+
+    def __reversed__(self):
+        """
+        Returns an iterator over the elements of the view in reverse of the view's order.
+
+        Returns:
+            iterator: An iterator over the elements in range.
+        """
+        return self._ascending() if self._descending else self._descending_keys()
+
+    def descendingIterator(self):
+        """
+        Returns an iterator over the elements of the view in reverse of the view's order.
+
+        Returns:
+            iterator: An iterator over the elements in range.
+        """
+        return self.__reversed__()
+
+    def _view(self, fromElement, fromInclusive, toElement, toInclusive):
+        """
+        Creates a narrower view; the bounds are given in this view's order and None means unbounded.
+
+        Raises:
+            IllegalArgumentException: If a bound lies outside this view or the bounds are out of order.
+        """
+        for key, inclusive in ((fromElement, fromInclusive), (toElement, toInclusive)):
+            if key is not None:
+                self._set._check(key)
+                if not (self._in_range(key) if inclusive else self._in_closed_range(key)):
+                    raise IllegalArgumentException("key out of range")
+        if self._descending:
+            fromElement, fromInclusive, toElement, toInclusive = toElement, toInclusive, fromElement, fromInclusive
+        if fromElement is not None and toElement is not None and self._set._precedes(toElement, fromElement):
+            raise IllegalArgumentException("fromKey > toKey")
+        low, lowInclusive = (self._low, self._low_inclusive) if fromElement is None else (fromElement, fromInclusive)
+        high, highInclusive = (self._high, self._high_inclusive) if toElement is None else (toElement, toInclusive)
+        return SubSet(self._set, low, lowInclusive, high, highInclusive, self._descending)
+
+    def subSet(self, fromElement, toElement, fromInclusive=True, toInclusive=False):
+        """
+        Returns a view of the portion of this view from fromElement to toElement.
+
+        Args:
+            fromElement: The first endpoint, in this view's order.
+            toElement: The second endpoint, in this view's order.
+            fromInclusive (bool, optional): Whether fromElement is included. Defaults to True.
+            toInclusive (bool, optional): Whether toElement is included. Defaults to False.
+
+        Returns:
+            SubSet: The narrower view.
+
+        Raises:
+            IllegalArgumentException: If an endpoint lies outside this view or the endpoints are out of order.
+        """
+        return self._view(fromElement, fromInclusive, toElement, toInclusive)
+
+    def headSet(self, toElement, inclusive=False):
+        """
+        Returns a view of the portion of this view before toElement.
+
+        Args:
+            toElement: The high endpoint, in this view's order.
+            inclusive (bool, optional): Whether toElement is included. Defaults to False.
+
+        Returns:
+            SubSet: The narrower view.
+
+        Raises:
+            IllegalArgumentException: If toElement lies outside this view.
+        """
+        return self._view(None, True, toElement, inclusive)
+
+    def tailSet(self, fromElement, inclusive=True):
+        """
+        Returns a view of the portion of this view from fromElement onwards.
+
+        Args:
+            fromElement: The low endpoint, in this view's order.
+            inclusive (bool, optional): Whether fromElement is included. Defaults to True.
+
+        Returns:
+            SubSet: The narrower view.
+
+        Raises:
+            IllegalArgumentException: If fromElement lies outside this view.
+        """
+        return self._view(fromElement, inclusive, None, True)
+
+    def descendingSet(self):
+        """
+        Returns a view of the same elements in the opposite order.
+
+        Returns:
+            SubSet: The reversed view.
+        """
+        return SubSet(self._set, self._low, self._low_inclusive, self._high, self._high_inclusive, not self._descending)
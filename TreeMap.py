@@ -0,0 +1,405 @@
+import gc
+from RedBlackTree import RedBlackTree, ValueNode, BLACK
+from TreeSet import check_key
+from Exceptions import *
+
+class TreeMap:
+    """
+    This TreeMap is an implementation of the Java TreeMap that keeps its keys ordered in a Red-Black Tree.
+
+    Each node is a ValueNode holding a key and its value, so an ordered lookup such as floorEntry finds
+    the value in the same descent that finds the key. Entries are returned as (key, value) tuples.
+    """
+
+    def __init__(self, key_type, mapping=None):
+        """
+        Initializes a new TreeMap.
+
+        Args:
+            key_type (type): The type of the keys to be stored in the TreeMap.
+            mapping (optional): A dict, a TreeMap or an iterable of (key, value) pairs to copy.
+
+        Raises:
+            TypeError: If key_type is not a class or if a key of the mapping is of the wrong type.
+        """
+        if not isinstance(key_type, type):
+            raise TypeError("TreeMap must be provided a class")
+        self._type = key_type
+        self._valid_types = set()
+        self._tree = RedBlackTree(key_type)
+        if mapping is not None:
+            self.putAll(mapping)
+
+    def _check(self, key):
+        """
+        Checks that the key is a non-null, comparable instance of the key type, once per concrete type.
+
+        Args:
+            key: The key to check.
+
+        Raises:
+            NullPointerException: If the key is None.
+            TypeError: If the key is not an instance of the TreeMap's key type.
+            ClassCastException: If the key is not comparable.
+        """
+        if type(key) not in self._valid_types:
+            check_key(key, self._type, self._valid_types, kind="Key")
+
+    @staticmethod
+    def _entry(node):
+        return None if node is None else (node.key, node.value)
+
+    def _node(self, key):
+        self._check(key)
+        node = self._tree._lookup(self._tree.root, key)
+        return None if node == self._tree.nil else node
+
+    def put(self, key, value):
+        """
+        Associates a value with a key, replacing the previous value if the key is already present.
+
+        Args:
+            key: The key.
+            value: The value to store.
+
+        Returns:
+            The previous value of the key, or None if the key was not present.
+        """
+        self._check(key)
+        tree = self._tree
+        nil = tree.nil
+        parent = None
+        node = tree.root
+        left = False
+        while node != nil:
+            parent = node
+            if key < node.key:
+                node = node.left
+                left = True
+            elif key > node.key:
+                node = node.right
+                left = False
+            else:
+                previous = node.value
+                node.value = value
+                return previous
+        tree._link(ValueNode(key, value), parent, left)
+        return None
+
+    def putAll(self, mapping):
+        """
+        Copies every entry of a mapping into this TreeMap.
+
+        An empty TreeMap is built in linear time after sorting the entries, instead of one insertion
+        at a time. When a key occurs more than once, the last value wins.
+
+        Args:
+            mapping: A dict, a TreeMap or an iterable of (key, value) pairs.
+        """
+        items = list(mapping.items()) if hasattr(mapping, "items") else list(mapping)
+        for key, _ in items:
+            self._check(key)
+        if self._tree.root != self._tree.nil:
+            for key, value in items:
+                self.put(key, value)
+            return
+        if not all(a[0] < b[0] for a, b in zip(items, items[1:])):
+            items.sort(key=lambda item: item[0])
+            unique = items[:1]
+            for item in items[1:]:
+                if unique[-1][0] < item[0]:
+                    unique.append(item)
+                else:
+                    unique[-1] = item
+            items = unique
+        nil = self._tree.nil
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            nodes = [ValueNode(key, value, BLACK, nil, nil) for key, value in items]
+        finally:
+            if gc_enabled:
+                gc.enable()
+        self._tree._link_sorted(nodes)
+
+    def get(self, key, default=None):
+        """
+        Retrieves the value associated with a key.
+
+        Args:
+            key: The key to look up.
+            default (optional): The value returned when the key is not present.
+
+        Returns:
+            The value of the key, or default if the key is not present.
+        """
+        node = self._node(key)
+        return default if node is None else node.value
+
+    def containsKey(self, key):
+        """
+        Checks if the TreeMap contains a key.
+
+        Args:
+            key: The key to check for.
+
+        Returns:
+            bool: True if the key is present, False otherwise.
+        """
+        return self._node(key) is not None
+
+    def remove(self, key):
+        """
+        Removes a key and its value.
+
+        Args:
+            key: The key to remove.
+
+        Returns:
+            The value the key had, or None if the key was not present.
+        """
+        node = self._node(key)
+        if node is None:
+            return None
+        self._tree._delete_node(node)
+        return node.value
+
+    def size(self):
+        """
+        Returns the number of entries in the TreeMap.
+
+        Returns:
+            int: The number of entries.
+        """
+        return self._tree.root.size
+
+    def isEmpty(self):
+        """
+        Checks if the TreeMap is empty.
+
+        Returns:
+            bool: True if the TreeMap has no entries, False otherwise.
+        """
+        return self._tree.root == self._tree.nil
+
+    def clear(self):
+        """
+        Removes all entries from the TreeMap.
+        """
+        self._tree = RedBlackTree(self._type)
+
+    def clone(self):
+        """
+        Creates a shallow copy of the TreeMap in linear time.
+
+        Returns:
+            TreeMap: A new TreeMap with the same entries.
+        """
+        return TreeMap(self._type, self)
+
+    def firstEntry(self):
+        """
+        Retrieves the entry with the lowest key, in O(1).
+
+        Returns:
+            tuple: The (key, value) entry, or None if the TreeMap is empty.
+        """
+        return self._entry(self._tree._min)
+
+    def lastEntry(self):
+        """
+        Retrieves the entry with the highest key, in O(1).
+
+        Returns:
+            tuple: The (key, value) entry, or None if the TreeMap is empty.
+        """
+        return self._entry(self._tree._max)
+
+    def firstKey(self):
+        """
+        Retrieves the lowest key.
+
+        Returns:
+            The lowest key.
+
+        Raises:
+            NoSuchElementException: If the TreeMap is empty.
+        """
+        if self._tree._min is None:
+            raise NoSuchElementException()
+        return self._tree._min.key
+
+    def lastKey(self):
+        """
+        Retrieves the highest key.
+
+        Returns:
+            The highest key.
+
+        Raises:
+            NoSuchElementException: If the TreeMap is empty.
+        """
+        if self._tree._max is None:
+            raise NoSuchElementException()
+        return self._tree._max.key
+
+    def pollFirstEntry(self):
+        """
+        Retrieves and removes the entry with the lowest key.
+
+        Returns:
+            tuple: The (key, value) entry, or None if the TreeMap is empty.
+        """
+        node = self._tree._min
+        if node is None:
+            return None
+        self._tree._delete_node(node)
+        return node.key, node.value
+
+    def pollLastEntry(self):
+        """
+        Retrieves and removes the entry with the highest key.
+
+        Returns:
+            tuple: The (key, value) entry, or None if the TreeMap is empty.
+        """
+        node = self._tree._max
+        if node is None:
+            return None
+        self._tree._delete_node(node)
+        return node.key, node.value
+
+    def floorEntry(self, key):
+        """
+        Retrieves the entry with the greatest key less than or equal to the given key.
+
+        Args:
+            key: The key to compare.
+
+        Returns:
+            tuple: The (key, value) entry, or None if there is no such key.
+        """
+        self._check(key)
+        return self._entry(self._tree._floor(self._tree.root, key))
+
+    def ceilingEntry(self, key):
+        """
+        Retrieves the entry with the least key greater than or equal to the given key.
+
+        Args:
+            key: The key to compare.
+
+        Returns:
+            tuple: The (key, value) entry, or None if there is no such key.
+        """
+        self._check(key)
+        return self._entry(self._tree._ceiling(self._tree.root, key))
+
+    def higherEntry(self, key):
+        """
+        Retrieves the entry with the least key strictly greater than the given key.
+
+        Args:
+            key: The key to compare.
+
+        Returns:
+            tuple: The (key, value) entry, or None if there is no such key.
+        """
+        self._check(key)
+        return self._entry(self._tree._higher(self._tree.root, key))
+
+    def lowerEntry(self, key):
+        """
+        Retrieves the entry with the greatest key strictly less than the given key.
+
+        Args:
+            key: The key to compare.
+
+        Returns:
+            tuple: The (key, value) entry, or None if there is no such key.
+        """
+        self._check(key)
+        return self._entry(self._tree._lower(self._tree.root, key))
+
+    def floorKey(self, key):
+        """
+        Retrieves the greatest key less than or equal to the given key, or None if there is no such key.
+        """
+        self._check(key)
+        return self._tree.floor(key)
+
+    def ceilingKey(self, key):
+        """
+        Retrieves the least key greater than or equal to the given key, or None if there is no such key.
+        """
+        self._check(key)
+        return self._tree.ceiling(key)
+
+    def higherKey(self, key):
+        """
+        Retrieves the least key strictly greater than the given key, or None if there is no such key.
+        """
+        self._check(key)
+        return self._tree.higher(key)
+
+    def lowerKey(self, key):
+        """
+        Retrieves the greatest key strictly less than the given key, or None if there is no such key.
+        """
+        self._check(key)
+        return self._tree.lower(key)
+
+    class EntriesIterator(RedBlackTree.KeysIterator):
+        """
+        Iterates like KeysIterator but yields (key, value) entries, or only the values.
+        """
+
+        def __init__(self, node, nil, reverse=False, values=False):
+            super().__init__(node, nil, reverse)
+            self.values = values
+
+        def __next__(self):
+            node = self.node
+            RedBlackTree.KeysIterator.__next__(self)
+            return node.value if self.values else (node.key, node.value)
+
+    def items(self, reverse=False):
+        """
+        Returns an iterator over the entries in ascending (or descending, if reverse is True) key order.
+
+        Returns:
+            iterator: An iterator of (key, value) tuples.
+        """
+        tree = self._tree
+        return self.EntriesIterator(tree._max if reverse else tree._min, tree.nil, reverse)
+
+    def keys(self, reverse=False):
+        """
+        Returns an iterator over the keys in ascending (or descending, if reverse is True) order.
+
+        Returns:
+            iterator: An iterator of keys.
+        """
+        return reversed(self._tree) if reverse else iter(self._tree)
+
+    def values(self, reverse=False):
+        """
+        Returns an iterator over the values in ascending (or descending, if reverse is True) key order.
+
+        Returns:
+            iterator: An iterator of values.
+        """
+        tree = self._tree
+        return self.EntriesIterator(tree._max if reverse else tree._min, tree.nil, reverse, values=True)
+
+    def __iter__(self):
+        """
+        Returns an iterator over the keys in ascending order.
+        """
+        return iter(self._tree)
+
+    def __reversed__(self):
+        """
+        Returns an iterator over the keys in descending order.
+        """
+        return reversed(self._tree)
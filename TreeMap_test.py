@@ -0,0 +1,86 @@
+import unittest
+import random
+from TreeMap import TreeMap
+from Exceptions import NoSuchElementException, NullPointerException
+from TreeSetSplitJoin_test import check_tree
+
+class TestTreeMap(unittest.TestCase):
+
+    def setUp(self):
+        self.keys = random.sample(range(10000), 1000)
+        self.tree_map = TreeMap(int)
+        for key in self.keys:
+            self.assertIsNone(self.tree_map.put(key, str(key)))
+        self.ordered = sorted(self.keys)
+
+    def test_get_put_remove(self):
+        self.assertEqual(self.tree_map.size(), 1000)
+        self.assertEqual(self.tree_map.get(self.keys[0]), str(self.keys[0]))
+        self.assertEqual(self.tree_map.put(self.keys[0], "new"), str(self.keys[0]))
+        self.assertEqual(self.tree_map.get(self.keys[0]), "new")
+        self.assertEqual(self.tree_map.size(), 1000)
+        self.assertIsNone(self.tree_map.get(-1))
+        self.assertEqual(self.tree_map.get(-1, "missing"), "missing")
+        self.assertTrue(self.tree_map.containsKey(self.keys[1]))
+        for key in self.keys[:500]:
+            self.assertIsNotNone(self.tree_map.remove(key))
+        self.assertIsNone(self.tree_map.remove(self.keys[0]))
+        self.assertFalse(self.tree_map.containsKey(self.keys[1]))
+        self.assertEqual(list(self.tree_map), sorted(self.keys[500:]))
+        check_tree(self.tree_map._tree)
+
+    def test_navigation(self):
+        for probe in random.sample(range(-10, 10010), 200):
+            below = [k for k in self.ordered if k <= probe]
+            above = [k for k in self.ordered if k >= probe]
+            self.assertEqual(self.tree_map.floorEntry(probe), (below[-1], str(below[-1])) if below else None)
+            self.assertEqual(self.tree_map.ceilingEntry(probe), (above[0], str(above[0])) if above else None)
+            strictly_below = [k for k in below if k < probe]
+            strictly_above = [k for k in above if k > probe]
+            self.assertEqual(self.tree_map.lowerKey(probe), strictly_below[-1] if strictly_below else None)
+            self.assertEqual(self.tree_map.higherEntry(probe), (strictly_above[0], str(strictly_above[0])) if strictly_above else None)
+            self.assertEqual(self.tree_map.lowerEntry(probe), (strictly_below[-1], str(strictly_below[-1])) if strictly_below else None)
+
+    def test_first_last_and_poll(self):
+        self.assertEqual(self.tree_map.firstEntry(), (self.ordered[0], str(self.ordered[0])))
+        self.assertEqual(self.tree_map.lastKey(), self.ordered[-1])
+        self.assertEqual(self.tree_map.pollFirstEntry(), (self.ordered[0], str(self.ordered[0])))
+        self.assertEqual(self.tree_map.pollLastEntry(), (self.ordered[-1], str(self.ordered[-1])))
+        self.assertEqual(self.tree_map.firstKey(), self.ordered[1])
+        self.tree_map.clear()
+        self.assertTrue(self.tree_map.isEmpty())
+        self.assertIsNone(self.tree_map.pollFirstEntry())
+        self.assertIsNone(self.tree_map.lastEntry())
+        with self.assertRaises(NoSuchElementException):
+            self.tree_map.firstKey()
+
+    def test_iteration(self):
+        self.assertEqual(list(self.tree_map.items()), [(k, str(k)) for k in self.ordered])
+        self.assertEqual(list(self.tree_map.items(reverse=True)), [(k, str(k)) for k in reversed(self.ordered)])
+        self.assertEqual(list(self.tree_map.values()), [str(k) for k in self.ordered])
+        self.assertEqual(list(self.tree_map.keys(reverse=True)), list(reversed(self.ordered)))
+        self.assertEqual(list(reversed(self.tree_map)), list(reversed(self.ordered)))
+
+    def test_bulk_construction(self):
+        pairs = [(3, "c"), (1, "a"), (2, "b"), (1, "z")]
+        tree_map = TreeMap(int, pairs)
+        self.assertEqual(list(tree_map.items()), [(1, "z"), (2, "b"), (3, "c")])
+        check_tree(tree_map._tree)
+        copy = TreeMap(int, {k: str(k) for k in self.keys})
+        self.assertEqual(list(copy.items()), list(self.tree_map.items()))
+        clone = self.tree_map.clone()
+        clone.put(-5, "x")
+        self.assertFalse(self.tree_map.containsKey(-5))
+        tree_map.putAll({0: "zero", 2: "two"})
+        self.assertEqual(list(tree_map.items()), [(0, "zero"), (1, "z"), (2, "two"), (3, "c")])
+
+    def test_validation(self):
+        with self.assertRaises(NullPointerException):
+            self.tree_map.put(None, 1)
+        with self.assertRaises(TypeError):
+            self.tree_map.get("1")
+        with self.assertRaises(TypeError):
+            TreeMap(None)
+
+if __name__ == '__main__':
+    unittest.main()
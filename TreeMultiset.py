@@ -0,0 +1,325 @@
+from itertools import chain, repeat, starmap
+from RedBlackTree import RedBlackTree, ValueNode
+from TreeMap import TreeMap
+from TreeSet import check_key
+from Exceptions import *
+
+class TreeMultiset:
+    """
+    An ordered bag: a sorted collection of elements that may occur more than once.
+
+    Each distinct element is stored once, in a ValueNode of a RedBlackTree whose value is its count,
+    so a run of equal elements costs one node and comparisons are made between the elements
+    themselves. The total number of occurrences is tracked alongside the tree, so size() is O(1).
+    """
+
+    def __init__(self, data_type, collection=None):
+        """
+        Initializes a new TreeMultiset.
+
+        Args:
+            data_type (type): The type of elements to be stored in the TreeMultiset.
+            collection (iterable, optional): Elements to add, each occurrence counted.
+
+        Raises:
+            TypeError: If data_type is not a class or if an element of the collection is of the wrong type.
+        """
+        if not isinstance(data_type, type):
+            raise TypeError("TreeMultiset must be provided a class")
+        self._type = data_type
+        self._valid_types = set()
+        self._tree = RedBlackTree(data_type)
+        self._size = 0
+        if collection is not None:
+            for key in collection:
+                self.add(key)
+
+    def _check(self, key):
+        """
+        Checks that the element is a non-null, comparable instance of the data type, once per concrete type.
+
+        Raises:
+            NullPointerException: If the element is None.
+            TypeError: If the element is not an instance of the TreeMultiset's data type.
+            ClassCastException: If the element is not comparable.
+        """
+        if type(key) not in self._valid_types:
+            check_key(key, self._type, self._valid_types)
+
+    @staticmethod
+    def _check_occurrences(n):
+        if n < 0:
+            raise IllegalArgumentException(f"occurrences cannot be negative: {n}")
+
+    def _node(self, key):
+        self._check(key)
+        node = self._tree._lookup(self._tree.root, key)
+        return None if node == self._tree.nil else node
+
+    def add(self, key, n=1):
+        """
+        Adds occurrences of an element, in O(log n).
+
+        Args:
+            key: The element to add.
+            n (int, optional): The number of occurrences to add. Defaults to 1.
+
+        Returns:
+            int: The count of the element before the call.
+
+        Raises:
+            IllegalArgumentException: If n is negative.
+        """
+        self._check(key)
+        self._check_occurrences(n)
+        tree = self._tree
+        nil = tree.nil
+        parent = None
+        node = tree.root
+        left = False
+        while node != nil:
+            parent = node
+            if key < node.key:
+                node = node.left
+                left = True
+            elif key > node.key:
+                node = node.right
+                left = False
+            else:
+                previous = node.value
+                node.value += n
+                self._size += n
+                return previous
+        if n:
+            tree._link(ValueNode(key, n), parent, left)
+            self._size += n
+        return 0
+
+    def remove(self, key, n=1):
+        """
+        Removes occurrences of an element, in O(log n). Removing more occurrences than there are
+        removes the element entirely.
+
+        Args:
+            key: The element to remove.
+            n (int, optional): The number of occurrences to remove. Defaults to 1.
+
+        Returns:
+            int: The count of the element before the call.
+
+        Raises:
+            IllegalArgumentException: If n is negative.
+        """
+        self._check_occurrences(n)
+        node = self._node(key)
+        if node is None:
+            return 0
+        previous = node.value
+        if n >= previous:
+            self._tree._delete_node(node)
+            self._size -= previous
+        else:
+            node.value -= n
+            self._size -= n
+        return previous
+
+    def setCount(self, key, count):
+        """
+        Sets the number of occurrences of an element, adding or removing it as needed.
+
+        Args:
+            key: The element.
+            count (int): The new count.
+
+        Returns:
+            int: The count of the element before the call.
+
+        Raises:
+            IllegalArgumentException: If count is negative.
+        """
+        self._check_occurrences(count)
+        node = self._node(key)
+        if node is None:
+            return self.add(key, count)
+        previous = node.value
+        if count == 0:
+            self._tree._delete_node(node)
+        else:
+            node.value = count
+        self._size += count - previous
+        return previous
+
+    def count(self, key):
+        """
+        Returns the number of occurrences of an element, in O(log n).
+
+        Args:
+            key: The element to count.
+
+        Returns:
+            int: The count, 0 if the element is absent.
+        """
+        node = self._node(key)
+        return 0 if node is None else node.value
+
+    def contains(self, key):
+        """
+        Checks if the TreeMultiset contains at least one occurrence of an element.
+
+        Args:
+            key: The element to check for.
+
+        Returns:
+            bool: True if the element is present, False otherwise.
+        """
+        return self._node(key) is not None
+
+    def size(self):
+        """
+        Returns the total number of occurrences of all elements, in O(1).
+
+        Returns:
+            int: The number of occurrences.
+        """
+        return self._size
+
+    def distinctSize(self):
+        """
+        Returns the number of distinct elements, in O(1).
+
+        Returns:
+            int: The number of distinct elements.
+        """
+        return self._tree.root.size
+
+    def isEmpty(self):
+        """
+        Checks if the TreeMultiset is empty.
+
+        Returns:
+            bool: True if there are no elements, False otherwise.
+        """
+        return self._size == 0
+
+    def clear(self):
+        """
+        Removes all elements from the TreeMultiset.
+        """
+        self._tree = RedBlackTree(self._type)
+        self._size = 0
+
+    def first(self):
+        """
+        Retrieves, but does not remove, the lowest element.
+
+        Returns:
+            The first element.
+
+        Raises:
+            NoSuchElementException: If the TreeMultiset is empty.
+        """
+        if self._tree._min is None:
+            raise NoSuchElementException()
+        return self._tree._min.key
+
+    def last(self):
+        """
+        Retrieves, but does not remove, the highest element.
+
+        Returns:
+            The last element.
+
+        Raises:
+            NoSuchElementException: If the TreeMultiset is empty.
+        """
+        if self._tree._max is None:
+            raise NoSuchElementException()
+        return self._tree._max.key
+
+    def _poll(self, node):
+        if node is None:
+            return None
+        if node.value == 1:
+            self._tree._delete_node(node)
+        else:
+            node.value -= 1
+        self._size -= 1
+        return node.key
+
+    def pollFirst(self):
+        """
+        Retrieves and removes one occurrence of the lowest element, in O(1) unless it was the last one.
+
+        Returns:
+            The first element, or None if the TreeMultiset is empty.
+        """
+        return self._poll(self._tree._min)
+
+    def pollLast(self):
+        """
+        Retrieves and removes one occurrence of the highest element.
+
+        Returns:
+            The last element, or None if the TreeMultiset is empty.
+        """
+        return self._poll(self._tree._max)
+
+    def floor(self, key):
+        """
+        Retrieves the greatest element less than or equal to the given element, or None if there is no such element.
+        """
+        self._check(key)
+        return self._tree.floor(key)
+
+    def ceiling(self, key):
+        """
+        Retrieves the least element greater than or equal to the given element, or None if there is no such element.
+        """
+        self._check(key)
+        return self._tree.ceiling(key)
+
+    def higher(self, key):
+        """
+        Retrieves the least element strictly greater than the given element, or None if there is no such element.
+        """
+        self._check(key)
+        return self._tree.higher(key)
+
+    def lower(self, key):
+        """
+        Retrieves the greatest element strictly less than the given element, or None if there is no such element.
+        """
+        self._check(key)
+        return self._tree.lower(key)
+
+    def entries(self, reverse=False):
+        """
+        Returns an iterator over the distinct elements and their counts, in ascending (or descending, if
+        reverse is True) order.
+
+        Returns:
+            iterator: An iterator of (element, count) tuples.
+        """
+        tree = self._tree
+        return TreeMap.EntriesIterator(tree._max if reverse else tree._min, tree.nil, reverse)
+
+    def distinct(self, reverse=False):
+        """
+        Returns an iterator over the distinct elements, skipping repeated occurrences.
+
+        Returns:
+            iterator: An iterator of elements.
+        """
+        return reversed(self._tree) if reverse else iter(self._tree)
+
+    def __iter__(self):
+        """
+        Returns an iterator over every occurrence in ascending order, repeating each element count times.
+        """
+        return chain.from_iterable(starmap(repeat, self.entries()))
+
+    def __reversed__(self):
+        """
+        Returns an iterator over every occurrence in descending order.
+        """
+        return chain.from_iterable(starmap(repeat, self.entries(reverse=True)))
@@ -0,0 +1,75 @@
+import unittest
+import random
+from collections import Counter
+from TreeMultiset import TreeMultiset
+from Exceptions import IllegalArgumentException, NoSuchElementException
+from TreeSetSplitJoin_test import check_tree
+
+class TestTreeMultiset(unittest.TestCase):
+
+    def setUp(self):
+        self.values = [random.randint(0, 100) for _ in range(2000)]
+        self.multiset = TreeMultiset(int, self.values)
+        self.counter = Counter(self.values)
+
+    def test_counts_and_sizes(self):
+        self.assertEqual(self.multiset.size(), 2000)
+        self.assertEqual(self.multiset.distinctSize(), len(self.counter))
+        for key in range(-1, 102):
+            self.assertEqual(self.multiset.count(key), self.counter[key])
+        self.assertEqual(self.multiset._tree.root.size, len(self.counter))
+
+    def test_add_and_remove(self):
+        self.assertEqual(self.multiset.add(500, 3), 0)
+        self.assertEqual(self.multiset.add(500), 3)
+        self.assertEqual(self.multiset.count(500), 4)
+        self.assertEqual(self.multiset.remove(500, 2), 4)
+        self.assertEqual(self.multiset.count(500), 2)
+        self.assertEqual(self.multiset.remove(500, 10), 2)
+        self.assertFalse(self.multiset.contains(500))
+        self.assertEqual(self.multiset.remove(500), 0)
+        self.assertEqual(self.multiset.add(501, 0), 0)
+        self.assertFalse(self.multiset.contains(501))
+        self.assertEqual(self.multiset.size(), 2000)
+        with self.assertRaises(IllegalArgumentException):
+            self.multiset.add(1, -1)
+        for key in list(self.counter):
+            self.multiset.remove(key, self.counter[key])
+        self.assertTrue(self.multiset.isEmpty())
+        check_tree(self.multiset._tree)
+
+    def test_set_count(self):
+        self.assertEqual(self.multiset.setCount(1000, 5), 0)
+        self.assertEqual(self.multiset.setCount(1000, 2), 5)
+        self.assertEqual(self.multiset.size(), 2002)
+        self.assertEqual(self.multiset.setCount(1000, 0), 2)
+        self.assertFalse(self.multiset.contains(1000))
+        self.assertEqual(self.multiset.size(), 2000)
+
+    def test_iteration(self):
+        self.assertEqual(list(self.multiset), sorted(self.values))
+        self.assertEqual(list(reversed(self.multiset)), sorted(self.values, reverse=True))
+        self.assertEqual(list(self.multiset.distinct()), sorted(self.counter))
+        self.assertEqual(list(self.multiset.entries()), sorted(self.counter.items()))
+        self.assertEqual(list(self.multiset.entries(reverse=True)), sorted(self.counter.items(), reverse=True))
+
+    def test_navigation_and_poll(self):
+        multiset = TreeMultiset(int, [5, 5, 10, 20, 20, 20])
+        self.assertEqual(multiset.floor(19), 10)
+        self.assertEqual(multiset.ceiling(11), 20)
+        self.assertEqual(multiset.higher(5), 10)
+        self.assertEqual(multiset.lower(5), None)
+        self.assertEqual((multiset.first(), multiset.last()), (5, 20))
+        self.assertEqual([multiset.pollFirst() for _ in range(3)], [5, 5, 10])
+        self.assertEqual(multiset.pollLast(), 20)
+        self.assertEqual(multiset.size(), 2)
+        self.assertEqual(list(multiset), [20, 20])
+        multiset.clear()
+        self.assertIsNone(multiset.pollFirst())
+        with self.assertRaises(NoSuchElementException):
+            multiset.last()
+        with self.assertRaises(TypeError):
+            multiset.add("5")
+
+if __name__ == '__main__':
+    unittest.main()
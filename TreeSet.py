@@ -1,8 +1,69 @@
+import heapq
 from enum import Enum
+from functools import cmp_to_key
 from inspect import isabstract
 from RedBlackTree import RedBlackTree
+from KeyedRedBlackTree import KeyedRedBlackTree
+from ArrayRedBlackTree import ArrayRedBlackTree
+from PersistentRedBlackTree import PersistentRedBlackTree
+from NumpyBlockTree import NumpyBlockTree
+from BTree import BTree
+from DiskBTree import DiskBTree
+from InstrumentedRedBlackTree import InstrumentedRedBlackTree, OperationStats, shape
+from SubSet import SubSet
+from MappedTreeSet import MappedTreeSet
+import TreeSetSnapshot
 from Exceptions import *
 
+def is_comparable(key):
+    """
+    Checks if a key's type defines the comparisons a sorted collection needs.
+
+    Args:
+        key: The key to check.
+
+    Returns:
+        bool: True if the key is comparable, False otherwise.
+    """
+    data_type = type(key)
+    count = 0
+    if data_type is object or data_type.__eq__ is not object.__eq__:
+        count += 1
+    if data_type is object or data_type.__gt__ is not object.__gt__:
+        count += 1
+    if data_type is object or data_type.__lt__ is not object.__lt__:
+        count += 1
+    return count == 3
+
+def check_key(key, data_type, valid_types=None, comparable=True, kind="Element"):
+    """
+    Checks that a key is a non-null instance of data_type and, if comparable is set, that it is
+    comparable. This is the validation shared by TreeSet, TreeMap and TreeMultiset.
+
+    Args:
+        key: The key to check.
+        data_type (type): The type the key must be an instance of.
+        valid_types (set, optional): Concrete types already checked. If given, a key of one of them is
+            accepted without checking, and the type of a key that passes is added to it.
+        comparable (bool, optional): Whether the key must be comparable. Defaults to True.
+        kind (str, optional): What the key is called in the TypeError message. Defaults to "Element".
+
+    Raises:
+        NullPointerException: If the key is None.
+        TypeError: If the key is not an instance of data_type.
+        ClassCastException: If the key is not comparable.
+    """
+    if valid_types is not None and type(key) in valid_types:
+        return
+    if key is None:
+        raise NullPointerException()
+    if not isinstance(key, data_type):
+        raise TypeError(f"{kind} must be instance of {data_type.__name__}, {type(key).__name__} provided")
+    if comparable and not is_comparable(key):
+        raise ClassCastException(type(key))
+    if valid_types is not None:
+        valid_types.add(type(key))
+
 class Color(Enum):
     RED = 0
     BLACK = 1
@@ -12,25 +73,143 @@ class TreeSet:
     This TreeSet is an implementation of the Java TreeSet that maintains order using a Red-Black Tree.
     """
 
-    def __init__(self, data_type, collection=None):
+    _BACKENDS = {
+        "rbtree": RedBlackTree,
+        "array": ArrayRedBlackTree,
+        "persistent": PersistentRedBlackTree,
+        "numpy": NumpyBlockTree,
+        "btree": BTree,
+        "disk": DiskBTree,
+    }
+
+    _VALIDATION = ("strict", "cached", "trusted")
+
+    def __init__(self, data_type, collection=None, backend="rbtree", validation="cached", key=None,
+                 comparator=None, reverse=False, backend_options=None):
         """
         Initializes a new TreeSet.
         
         Args:
             data_type (type): The type of elements to be stored in the TreeSet.
             collection (iterable, optional): A collection of elements to be added to the TreeSet.
+            backend (str, optional): The tree storage to use. "rbtree" (default) keeps one slotted
+                node object per element; "array" keeps the nodes in parallel index arrays, which
+                uses roughly a third of the memory per element at some cost in speed; "persistent" shares
+                nodes between copies, so clone() is O(1) and each later change copies only O(log n) nodes;
+                "numpy" stores int or float elements in sorted NumPy blocks and answers the *_many batch
+                queries with vectorized searches (requires NumPy); "btree" keeps the elements in a B+tree
+                of sorted lists, so each search visits a few wide nodes instead of one node per level;
+                "disk" stores int or float elements in a B+tree of pages in a memory-mapped temporary file
+                behind a bounded LRU page cache, for sets larger than memory.
+            validation (str, optional): How elements are checked before use. "strict" checks the type
+                and comparability of every element; "cached" (default) does so once per concrete type
+                and afterwards only looks the type up; "trusted" skips all checks, so the caller must
+                only pass non-null instances of data_type.
+            key (callable, optional): Orders the elements by key(element) instead of by the elements
+                themselves. The key is computed once per element and cached in its node, so searches
+                only compare cached keys; elements with equal keys count as duplicates.
+            comparator (callable, optional): Orders the elements by comparator(a, b), which returns a
+                negative number, zero or a positive number as a comes before, equals or comes after b.
+                Every comparison calls it, so key is preferred when one can be given.
+            reverse (bool, optional): Orders the elements from the greatest to the least.
+            backend_options (dict, optional): Keyword arguments for the backend's tree, such as
+                {"node_size": 128} to set the number of keys per node of the "btree" backend (default 64),
+                or "directory", "cache_pages" (default 1024) and "page_size" (default 4096 bytes) for the
+                "disk" backend.
         
         Raises:
-            TypeError: If data_type is not a valid class or if an element of the collection is of the wrong type.
+            TypeError: If data_type is not a valid class, if an element of the collection is of the wrong type
+                or if the backend does not accept backend_options.
+            ValueError: If backend or validation is not a known name, if both key and comparator are given,
+                or if key, comparator or reverse is given with a backend other than "rbtree".
+            ImportError: If the "numpy" backend is requested and NumPy is not installed.
         """
         if data_type is None or (not isinstance(data_type, type) and not isabstract(data_type)):
             raise TypeError("TreeSet must be provided a class")
+        if backend not in self._BACKENDS:
+            raise ValueError(f"Unknown TreeSet backend {backend!r}, expected one of {sorted(self._BACKENDS)}")
+        if validation not in self._VALIDATION:
+            raise ValueError(f"Unknown TreeSet validation {validation!r}, expected one of {list(self._VALIDATION)}")
+        if key is not None and comparator is not None:
+            raise ValueError("TreeSet takes a key or a comparator, not both")
+        if (key is not None or comparator is not None or reverse) and backend != "rbtree":
+            raise ValueError(f"key, comparator and reverse are not supported by the {backend!r} backend")
         self._type = data_type
+        self._backend = backend
+        self._backend_options = backend_options or {}
+        self._validation = validation
+        self._key = key
+        self._comparator = comparator
+        self._reverse = reverse
+        self._sort_key = cmp_to_key(comparator) if comparator is not None else key
+        self._before = None if self._sort_key is None and not reverse else self._precedes
+        self._valid_types = set()
+        if validation == "cached":
+            self._check = self._check_cached
+        elif validation == "trusted":
+            self._check = self._check_trusted
+            self._check_all = self._check_trusted
         self._size = 0
-        self._rb = RedBlackTree(self._type)
+        self._instrumentation = None
+        self._rb = self._new_tree()
         if collection is not None:
             self.addAll(collection)
 
+    def _new_tree(self):
+        """
+        Creates an empty tree of the configured backend.
+        
+        Returns:
+            An empty tree for this TreeSet's data type.
+        """
+        if self._before is not None:
+            return KeyedRedBlackTree(self._type, self._sort_key, self._reverse)
+        tree = self._BACKENDS[self._backend](self._type, **self._backend_options)
+        if self._instrumentation is not None:
+            InstrumentedRedBlackTree.enable(tree, *self._instrumentation)
+        return tree
+
+    def _empty_copy(self):
+        """
+        Creates an empty TreeSet with the same data type, backend, backend options, validation mode and order.
+        
+        Returns:
+            TreeSet: A new, empty TreeSet.
+        """
+        new_tree = TreeSet(data_type=self._type, backend=self._backend, validation=self._validation,
+                           key=self._key, comparator=self._comparator, reverse=self._reverse,
+                           backend_options=self._backend_options)
+        new_tree._valid_types = self._valid_types.copy()
+        return new_tree
+
+    def _precedes(self, a, b):
+        """
+        Checks whether one element comes strictly before another in this set's order.
+        
+        Args:
+            a: The first element.
+            b: The second element.
+        
+        Returns:
+            bool: True if a comes before b.
+        """
+        if self._sort_key is not None:
+            a, b = self._sort_key(a), self._sort_key(b)
+        return b < a if self._reverse else a < b
+
+    def _same_order(self, other):
+        """
+        Checks whether another TreeSet orders its elements the same way as this one.
+        
+        Args:
+            other (TreeSet): The set to compare with.
+        
+        Returns:
+            bool: True if both sets use the same key, comparator and direction.
+        """
+        return (self._key is other._key and self._comparator is other._comparator
+                and self._reverse == other._reverse)
+
     def _check(self, key):
         """
         Checks if the key is valid for the TreeSet.
@@ -43,32 +222,50 @@ class TreeSet:
             TypeError: If the key is not an instance of the TreeSet's data type.
             ClassCastException: If the key is not comparable.
         """
-        if key is None:
-            raise NullPointerException()
-        if not isinstance(key, self._type):
-            raise TypeError(f"Element must be instance of {self._type.__name__}, {type(key).__name__} provided")
-        if not self._is_comparable(key):
-            raise ClassCastException(type(key))
+        check_key(key, self._type, comparable=self._sort_key is None)
 
-    def _is_comparable(self, key):
+    def _check_cached(self, key):
         """
-        Checks if the key is comparable.
+        Checks the key like _check, but only the first time an element of its concrete type is seen.
         
         Args:
             key: The key to check.
         
-        Returns:
-            bool: True if the key is comparable, False otherwise.
+        Raises:
+            NullPointerException: If the key is None.
+            TypeError: If the key is not an instance of the TreeSet's data type.
+            ClassCastException: If the key is not comparable.
+        """
+        if type(key) not in self._valid_types:
+            check_key(key, self._type, self._valid_types, self._sort_key is None)
+
+    def _check_trusted(self, key):
+        """
+        Accepts any key without checking it.
+        
+        Args:
+            key: The key (or, for batches, the list of keys) to accept.
+        """
+
+    def _check_all(self, keys):
+        """
+        Checks a batch of keys, running the full check once per distinct concrete type in the batch.
+        
+        Args:
+            keys (list): The keys to check.
+        
+        Raises:
+            NullPointerException: If a key is None.
+            TypeError: If a key is not an instance of the TreeSet's data type.
+            ClassCastException: If a key is not comparable.
         """
-        data_type = type(key)
-        count = 0
-        if data_type is object or data_type.__eq__ is not object.__eq__:
-            count += 1
-        if data_type is object or data_type.__gt__ is not object.__gt__:
-            count += 1
-        if data_type is object or data_type.__lt__ is not object.__lt__:
-            count += 1
-        return count == 3
+        strict = self._validation == "strict"
+        for key_type in set(map(type, keys)):
+            if strict or key_type not in self._valid_types:
+                key = next(key for key in keys if type(key) is key_type)
+                TreeSet._check(self, key)
+                if not strict:
+                    self._valid_types.add(key_type)
 
     def add(self, new_key):
         """
@@ -90,20 +287,118 @@ class TreeSet:
         """
         Adds a collection of elements to the TreeSet.
         
+        When the TreeSet is empty or the batch is at least as large as the TreeSet, the elements are
+        merged with the current contents and the tree is rebuilt in linear time instead of being
+        inserted one by one. A TreeSet whose elements all lie beyond one end of this set is copied
+        and joined on in O(m + log n).
+        
         Args:
             new_keys (iterable): The collection of elements to add.
         
         Returns:
             bool: True if the TreeSet was modified, False otherwise.
         """
+        if (isinstance(new_keys, TreeSet) and new_keys._size and self._size and hasattr(self._rb, "join")
+                and type(new_keys._rb) is type(self._rb) and issubclass(new_keys._type, self._type)
+                and self._same_order(new_keys)
+                and (self._precedes(self._rb.last(), new_keys._rb.first())
+                     or self._precedes(new_keys._rb.last(), self._rb.first()))):
+            return self.join(new_keys.clone())
+        new_keys = list(new_keys)
+        self._check_all(new_keys)
+        if len(new_keys) >= self._size:
+            return self._bulk_load(new_keys)
         changed = False
         for new_key in new_keys:
-            self._check(new_key)
             if self._rb.insert(new_key):
                 self._size += 1
                 changed = True
         return changed
 
+    def _bulk_load(self, new_keys):
+        """
+        Merges already validated elements with the current contents and rebuilds the tree in linear time.
+        
+        The in-memory backends merge into a list, since they hold every element in memory anyway. An
+        external backend (the disk B+tree) is instead fed a streamed merge of its current contents and
+        the sorted batch, so only the batch is ever held in memory.
+        
+        Args:
+            new_keys (list): The elements to add.
+        
+        Returns:
+            bool: True if the TreeSet was modified, False otherwise.
+        """
+        if getattr(self._rb, "external", False):
+            return self._stream_load(self._sorted_unique(new_keys))
+        if self._size:
+            new_keys = list(self._rb) + new_keys
+        keys = self._sorted_unique(new_keys, self._sort_key, self._reverse)
+        if len(keys) == self._size:
+            return False
+        self._rb = self._new_tree()
+        self._rb.load_sorted(keys)
+        self._size = len(keys)
+        return True
+
+    def _stream_load(self, new_keys):
+        """
+        Rebuilds an external tree from a merge of its current contents with new_keys, streamed one element
+        at a time. Elements already present are dropped first, in O(m log n), so a batch that adds nothing
+        writes nothing.
+        
+        Args:
+            new_keys (list): The elements to add, distinct and in ascending order.
+        
+        Returns:
+            bool: True if the TreeSet was modified, False otherwise.
+        """
+        old = self._rb
+        if self._size:
+            contains = old.contains
+            new_keys = [key for key in new_keys if not contains(key)]
+        if not new_keys:
+            return False
+        tree = self._new_tree()
+        tree.load_sorted(heapq.merge(old, new_keys))
+        self._rb = tree
+        self._size += len(new_keys)
+        return True
+
+    @staticmethod
+    def _sorted_unique(keys, key=None, reverse=False):
+        """
+        Returns the elements in strictly increasing order without duplicates.
+        
+        Input that is already strictly increasing is detected in one pass and returned as is; otherwise
+        it is sorted once (Timsort merges the existing runs, so an appended sorted batch costs linear time)
+        and duplicates are dropped.
+        
+        Args:
+            keys (list): The elements to order.
+            key (callable, optional): Orders and deduplicates the elements by key(element).
+            reverse (bool, optional): Orders the elements from the greatest to the least.
+        
+        Returns:
+            list: The distinct elements in ascending order, or in the order given by key and reverse.
+        """
+        if key is not None or reverse:
+            pairs = sorted(zip(map(key, keys) if key is not None else keys, keys),
+                           key=lambda pair: pair[0], reverse=reverse)
+            unique = pairs[:1]
+            for pair in pairs[1:]:
+                if pair[0] != unique[-1][0]:
+                    unique.append(pair)
+            return [element for _, element in unique]
+        if all(a < b for a, b in zip(keys, keys[1:])):
+            return keys
+        keys = sorted(keys)
+        unique = keys[:1]
+        for key in keys[1:]:
+            if key != unique[-1]:
+                unique.append(key)
+        return unique
+
     def remove(self, key):
         """
         Removes an element from the TreeSet.
@@ -151,25 +446,141 @@ class TreeSet:
         self._check(key)
         return self._rb.contains(key)
 
+    def get(self, key):
+        """
+        Retrieves the stored element equal to the given element.
+        
+        Args:
+            key: The element to look up.
+        
+        Returns:
+            The instance held by the set, or None if no equal element is present.
+        """
+        self._check(key)
+        return self._getter()(key)
+
+    def _getter(self):
+        """
+        Returns a function that maps an element to the stored element equal to it, or to None.
+        
+        Backends without a get method are searched with floor instead.
+        
+        Returns:
+            callable: The lookup function.
+        """
+        get = getattr(self._rb, "get", None)
+        if get is not None:
+            return get
+        floor, precedes = self._rb.floor, self._precedes
+        def get(key):
+            found = floor(key)
+            return found if found is not None and not precedes(found, key) else None
+        return get
+
+    def intern(self, key):
+        """
+        Returns the canonical instance of an element, adding the element first if no equal one is present.
+        
+        With the "rbtree" backend this takes a single descent, so repeated values in an object graph can be
+        replaced by one shared instance as cheaply as they can be added.
+        
+        Args:
+            key: The element to intern.
+        
+        Returns:
+            The instance held by the set: the stored element equal to key, or key itself if it was added.
+        """
+        self._check(key)
+        insert_if_absent = getattr(self._rb, "insertIfAbsent", None)
+        stored = insert_if_absent(key) if insert_if_absent is not None else self.get(key)
+        if stored is not None:
+            return stored
+        if insert_if_absent is None:
+            self._rb.insert(key)
+        self._size += 1
+        return key
+
     def clear(self):
         """
         Clears all elements from the TreeSet.
         """
         self._size = 0
-        self._rb = RedBlackTree(data_type=self._type)
+        self._rb = self._new_tree()
 
     def clone(self):
         """
         Creates a shallow copy of the TreeSet.
         
+        This takes O(n) time, except with the "persistent" backend where it takes O(1) and the copy
+        shares its nodes with this set until either of them is modified.
+        
         Returns:
             TreeSet: A new TreeSet containing the same elements.
         """
-        new_tree = TreeSet(data_type=self._type)
+        new_tree = self._empty_copy()
         new_tree._rb = self._rb.clone()
         new_tree._size = self._size
         return new_tree
     
+    def save(self, path):
+        """
+        Writes the elements to a compact binary file that load can read back in linear time.
+        
+        int and float elements are stored as a fixed-width array, str and bytes as length-prefixed records
+        and anything else as pickled records. The file starts with a versioned header carrying a CRC-32 of
+        its contents, and is replaced atomically.
+        
+        Args:
+            path (str): The destination file.
+        
+        Raises:
+            UnsupportedOperationException: If the set has a key, comparator or reverse order, which cannot
+                be stored in the file.
+        """
+        if self._before is not None:
+            raise UnsupportedOperationException("a set with a key, comparator or reverse order cannot be saved")
+        TreeSetSnapshot.write(path, self._type, list(self._rb))
+
+    @staticmethod
+    def load(path, mapped=False, backend="rbtree", validation="cached", verify=True, backend_options=None):
+        """
+        Reads a file written by save.
+        
+        The file is memory-mapped. By default its sorted contents are bulk-loaded into a new TreeSet in
+        linear time, without any per-element insertion; the "disk" backend reads them straight from the
+        mapping instead of decoding them into a list first. With mapped=True no tree is built at all, and
+        a read-only MappedTreeSet answers queries by binary search over the mapped buffer.
+        
+        The data type is stored pickled, so only load files from trusted sources.
+        
+        Args:
+            path (str): The file to read.
+            mapped (bool, optional): Whether to serve the file read-only instead of building a tree.
+                Defaults to False.
+            backend (str, optional): The backend of the new TreeSet. Defaults to "rbtree".
+            validation (str, optional): The validation mode of the new TreeSet. Defaults to "cached".
+            verify (bool, optional): Whether to check the file's CRC-32. Defaults to True.
+            backend_options (dict, optional): Keyword arguments for the backend's tree.
+        
+        Returns:
+            TreeSet or MappedTreeSet: The loaded set.
+        
+        Raises:
+            StreamCorruptedException: If the file is not a valid TreeSet file.
+        """
+        if mapped:
+            return MappedTreeSet(path, verify)
+        snapshot = TreeSetSnapshot.Snapshot(path, verify)
+        try:
+            tree_set = TreeSet(snapshot.data_type, backend=backend, validation=validation,
+                               backend_options=backend_options)
+            external = getattr(tree_set._rb, "external", False)
+            tree_set._rb.load_sorted(iter(snapshot.keys) if external else snapshot.tolist())
+            tree_set._size = snapshot.count
+        finally:
+            snapshot.close()
+        return tree_set
+    
     def pollFirst(self):
         """
         Retrieves and removes the first (lowest) element, or returns None if the set is empty.
@@ -261,6 +672,43 @@ class TreeSet:
             self._size -= 1
         return result
     
+    def pollFirstN(self, count):
+        """
+        Retrieves and removes the count lowest elements, or all of them if the set is smaller.
+        
+        With the "rbtree" backend this takes O(count + log n): the elements are read from the minimum
+        and the tree is split once, instead of being deleted one at a time.
+        
+        Args:
+            count (int): The number of elements to remove.
+        
+        Returns:
+            list: The removed elements in ascending order.
+        """
+        return self._poll_many("pollFirstN", "pollFirst", count)
+
+    def pollLastN(self, count):
+        """
+        Retrieves and removes the count highest elements, or all of them if the set is smaller.
+        
+        Args:
+            count (int): The number of elements to remove.
+        
+        Returns:
+            list: The removed elements in descending order.
+        """
+        return self._poll_many("pollLastN", "pollLast", count)
+
+    def _poll_many(self, operation, poll, count):
+        poll_many = getattr(self._rb, operation, None)
+        if poll_many is not None:
+            keys = poll_many(count)
+        else:
+            poll = getattr(self._rb, poll)
+            keys = [poll() for _ in range(max(0, min(count, self._size)))]
+        self._size -= len(keys)
+        return keys
+    
     def ceiling(self, key):
         """
         Retrieves the least element in this set greater than or equal to the given element, or None if there is no such element.
@@ -274,6 +722,238 @@ class TreeSet:
         self._check(key)
         return self._rb.ceiling(key)
     
+    def _require(self, operation):
+        """
+        Checks that the backend implements an optional operation.
+        
+        Args:
+            operation (str): The name of the backend method.
+        
+        Raises:
+            UnsupportedOperationException: If the backend does not implement the operation.
+        """
+        if not hasattr(self._rb, operation):
+            raise UnsupportedOperationException(f"{operation} is not supported by the {self._backend!r} backend")
+
+    def rank(self, key):
+        """
+        Returns the position the given element has, or would have, in ascending order, in O(log n).
+        
+        Args:
+            key: The element to locate.
+        
+        Returns:
+            int: The number of elements strictly less than the given element.
+        
+        Raises:
+            UnsupportedOperationException: If the backend does not keep subtree sizes.
+        """
+        self._check(key)
+        self._require("rank")
+        return self._rb.rank(key)
+
+    def select(self, index):
+        """
+        Retrieves the element at the given position in ascending order, in O(log n).
+        
+        Args:
+            index (int): The 0-based position of the element.
+        
+        Returns:
+            The element at that position.
+        
+        Raises:
+            IndexError: If index is not in range(size()).
+            UnsupportedOperationException: If the backend does not keep subtree sizes.
+        """
+        self._require("select")
+        if not 0 <= index < self._size:
+            raise IndexError("TreeSet index out of range")
+        return self._rb.select(index)
+
+    def countRange(self, fromElement, toElement, fromInclusive=True, toInclusive=False):
+        """
+        Counts the elements between two bounds in O(log n).
+        
+        Args:
+            fromElement: The low endpoint.
+            toElement: The high endpoint.
+            fromInclusive (bool, optional): Whether the low endpoint is counted if present. Defaults to True.
+            toInclusive (bool, optional): Whether the high endpoint is counted if present. Defaults to False.
+        
+        Returns:
+            int: The number of elements in the range, 0 if the range is empty.
+        
+        Raises:
+            UnsupportedOperationException: If the backend does not keep subtree sizes.
+        """
+        self._check(fromElement)
+        self._check(toElement)
+        self._require("rank")
+        count = self._rb.rank(toElement, toInclusive) - self._rb.rank(fromElement, not fromInclusive)
+        return max(count, 0)
+
+    def __getitem__(self, index):
+        """
+        Retrieves the element at the given position in ascending order; negative positions count from the end.
+        
+        Args:
+            index (int): The position of the element.
+        
+        Returns:
+            The element at that position.
+        
+        Raises:
+            IndexError: If index is out of range.
+            TypeError: If index is not an int.
+        """
+        if not isinstance(index, int):
+            raise TypeError(f"TreeSet indices must be integers, not {type(index).__name__}")
+        if index < 0:
+            index += self._size
+        return self.select(index)
+
+    def _query_batch(self, operation, keys, query):
+        """
+        Answers a batch of queries, in one vectorized call when the backend implements the operation
+        and otherwise with _sorted_queries.
+        
+        Args:
+            operation (str): The name of the backend's batch method.
+            keys (iterable): The query elements; a NumPy array is passed to a backend that supports the
+                operation without per-element checks.
+            query (str): The name of the backend's single-query method.
+        
+        Returns:
+            list: The answers, in the order of keys.
+        """
+        batch = getattr(self._rb, operation, None)
+        if batch is not None and hasattr(keys, "dtype"):
+            return batch(keys)
+        keys = keys.tolist() if hasattr(keys, "tolist") else list(keys)
+        self._check_all(keys)
+        if batch is not None:
+            return batch(keys)
+        return self._sorted_queries(query, keys)
+
+    def _sorted_queries(self, kind, keys):
+        """
+        Answers a batch of queries in ascending order of the queries and returns the answers in the
+        original order.
+        
+        A batch with fewer queries than half the set's size, or any batch on a set with a key, comparator
+        or reverse order, is answered one query at a time, through a cursor when the backend has one, so
+        each descent starts from the previous answer and costs O(log(n/m)) on average. A larger batch is
+        answered in a single in-order sweep that walks the tree from the smallest query to the largest,
+        in O(n + m) after sorting the queries; stepping from one element to the next is cheap enough
+        that this wins from about m = n/2 upwards.
+        
+        Args:
+            kind (str): "contains", "floor", "ceiling" or "rank".
+            keys (list): The validated query elements.
+        
+        Returns:
+            list: The answers, in the order of keys.
+        """
+        result = [None] * len(keys)
+        if not keys:
+            return result
+        if self._sort_key is None:
+            order = sorted(range(len(keys)), key=keys.__getitem__, reverse=self._reverse)
+        else:
+            sort_keys = list(map(self._sort_key, keys))
+            order = sorted(range(len(keys)), key=sort_keys.__getitem__, reverse=self._reverse)
+        tree = self._rb
+        if 2 * len(keys) < self._size or self._before is not None:
+            finger = tree.cursor() if kind != "rank" and hasattr(tree, "cursor") else tree
+            query = getattr(finger, kind)
+            for i in order:
+                result[i] = query(keys[i])
+            return result
+        first = keys[order[0]]
+        below = tree.lower(first)
+        rank = tree.rank(first) if kind == "rank" else 0
+        elements = tree.iter_from(first)
+        end = object()
+        current = next(elements, end)
+        for i in order:
+            key = keys[i]
+            while current is not end and current < key:
+                below = current
+                rank += 1
+                current = next(elements, end)
+            if kind == "contains":
+                result[i] = current is not end and current == key
+            elif kind == "floor":
+                result[i] = current if current is not end and current == key else below
+            elif kind == "ceiling":
+                result[i] = None if current is end else current
+            else:
+                result[i] = rank
+        return result
+
+    def contains_many(self, keys):
+        """
+        Checks which of a batch of elements are in the set.
+        
+        The batch is answered as a whole: a backend with vectorized batch queries gets it in one call, and
+        otherwise the queries are sorted once and answered in a single merged sweep over the tree (or by
+        cursor descents when the batch is small), in O(n + m) or O(m log(n/m)) rather than O(m log n).
+        
+        Args:
+            keys (iterable): The elements to check for.
+        
+        Returns:
+            list: For each element, in order, True if it is present and False otherwise.
+        """
+        return self._query_batch("contains_many", keys, "contains")
+
+    def floor_many(self, keys):
+        """
+        Retrieves, for each of a batch of elements, the greatest element less than or equal to it.
+        
+        The batch is answered as a whole, like contains_many.
+        
+        Args:
+            keys (iterable): The elements to compare.
+        
+        Returns:
+            list: For each element, in order, the matching element or None.
+        """
+        return self._query_batch("floor_many", keys, "floor")
+
+    def ceiling_many(self, keys):
+        """
+        Retrieves, for each of a batch of elements, the least element greater than or equal to it.
+        
+        The batch is answered as a whole, like contains_many.
+        
+        Args:
+            keys (iterable): The elements to compare.
+        
+        Returns:
+            list: For each element, in order, the matching element or None.
+        """
+        return self._query_batch("ceiling_many", keys, "ceiling")
+
+    def rank_many(self, keys):
+        """
+        Returns, for each of a batch of elements, the number of elements in the set strictly less than it.
+        
+        The batch is answered as a whole, like contains_many.
+        
+        Args:
+            keys (iterable): The elements to locate.
+        
+        Returns:
+            list: The ranks, in the order of keys.
+        
+        Raises:
+            UnsupportedOperationException: If the backend does not keep subtree sizes.
+        """
+        self._require("rank")
+        return self._query_batch("rank_many", keys, "rank")
+
     def __iter__(self):
         """
         Returns an iterator over the elements in this set in ascending order.
@@ -283,14 +963,22 @@ class TreeSet:
         """
         return self._rb.__iter__()
     
-    def iterator(self):
+    def iterator(self, fromElement=None, inclusive=True):
         """
         Returns an iterator over the elements in this set in ascending order.
         
+        Args:
+            fromElement (optional): If given, iteration starts at the least element greater than or equal to
+                (or strictly greater than, if inclusive is False) this element, located in O(log n).
+            inclusive (bool, optional): Whether fromElement itself is returned if present. Defaults to True.
+        
         Returns:
             iterator: An iterator over the elements in ascending order.
         """
-        return self.__iter__()
+        if fromElement is None:
+            return self.__iter__()
+        self._check(fromElement)
+        return self._rb.iter_from(fromElement, inclusive)
     
     def __reversed__(self):
         """
@@ -301,11 +989,603 @@ class TreeSet:
         """
         return self._rb.__reversed__()
     
-    def descendingIterator(self):
+    def descendingIterator(self, fromElement=None, inclusive=True):
         """
         Returns an iterator over the elements in this set in descending order.
         
+        Args:
+            fromElement (optional): If given, iteration starts at the greatest element less than or equal to
+                (or strictly less than, if inclusive is False) this element, located in O(log n).
+            inclusive (bool, optional): Whether fromElement itself is returned if present. Defaults to True.
+        
         Returns:
             iterator: An iterator over the elements in descending order.
         """
-        return self.__reversed__()
+        if fromElement is None:
+            return self.__reversed__()
+        self._check(fromElement)
+        return self._rb.iter_from(fromElement, inclusive, reverse=True)
+
+    def iter_batches(self, size, reverse=False, fromElement=None, inclusive=True):
+        """
+        Returns an iterator over the elements in lists of up to size elements, which avoids one
+        interpreter-level call per element on large scans.
+        
+        Args:
+            size (int): The maximum number of elements per list.
+            reverse (bool, optional): Whether to iterate in descending order. Defaults to False.
+            fromElement (optional): If given, iteration starts at this element (or the next one in iteration order).
+            inclusive (bool, optional): Whether fromElement itself is returned if present. Defaults to True.
+        
+        Returns:
+            iterator: An iterator over lists of elements.
+        
+        Raises:
+            ValueError: If size is not positive.
+        """
+        if size < 1:
+            raise ValueError("batch size must be positive")
+        if fromElement is not None:
+            self._check(fromElement)
+        return self._rb.iter_batches(size, reverse, fromElement, inclusive)
+
+    def subSet(self, fromElement, toElement, fromInclusive=True, toInclusive=False):
+        """
+        Returns a live view of the portion of this set whose elements range from fromElement to toElement.
+        
+        Args:
+            fromElement: The low endpoint.
+            toElement: The high endpoint.
+            fromInclusive (bool, optional): Whether fromElement is included in the view. Defaults to True.
+            toInclusive (bool, optional): Whether toElement is included in the view. Defaults to False.
+        
+        Returns:
+            SubSet: A view backed by this set.
+        
+        Raises:
+            IllegalArgumentException: If fromElement is greater than toElement.
+        """
+        self._check(fromElement)
+        self._check(toElement)
+        if self._precedes(toElement, fromElement):
+            raise IllegalArgumentException("fromKey > toKey")
+        return SubSet(self, fromElement, fromInclusive, toElement, toInclusive)
+
+    def headSet(self, toElement, inclusive=False):
+        """
+        Returns a live view of the portion of this set whose elements are less than (or equal to, if inclusive is True) toElement.
+        
+        Args:
+            toElement: The high endpoint.
+            inclusive (bool, optional): Whether toElement is included in the view. Defaults to False.
+        
+        Returns:
+            SubSet: A view backed by this set.
+        """
+        self._check(toElement)
+        return SubSet(self, high=toElement, highInclusive=inclusive)
+
+    def tailSet(self, fromElement, inclusive=True):
+        """
+        Returns a live view of the portion of this set whose elements are greater than (or equal to, if inclusive is True) fromElement.
+        
+        Args:
+            fromElement: The low endpoint.
+            inclusive (bool, optional): Whether fromElement is included in the view. Defaults to True.
+        
+        Returns:
+            SubSet: A view backed by this set.
+        """
+        self._check(fromElement)
+        return SubSet(self, low=fromElement, lowInclusive=inclusive)
+
+    def descendingSet(self):
+        """
+        Returns a live view of the elements of this set in descending order.
+        
+        Returns:
+            SubSet: A view backed by this set.
+        """
+        return SubSet(self, descending=True)
+
+    def _other_keys(self, other):
+        """
+        Returns the distinct elements of another collection in ascending order, validated for this set.
+        
+        Args:
+            other (iterable): A TreeSet or any iterable of elements.
+        
+        Returns:
+            list: The distinct elements in ascending order.
+        """
+        if isinstance(other, TreeSet) and self._same_order(other):
+            keys = list(other._rb)
+            if not issubclass(other._type, self._type):
+                self._check_all(keys)
+            return keys
+        keys = list(other)
+        self._check_all(keys)
+        return self._sorted_unique(keys, self._sort_key, self._reverse)
+
+    def _with_keys(self, keys):
+        """
+        Creates a TreeSet configured like this one and holding the given elements.
+        
+        Args:
+            keys (list): Distinct elements in ascending order.
+        
+        Returns:
+            TreeSet: The new set.
+        """
+        result = self._empty_copy()
+        result._rb.load_sorted(keys)
+        result._size = len(keys)
+        return result
+
+    def _replace_keys(self, keys):
+        """
+        Replaces the contents of this set with the given elements.
+        
+        Args:
+            keys (list): Distinct elements in ascending order.
+        
+        Returns:
+            bool: True if the size of the set changed, False otherwise.
+        """
+        changed = len(keys) != self._size
+        self._rb = self._new_tree()
+        self._rb.load_sorted(keys)
+        self._size = len(keys)
+        return changed
+
+    def _probes_other(self, other):
+        """
+        Checks whether another collection is a TreeSet of a related type that is so much larger than
+        this set that probing it once per element of this set beats reading it whole.
+        
+        Args:
+            other (iterable): A TreeSet or any iterable of elements.
+        
+        Returns:
+            bool: True if the elements of this set should be looked up in the other set.
+        """
+        return (isinstance(other, TreeSet) and self._same_order(other)
+                and (issubclass(other._type, self._type) or issubclass(self._type, other._type))
+                and self._few(self._size, other._size))
+
+    @staticmethod
+    def _few(small, large):
+        """
+        Checks whether probing the larger collection once per element of the smaller one, at O(m log n),
+        is cheaper than merging both, at O(n + m).
+        
+        Args:
+            small (int): The size of the smaller collection.
+            large (int): The size of the larger collection.
+        
+        Returns:
+            bool: True if probing is cheaper.
+        """
+        return small * large.bit_length() < large
+
+    @staticmethod
+    def _merge(a, b, keep_a, keep_both, keep_b, key=None, reverse=False):
+        """
+        Merges two ascending lists of distinct elements in one pass.
+        
+        Args:
+            a (list): The first list.
+            b (list): The second list.
+            keep_a (bool): Whether to keep elements found only in a.
+            keep_both (bool): Whether to keep elements found in both.
+            keep_b (bool): Whether to keep elements found only in b.
+            key (callable, optional): The lists are ordered by key(element) rather than by the elements.
+            reverse (bool, optional): The lists are in descending order.
+        
+        Returns:
+            list: The kept elements in the order of the lists.
+        """
+        if reverse:
+            return TreeSet._merge(a[::-1], b[::-1], keep_a, keep_both, keep_b, key)[::-1]
+        result = []
+        append = result.append
+        i = j = 0
+        len_a, len_b = len(a), len(b)
+        if key is not None:
+            keys_a, keys_b = list(map(key, a)), list(map(key, b))
+            while i < len_a and j < len_b:
+                x, y = keys_a[i], keys_b[j]
+                if x < y:
+                    if keep_a:
+                        append(a[i])
+                    i += 1
+                elif y < x:
+                    if keep_b:
+                        append(b[j])
+                    j += 1
+                else:
+                    if keep_both:
+                        append(a[i])
+                    i += 1
+                    j += 1
+        while i < len_a and j < len_b:
+            x, y = a[i], b[j]
+            if x < y:
+                if keep_a:
+                    append(x)
+                i += 1
+            elif y < x:
+                if keep_b:
+                    append(y)
+                j += 1
+            else:
+                if keep_both:
+                    append(x)
+                i += 1
+                j += 1
+        if keep_a:
+            result.extend(a[i:])
+        if keep_b:
+            result.extend(b[j:])
+        return result
+
+    def _merge_ordered(self, a, b, keep_a, keep_both, keep_b):
+        """
+        Merges two lists of distinct elements that are in this set's order, like _merge.
+        """
+        return self._merge(a, b, keep_a, keep_both, keep_b, self._sort_key, self._reverse)
+
+    def union(self, other):
+        """
+        Returns a new set with the elements of this set and of another collection, in O(n + m).
+        
+        Args:
+            other (iterable): A TreeSet or any iterable of elements.
+        
+        Returns:
+            TreeSet: The union.
+        """
+        return self._with_keys(self._merge_ordered(list(self._rb), self._other_keys(other), True, True, True))
+
+    def intersection(self, other):
+        """
+        Returns a new set with the elements present both in this set and in another collection.
+        
+        Runs in O(n + m), or in O(m log n) by probing this set when the other collection is much smaller.
+        
+        Args:
+            other (iterable): A TreeSet or any iterable of elements.
+        
+        Returns:
+            TreeSet: The intersection.
+        """
+        if self._probes_other(other):
+            contains = other._rb.contains
+            return self._with_keys([key for key in self._rb if contains(key)])
+        keys = self._other_keys(other)
+        if self._few(len(keys), self._size):
+            return self._with_keys([stored for stored in map(self._getter(), keys) if stored is not None])
+        return self._with_keys(self._merge_ordered(list(self._rb), keys, False, True, False))
+
+    def difference(self, other):
+        """
+        Returns a new set with the elements of this set that are not in another collection, in O(n + m).
+        
+        Args:
+            other (iterable): A TreeSet or any iterable of elements.
+        
+        Returns:
+            TreeSet: The difference.
+        """
+        if self._probes_other(other):
+            contains = other._rb.contains
+            return self._with_keys([key for key in self._rb if not contains(key)])
+        return self._with_keys(self._merge_ordered(list(self._rb), self._other_keys(other), True, False, False))
+
+    def symmetricDifference(self, other):
+        """
+        Returns a new set with the elements found in exactly one of this set and another collection, in O(n + m).
+        
+        Args:
+            other (iterable): A TreeSet or any iterable of elements.
+        
+        Returns:
+            TreeSet: The symmetric difference.
+        """
+        return self._with_keys(self._merge_ordered(list(self._rb), self._other_keys(other), True, False, True))
+
+    def retainAll(self, other):
+        """
+        Removes the elements of this set that are not in another collection.
+        
+        Args:
+            other (iterable): A TreeSet or any iterable of elements.
+        
+        Returns:
+            bool: True if the TreeSet was modified, False otherwise.
+        """
+        keys = self._other_keys(other)
+        if self._few(len(keys), self._size):
+            return self._replace_keys([stored for stored in map(self._getter(), keys) if stored is not None])
+        return self._replace_keys(self._merge_ordered(list(self._rb), keys, False, True, False))
+
+    def removeAll(self, other):
+        """
+        Removes the elements of another collection from this set.
+        
+        Deletes them one by one in O(m log n) when the other collection is much smaller, and otherwise
+        rebuilds the set from a merge in O(n + m).
+        
+        Args:
+            other (iterable): A TreeSet or any iterable of elements.
+        
+        Returns:
+            bool: True if the TreeSet was modified, False otherwise.
+        """
+        keys = self._other_keys(other)
+        if self._few(len(keys), self._size):
+            changed = False
+            for key in keys:
+                if self._rb.delete(key):
+                    self._size -= 1
+                    changed = True
+            return changed
+        return self._replace_keys(self._merge_ordered(list(self._rb), keys, True, False, False))
+
+    def symmetricDifferenceUpdate(self, other):
+        """
+        Keeps only the elements found in exactly one of this set and another collection.
+        
+        Args:
+            other (iterable): A TreeSet or any iterable of elements.
+        
+        Returns:
+            bool: True if the TreeSet was modified, False otherwise.
+        """
+        keys = self._other_keys(other)
+        if self._few(len(keys), self._size):
+            for key in keys:
+                if self._rb.delete(key):
+                    self._size -= 1
+                else:
+                    self._rb.insert(key)
+                    self._size += 1
+            return bool(keys)
+        merged = self._merge_ordered(list(self._rb), keys, True, False, True)
+        self._replace_keys(merged)
+        return bool(keys)
+
+    def isSubset(self, other):
+        """
+        Checks whether every element of this set is in another collection.
+        
+        Args:
+            other (iterable): A TreeSet or any iterable of elements.
+        
+        Returns:
+            bool: True if this set is a subset of the other collection.
+        """
+        if self._probes_other(other):
+            return all(other._rb.contains(key) for key in self._rb)
+        keys = self._other_keys(other)
+        if self._size > len(keys):
+            return False
+        return len(self._merge_ordered(list(self._rb), keys, False, True, False)) == self._size
+
+    def isDisjoint(self, other):
+        """
+        Checks whether this set and another collection have no element in common.
+        
+        Args:
+            other (iterable): A TreeSet or any iterable of elements.
+        
+        Returns:
+            bool: True if no element is in both.
+        """
+        if self._probes_other(other):
+            return not any(other._rb.contains(key) for key in self._rb)
+        keys = self._other_keys(other)
+        if self._few(len(keys), self._size):
+            return not any(self._rb.contains(key) for key in keys)
+        return not self._merge_ordered(list(self._rb), keys, False, True, False)
+
+    def split(self, key):
+        """
+        Splits this set around an element in O(log n).
+        
+        The elements are moved into the returned sets rather than copied, so this set is left empty.
+        
+        Args:
+            key: The element to split at.
+        
+        Returns:
+            tuple: A TreeSet with the elements less than key, the stored element equal to key (or None if
+            there is none), and a TreeSet with the elements greater than key.
+        
+        Raises:
+            UnsupportedOperationException: If the backend does not support splitting.
+        """
+        self._check(key)
+        self._require("split")
+        low_tree, found, high_tree = self._rb.split(key)
+        low, high = self._empty_copy(), self._empty_copy()
+        low._rb, low._size = low_tree, low_tree.root.size
+        high._rb, high._size = high_tree, high_tree.root.size
+        self._size = 0
+        return low, found, high
+
+    def join(self, other):
+        """
+        Moves all elements of another set into this one in O(log n), provided that all of them are
+        less than, or all of them are greater than, every element of this set.
+        
+        Args:
+            other (TreeSet): The set to absorb; it is left empty.
+        
+        Returns:
+            bool: True if the TreeSet was modified, False otherwise.
+        
+        Raises:
+            IllegalArgumentException: If the ranges of the two sets overlap or the sets are ordered differently.
+            UnsupportedOperationException: If either backend does not support joining.
+        """
+        self._require("join")
+        other._require("join")
+        if other is self or other._size == 0:
+            return False
+        if not issubclass(other._type, self._type):
+            self._check_all(list(other._rb))
+        if not self._same_order(other):
+            raise IllegalArgumentException("the sets are ordered differently")
+        if self._size == 0 or self._precedes(self._rb.last(), other._rb.first()):
+            left, right = self._rb, other._rb
+        elif self._precedes(other._rb.last(), self._rb.first()):
+            left, right = other._rb, self._rb
+        else:
+            raise IllegalArgumentException("the sets' ranges overlap")
+        self._rb = type(self._rb).join(left, right)
+        if self._instrumentation is not None:
+            InstrumentedRedBlackTree.enable(self._rb, *self._instrumentation)
+        self._size += other._size
+        other._size = 0
+        return True
+
+    def instrument(self, callback=None):
+        """
+        Starts counting key comparisons, rotations and fixup loop iterations for every tree operation.
+        
+        The tree is switched to an instrumented subclass, so sets that are not instrumented run the
+        plain code at no cost. Counts accumulate until uninstrument is called and are reported by
+        treeStats; callback, if given, receives an OperationStats after each operation.
+        
+        Args:
+            callback (callable, optional): Called with the OperationStats of each tree operation.
+        
+        Raises:
+            UnsupportedOperationException: If the backend is not "rbtree".
+        """
+        if self._backend != "rbtree" or self._before is not None:
+            raise UnsupportedOperationException("instrumentation is only supported by the 'rbtree' backend in natural order")
+        totals = self._rb.totals if self._instrumentation is not None else OperationStats("total")
+        self._instrumentation = (callback, totals)
+        InstrumentedRedBlackTree.enable(self._rb, callback, totals)
+
+    def uninstrument(self):
+        """
+        Stops counting and returns the tree to the plain implementation.
+        """
+        if self._instrumentation is not None:
+            self._instrumentation = None
+            InstrumentedRedBlackTree.disable(self._rb)
+
+    def treeStats(self):
+        """
+        Measures the shape of the tree in O(n) and, when instrumented, reports the counts so far.
+        
+        Returns:
+            dict: "height", "black_height", "nodes" and "node_bytes" (the memory of the nodes, excluding
+                their keys), plus "comparisons", "rotations" and "fixup_iterations" totals when instrumented.
+        
+        Raises:
+            UnsupportedOperationException: If the backend is not "rbtree".
+        """
+        if self._backend != "rbtree":
+            raise UnsupportedOperationException(f"treeStats is not supported by the {self._backend!r} backend")
+        stats = shape(self._rb)
+        if self._instrumentation is not None:
+            totals = self._instrumentation[1].as_dict()
+            del totals["operation"]
+            stats.update(totals)
+        return stats
+
+    def cacheStats(self):
+        """
+        Reports the page cache counters of a backend that keeps its elements in pages on disk.
+        
+        Returns:
+            dict: "hits", "misses" (pages read from disk), "hit_rate", "evictions", "writes" (pages written
+                back), "cached_pages", "cache_pages" (the capacity) and "file_pages".
+        
+        Raises:
+            UnsupportedOperationException: If the backend has no page cache.
+        """
+        self._require("cacheStats")
+        return self._rb.cacheStats()
+
+    def cursor(self):
+        """
+        Returns a cursor for answering a stream of nearby navigation queries.
+        
+        The cursor remembers the position of its last answer and starts the next search from there, so
+        queries for neighbouring elements cost O(log d) instead of O(log n), where d is the distance
+        between consecutive answers. It stays valid across modifications of the set; after a change the
+        next search simply starts again from the root. Backends without finger search answer each query
+        with a regular descent.
+        
+        Returns:
+            TreeSet.Cursor: A cursor over this set.
+        """
+        return self.Cursor(self)
+
+    class Cursor:
+        """
+        A finger into a TreeSet offering floor, ceiling, higher, lower and contains.
+        """
+
+        def __init__(self, tree_set):
+            """
+            Initializes the cursor at the root of the set.
+            
+            Args:
+                tree_set (TreeSet): The set to search.
+            """
+            self._set = tree_set
+            self._tree = None
+            self._finger = None
+
+        def _target(self, key):
+            """
+            Validates the key and returns the object the query is delegated to.
+            
+            Args:
+                key: The element to search for.
+            
+            Returns:
+                The tree's finger if the backend supports one, otherwise the tree itself.
+            """
+            self._set._check(key)
+            tree = self._set._rb
+            if tree is not self._tree:
+                self._tree = tree
+                self._finger = tree.cursor() if hasattr(tree, "cursor") else tree
+            return self._finger
+
+        def floor(self, key):
+            """
+            Retrieves the greatest element less than or equal to the given element, or None.
+            """
+            return self._target(key).floor(key)
+
+        def ceiling(self, key):
+            """
+            Retrieves the least element greater than or equal to the given element, or None.
+            """
+            return self._target(key).ceiling(key)
+
+        def higher(self, key):
+            """
+            Retrieves the least element strictly greater than the given element, or None.
+            """
+            return self._target(key).higher(key)
+
+        def lower(self, key):
+            """
+            Retrieves the greatest element strictly less than the given element, or None.
+            """
+            return self._target(key).lower(key)
+
+        def contains(self, key):
+            """
+            Checks if the set contains the given element.
+            """
+            return self._target(key).contains(key)
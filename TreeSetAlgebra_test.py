@@ -0,0 +1,71 @@
+import unittest
+from TreeSet import TreeSet
+import random
+
+class TestTreeSetAlgebra(unittest.TestCase):
+
+    def pairs(self):
+        for size_a, size_b in ((0, 0), (0, 20), (200, 200), (500, 3), (3, 500), (1000, 1)):
+            a = set(random.sample(range(2000), size_a))
+            b = set(random.sample(range(2000), size_b))
+            yield a, b, TreeSet(int, a), TreeSet(int, b)
+
+    def test_new_sets(self):
+        for a, b, set_a, set_b in self.pairs():
+            self.assertEqual(list(set_a.union(set_b)), sorted(a | b))
+            self.assertEqual(list(set_a.intersection(set_b)), sorted(a & b))
+            self.assertEqual(list(set_a.difference(set_b)), sorted(a - b))
+            self.assertEqual(list(set_a.symmetricDifference(set_b)), sorted(a ^ b))
+            self.assertEqual(set_a.union(set_b).size(), len(a | b))
+            self.assertEqual(list(set_a), sorted(a))
+
+    def test_predicates(self):
+        for a, b, set_a, set_b in self.pairs():
+            self.assertEqual(set_a.isSubset(set_b), a <= b)
+            self.assertEqual(set_a.isDisjoint(set_b), a.isdisjoint(b))
+            self.assertTrue(set_a.intersection(set_b).isSubset(set_a))
+            self.assertTrue(set_a.isSubset(set_a.union(set_b)))
+
+    def test_in_place(self):
+        for a, b, set_a, set_b in self.pairs():
+            retained = set_a.clone()
+            self.assertEqual(retained.retainAll(set_b), a & b != a)
+            self.assertEqual(list(retained), sorted(a & b))
+            removed = set_a.clone()
+            self.assertEqual(removed.removeAll(set_b), bool(a & b))
+            self.assertEqual(list(removed), sorted(a - b))
+            toggled = set_a.clone()
+            toggled.symmetricDifferenceUpdate(set_b)
+            self.assertEqual(list(toggled), sorted(a ^ b))
+            self.assertEqual(toggled.size(), len(a ^ b))
+
+    def test_plain_iterables(self):
+        tree_set = TreeSet(int, [1, 2, 3, 4])
+        self.assertEqual(list(tree_set.union([6, 5, 5])), [1, 2, 3, 4, 5, 6])
+        self.assertEqual(list(tree_set.intersection(range(3, 10))), [3, 4])
+        self.assertTrue(tree_set.isSubset(range(10)))
+        self.assertFalse(tree_set.isDisjoint([4]))
+        with self.assertRaises(TypeError):
+            tree_set.union(["a"])
+
+    def test_results_keep_stored_elements(self):
+        # One query against 200 elements probes the set; three against three merge.
+        for size, queries in ((200, ["yy"]), (3, ["x", "yy", "zzz"])):
+            stored = ["a" * length for length in range(1, size + 1)]
+            expected = [stored[len(query) - 1] for query in queries]
+            tree_set = TreeSet(str, stored, key=len)
+            self.assertTrue(all(a is b for a, b in zip(tree_set.intersection(queries), expected)))
+            tree_set.retainAll(queries)
+            self.assertEqual(list(tree_set), expected)
+            self.assertTrue(all(a is b for a, b in zip(tree_set, expected)))
+            self.assertIs(tree_set.intern("bb"), stored[1])
+
+    def test_results_keep_configuration(self):
+        tree_set = TreeSet(int, [1, 2, 3], backend="array", validation="strict")
+        result = tree_set.union(TreeSet(int, [4]))
+        self.assertEqual(result._backend, "array")
+        self.assertEqual(result._validation, "strict")
+        self.assertEqual(list(result), [1, 2, 3, 4])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+from TreeSet import TreeSet
+from Exceptions import NullPointerException, NoSuchElementException
+import random
+
+class TestTreeSetArrayBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.tree_set = TreeSet(int, backend="array")
+        self.values = list(range(1, 51))
+        values_random = self.values.copy()
+        random.shuffle(values_random)
+        for value in values_random:
+            self.tree_set.add(value)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            TreeSet(int, backend="unknown")
+
+    def test_size_after_adding_elements(self):
+        self.assertEqual(self.tree_set.size(), 50)
+        self.assertFalse(self.tree_set.add(25))
+        self.assertEqual(self.tree_set.size(), 50)
+
+    def test_iterator(self):
+        self.assertEqual(list(self.tree_set), self.values)
+        self.assertEqual(list(reversed(self.tree_set)), list(reversed(self.values)))
+
+    def test_navigation(self):
+        self.assertEqual(self.tree_set.first(), 1)
+        self.assertEqual(self.tree_set.last(), 50)
+        self.assertEqual(self.tree_set.floor(0), None)
+        self.assertEqual(self.tree_set.floor(60), 50)
+        self.assertEqual(self.tree_set.ceiling(25), 25)
+        self.assertEqual(self.tree_set.ceiling(51), None)
+        self.assertEqual(self.tree_set.higher(25), 26)
+        self.assertEqual(self.tree_set.lower(25), 24)
+
+    def test_pollFirst_and_pollLast(self):
+        self.assertEqual(self.tree_set.pollFirst(), 1)
+        self.assertEqual(self.tree_set.pollLast(), 50)
+        self.assertEqual(list(self.tree_set), self.values[1:-1])
+
+    def test_remove_and_reuse_slots(self):
+        for value in self.values[::2]:
+            self.assertTrue(self.tree_set.remove(value))
+        slots = len(self.tree_set._rb.keys)
+        for value in self.values[::2]:
+            self.assertTrue(self.tree_set.add(value))
+        self.assertEqual(len(self.tree_set._rb.keys), slots)
+        self.assertEqual(list(self.tree_set), self.values)
+
+    def test_random_operations_match_sorted_list(self):
+        model = set(self.values)
+        for _ in range(2000):
+            value = random.randint(0, 100)
+            if random.random() < 0.5:
+                self.assertEqual(self.tree_set.add(value), value not in model)
+                model.add(value)
+            else:
+                self.assertEqual(self.tree_set.remove(value), value in model)
+                model.discard(value)
+        self.assertEqual(list(self.tree_set), sorted(model))
+        self.assertEqual(self.tree_set.size(), len(model))
+
+    def test_clone_is_independent(self):
+        clone = self.tree_set.clone()
+        clone.remove(1)
+        self.assertTrue(self.tree_set.contains(1))
+        self.assertFalse(clone.contains(1))
+
+    def test_clear(self):
+        self.tree_set.clear()
+        self.assertTrue(self.tree_set.isEmpty())
+        with self.assertRaises(NoSuchElementException):
+            self.tree_set.first()
+
+    def test_add_null(self):
+        with self.assertRaises(NullPointerException):
+            self.tree_set.add(None)
+
+if __name__ == '__main__':
+    unittest.main()
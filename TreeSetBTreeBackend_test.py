@@ -0,0 +1,133 @@
+import unittest
+import random
+from TreeSet import TreeSet
+from BTree import BTree, BTreeNode, BTreeLeaf
+
+def check_btree(test, tree):
+    """
+    Checks the B+tree invariants: sorted leaves at one depth, valid separators and child sizes, node
+    fill bounds and a leaf chain that visits every leaf in order. Returns the number of keys.
+    """
+    leaves = []
+    def walk(node, low, high, depth, root):
+        limit = tree.node_size
+        if type(node) is BTreeLeaf:
+            test.assertLessEqual(len(node.keys), limit)
+            if not root:
+                test.assertGreaterEqual(len(node.keys), limit // 2)
+            test.assertTrue(all(a < b for a, b in zip(node.keys, node.keys[1:])))
+            test.assertTrue(all((low is None or low <= key) and (high is None or key < high) for key in node.keys))
+            leaves.append((node, depth))
+            return len(node.keys)
+        test.assertEqual(len(node.keys), len(node.children) - 1)
+        test.assertLessEqual(len(node.children), limit)
+        test.assertGreaterEqual(len(node.children), 2 if root else limit // 2)
+        bounds = [low] + node.keys + [high]
+        total = 0
+        for i, child in enumerate(node.children):
+            size = walk(child, bounds[i], bounds[i + 1], depth + 1, False)
+            test.assertEqual(node.sizes[i], size)
+            total += size
+        return total
+    count = walk(tree.root, None, None, 0, True)
+    test.assertEqual(len({depth for _, depth in leaves}), 1)
+    chain = [leaf for leaf, _ in leaves]
+    for left, right in zip(chain, chain[1:]):
+        test.assertIs(left.next, right)
+        test.assertIs(right.prev, left)
+    test.assertIsNone(chain[0].prev)
+    test.assertIsNone(chain[-1].next)
+    return count
+
+class TestTreeSetBTreeBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.values = random.sample(range(-100000, 100000), 3000)
+        self.tree_set = TreeSet(int, backend="btree", backend_options={"node_size": 8})
+        for value in self.values:
+            self.tree_set.add(value)
+        self.reference = TreeSet(int, self.values)
+
+    def test_node_size(self):
+        self.assertEqual(TreeSet(int, backend="btree")._rb.node_size, BTree._NODE_SIZE)
+        self.assertEqual(self.tree_set._rb.node_size, 8)
+        self.assertEqual(self.tree_set.clone()._rb.node_size, 8)
+        self.assertEqual(self.tree_set.union(TreeSet(int, [0]))._rb.node_size, 8)
+        with self.assertRaises(ValueError):
+            TreeSet(int, backend="btree", backend_options={"node_size": 2})
+        with self.assertRaises(TypeError):
+            TreeSet(int, backend="rbtree", backend_options={"node_size": 8})
+
+    def test_matches_red_black_tree(self):
+        self.assertEqual(check_btree(self, self.tree_set._rb), 3000)
+        self.assertEqual(list(self.tree_set), list(self.reference))
+        self.assertEqual(list(reversed(self.tree_set)), list(reversed(self.reference)))
+        for key in random.sample(range(-100010, 100010), 500):
+            self.assertEqual(self.tree_set.contains(key), self.reference.contains(key))
+            self.assertEqual(self.tree_set.floor(key), self.reference.floor(key))
+            self.assertEqual(self.tree_set.ceiling(key), self.reference.ceiling(key))
+            self.assertEqual(self.tree_set.higher(key), self.reference.higher(key))
+            self.assertEqual(self.tree_set.lower(key), self.reference.lower(key))
+            self.assertEqual(self.tree_set.rank(key), self.reference.rank(key))
+        for index in [0, 1, 1500, 2998, 2999]:
+            self.assertEqual(self.tree_set.select(index), self.reference.select(index))
+
+    def test_random_operations_keep_invariants(self):
+        model = set(self.values)
+        for step in range(6000):
+            value = random.randint(-100000, 100000) if step % 3 else random.choice(self.values)
+            if random.random() < 0.4:
+                self.assertEqual(self.tree_set.add(value), value not in model)
+                model.add(value)
+            else:
+                self.assertEqual(self.tree_set.remove(value), value in model)
+                model.discard(value)
+        self.assertEqual(check_btree(self, self.tree_set._rb), len(model))
+        self.assertEqual(list(self.tree_set), sorted(model))
+        self.assertEqual(self.tree_set.size(), len(model))
+
+    def test_poll_until_empty(self):
+        expected = sorted(self.values)
+        self.assertEqual(self.tree_set.pollFirst(), expected[0])
+        self.assertEqual(self.tree_set.pollLast(), expected[-1])
+        self.assertEqual(self.tree_set.pollFirstN(1000), expected[1:1001])
+        check_btree(self, self.tree_set._rb)
+        polled = [self.tree_set.pollLast() for _ in range(self.tree_set.size())]
+        self.assertEqual(polled, expected[1001:-1][::-1])
+        self.assertTrue(self.tree_set.isEmpty())
+        self.assertIsInstance(self.tree_set._rb.root, BTreeLeaf)
+        self.assertIsNone(self.tree_set.pollFirst())
+        self.assertIsNone(self.tree_set.floor(0))
+
+    def test_iteration_from(self):
+        key = sorted(self.values)[1500]
+        self.assertEqual(list(self.tree_set.iterator(key)), list(self.reference.iterator(key)))
+        self.assertEqual(list(self.tree_set.descendingIterator(key, False)), list(self.reference.descendingIterator(key, False)))
+        self.assertEqual(list(self.tree_set.subSet(-500, 500)), list(self.reference.subSet(-500, 500)))
+        self.tree_set.subSet(-500, 500).clear()
+        self.reference.subSet(-500, 500).clear()
+        self.assertEqual(list(self.tree_set), list(self.reference))
+
+    def test_bulk_load_and_clone(self):
+        tree_set = TreeSet(int, range(10000), backend="btree", backend_options={"node_size": 16})
+        self.assertEqual(check_btree(self, tree_set._rb), 10000)
+        self.assertIsInstance(tree_set._rb.root, BTreeNode)
+        copy = tree_set.clone()
+        copy.add(-1)
+        tree_set.remove(0)
+        self.assertEqual(copy.first(), -1)
+        self.assertEqual(tree_set.first(), 1)
+        self.assertEqual(check_btree(self, copy._rb), 10001)
+        for size in [0, 1, 48, 49, 65, 97, 3000]:
+            tree_set = TreeSet(int, range(size), backend="btree")
+            self.assertEqual(check_btree(self, tree_set._rb), size)
+
+    def test_intern_returns_stored_element(self):
+        stored = (1, "a")
+        tree_set = TreeSet(tuple, [stored], backend="btree")
+        self.assertIs(tree_set.intern((1, "a")), stored)
+        self.assertIs(tree_set.get((1, "a")), stored)
+        self.assertIsNone(tree_set.get((2, "b")))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+import random
+from TreeSet import TreeSet
+from Exceptions import NullPointerException, UnsupportedOperationException
+
+class TestTreeSetBatchQueries(unittest.TestCase):
+
+    def setUp(self):
+        self.values = random.sample(range(0, 20000, 2), 5000)
+
+    def check(self, tree_set, queries):
+        self.assertEqual(tree_set.contains_many(queries), [tree_set.contains(q) for q in queries])
+        self.assertEqual(tree_set.floor_many(queries), [tree_set.floor(q) for q in queries])
+        self.assertEqual(tree_set.ceiling_many(queries), [tree_set.ceiling(q) for q in queries])
+        if tree_set._backend != "array":
+            self.assertEqual(tree_set.rank_many(queries), [tree_set.rank(q) for q in queries])
+
+    def test_large_batches_use_a_merged_sweep(self):
+        for backend in ("rbtree", "array", "persistent"):
+            tree_set = TreeSet(int, self.values, backend=backend)
+            queries = [random.randrange(-10, 20010) for _ in range(3000)]
+            self.check(tree_set, queries)
+            self.check(tree_set, queries + queries[:100])
+
+    def test_small_batches_use_descents(self):
+        for backend in ("rbtree", "array", "persistent"):
+            tree_set = TreeSet(int, self.values, backend=backend)
+            self.check(tree_set, [random.randrange(-10, 20010) for _ in range(20)])
+
+    def test_results_follow_query_order(self):
+        tree_set = TreeSet(int, [10, 20, 30])
+        queries = [35, 5, 20, 25, 20, 10]
+        self.assertEqual(tree_set.contains_many(queries), [False, False, True, False, True, True])
+        self.assertEqual(tree_set.floor_many(queries), [30, None, 20, 20, 20, 10])
+        self.assertEqual(tree_set.ceiling_many(iter(queries)), [None, 10, 20, 30, 20, 10])
+        self.assertEqual(tree_set.rank_many(queries), [3, 0, 1, 2, 1, 0])
+
+    def test_empty_inputs(self):
+        tree_set = TreeSet(int)
+        self.assertEqual(tree_set.contains_many([]), [])
+        self.assertEqual(tree_set.floor_many([1, 2]), [None, None])
+        self.assertEqual(tree_set.rank_many([1]), [0])
+
+    def test_validation(self):
+        tree_set = TreeSet(int, self.values)
+        with self.assertRaises(NullPointerException):
+            tree_set.contains_many([1, None])
+        with self.assertRaises(TypeError):
+            tree_set.floor_many([1, "2"])
+        with self.assertRaises(UnsupportedOperationException):
+            TreeSet(int, backend="array").rank_many([1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+from TreeSet import TreeSet
+from RedBlackTree import RED, BLACK
+from Exceptions import NullPointerException
+import random
+
+def black_height(tree, node):
+    if node == tree.nil:
+        return 1
+    if node.color == RED:
+        assert node.left.color == BLACK and node.right.color == BLACK
+    for child in (node.left, node.right):
+        if child != tree.nil:
+            assert child.parent is node
+    left = black_height(tree, node.left)
+    assert left == black_height(tree, node.right)
+    return left + (node.color == BLACK)
+
+class TestTreeSetBulkLoad(unittest.TestCase):
+
+    def assertValidTree(self, tree_set):
+        tree = tree_set._rb
+        self.assertEqual(tree.root.color, BLACK)
+        black_height(tree, tree.root)
+
+    def test_constructor_with_sorted_collection(self):
+        for n in range(0, 40):
+            tree_set = TreeSet(int, range(n))
+            self.assertEqual(list(tree_set), list(range(n)))
+            self.assertEqual(tree_set.size(), n)
+            self.assertValidTree(tree_set)
+
+    def test_constructor_with_unsorted_duplicates(self):
+        values = [random.randint(0, 200) for _ in range(500)]
+        tree_set = TreeSet(int, values)
+        self.assertEqual(list(tree_set), sorted(set(values)))
+        self.assertEqual(tree_set.size(), len(set(values)))
+        self.assertValidTree(tree_set)
+
+    def test_tree_stays_valid_after_updates(self):
+        tree_set = TreeSet(int, range(0, 1000, 2))
+        for value in random.sample(range(1000), 600):
+            if value % 3:
+                tree_set.add(value)
+            else:
+                tree_set.remove(value)
+        self.assertValidTree(tree_set)
+        self.assertEqual(list(tree_set), sorted(tree_set))
+
+    def test_addAll_large_batch_merges(self):
+        tree_set = TreeSet(int, [1, 3, 5])
+        self.assertTrue(tree_set.addAll([5, 4, 2, 6]))
+        self.assertEqual(list(tree_set), [1, 2, 3, 4, 5, 6])
+        self.assertEqual(tree_set.size(), 6)
+        self.assertValidTree(tree_set)
+
+    def test_addAll_small_batch_inserts(self):
+        tree_set = TreeSet(int, range(100))
+        self.assertTrue(tree_set.addAll([150, 120]))
+        self.assertEqual(tree_set.size(), 102)
+        self.assertEqual(tree_set.last(), 150)
+
+    def test_addAll_without_new_elements(self):
+        tree_set = TreeSet(int, range(10))
+        self.assertFalse(tree_set.addAll(range(10)))
+        self.assertFalse(tree_set.addAll([]))
+        self.assertEqual(tree_set.size(), 10)
+
+    def test_addAll_rejects_null_before_modifying(self):
+        tree_set = TreeSet(int, [1, 2])
+        with self.assertRaises(NullPointerException):
+            tree_set.addAll([3, None, 4])
+        self.assertEqual(list(tree_set), [1, 2])
+
+    def test_array_backend_bulk_load(self):
+        values = random.sample(range(1000), 300)
+        tree_set = TreeSet(int, values, backend="array")
+        self.assertEqual(list(tree_set), sorted(values))
+        tree_set.add(-1)
+        tree_set.remove(sorted(values)[10])
+        self.assertEqual(tree_set.first(), -1)
+        self.assertEqual(tree_set.size(), 300)
+
+if __name__ == '__main__':
+    unittest.main()
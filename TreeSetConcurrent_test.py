@@ -0,0 +1,95 @@
+import unittest
+import threading
+from ConcurrentTreeSet import ConcurrentTreeSet, ReadWriteLock
+from Exceptions import NoSuchElementException
+
+class TestConcurrentTreeSet(unittest.TestCase):
+
+    def check_basic_operations(self, tree_set):
+        self.assertTrue(tree_set.isEmpty())
+        with self.assertRaises(NoSuchElementException):
+            tree_set.first()
+        self.assertTrue(tree_set.addAll(range(0, 100, 2)))
+        self.assertTrue(tree_set.add(7))
+        self.assertFalse(tree_set.add(8))
+        self.assertEqual(tree_set.size(), 51)
+        self.assertTrue(tree_set.contains(7))
+        self.assertEqual(tree_set.floor(9), 8)
+        self.assertEqual(tree_set.ceiling(9), 10)
+        self.assertEqual(tree_set.higher(8), 10)
+        self.assertEqual(tree_set.lower(8), 7)
+        self.assertEqual(tree_set.rank(8), 5)
+        self.assertEqual(tree_set.select(5), 8)
+        self.assertTrue(tree_set.remove(7))
+        self.assertTrue(tree_set.removeAll(x for x in range(50, 100)))
+        self.assertEqual(list(tree_set), list(range(0, 50, 2)))
+        self.assertEqual(list(tree_set.descendingIterator()), list(range(48, -1, -2)))
+        self.assertEqual(tree_set.pollFirst(), 0)
+        self.assertEqual(tree_set.pollLast(), 48)
+        self.assertTrue(tree_set.retainAll([2, 4, 5]))
+        self.assertEqual(list(tree_set), [2, 4])
+        tree_set.clear()
+        self.assertEqual(tree_set.size(), 0)
+
+    def test_locked(self):
+        self.check_basic_operations(ConcurrentTreeSet(int))
+
+    def test_snapshot_reads(self):
+        self.check_basic_operations(ConcurrentTreeSet(int, snapshot_reads=True))
+
+    def test_snapshot_reads_requires_persistent_backend(self):
+        with self.assertRaises(ValueError):
+            ConcurrentTreeSet(int, backend="array", snapshot_reads=True)
+
+    def test_iteration_is_isolated_from_writes(self):
+        for snapshot_reads in (False, True):
+            tree_set = ConcurrentTreeSet(int, range(10), snapshot_reads=snapshot_reads)
+            iterator = iter(tree_set)
+            snapshot = tree_set.snapshot()
+            tree_set.removeAll(range(5))
+            self.assertEqual(list(iterator), list(range(10)))
+            self.assertEqual(list(snapshot), list(range(10)))
+
+    def test_failed_batch_leaves_snapshot_unchanged(self):
+        tree_set = ConcurrentTreeSet(int, range(10), snapshot_reads=True)
+        with self.assertRaises(TypeError):
+            tree_set.addAll([20, "x"])
+        self.assertEqual(list(tree_set), list(range(10)))
+
+    def test_concurrent_writers_and_readers(self):
+        for snapshot_reads in (False, True):
+            tree_set = ConcurrentTreeSet(int, snapshot_reads=snapshot_reads)
+            errors = []
+
+            def writer(offset):
+                for start in range(offset, 2000, 400):
+                    tree_set.addAll(range(start, start + 100))
+
+            def reader():
+                for _ in range(200):
+                    # addAll is atomic, so every batch of 100 is visible in full or not at all.
+                    if tree_set.size() % 100:
+                        errors.append(tree_set.size())
+
+            threads = [threading.Thread(target=writer, args=(offset,)) for offset in range(0, 400, 100)]
+            threads += [threading.Thread(target=reader) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(errors, [])
+            self.assertEqual(list(tree_set), list(range(2000)))
+
+    def test_read_write_lock_excludes_writer(self):
+        lock = ReadWriteLock()
+        events = []
+        with lock.readLock():
+            writer = threading.Thread(target=lambda: (lock.acquireWrite(), events.append("write"), lock.releaseWrite()))
+            writer.start()
+            writer.join(0.05)
+            events.append("read")
+        writer.join()
+        self.assertEqual(events, ["read", "write"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+from TreeSet import TreeSet
+from Exceptions import NullPointerException
+import bisect
+import random
+
+class TestTreeSetCursor(unittest.TestCase):
+
+    def setUp(self):
+        self.values = sorted(random.sample(range(0, 1000), 200))
+        self.tree_set = TreeSet(int, self.values)
+        self.cursor = self.tree_set.cursor()
+
+    def expected(self, operation, key):
+        values = self.values
+        if operation == "floor":
+            index = bisect.bisect_right(values, key)
+            return values[index - 1] if index else None
+        if operation == "ceiling":
+            index = bisect.bisect_left(values, key)
+            return values[index] if index < len(values) else None
+        if operation == "higher":
+            index = bisect.bisect_right(values, key)
+            return values[index] if index < len(values) else None
+        if operation == "lower":
+            index = bisect.bisect_left(values, key)
+            return values[index - 1] if index else None
+        return key in values
+
+    def test_local_query_stream(self):
+        key = 500
+        for _ in range(3000):
+            key += random.randint(-15, 15)
+            operation = random.choice(["floor", "ceiling", "higher", "lower", "contains"])
+            self.assertEqual(getattr(self.cursor, operation)(key), self.expected(operation, key))
+
+    def test_queries_match_tree_set(self):
+        for key in range(-10, 1010, 7):
+            self.assertEqual(self.cursor.floor(key), self.tree_set.floor(key))
+            self.assertEqual(self.cursor.ceiling(key), self.tree_set.ceiling(key))
+            self.assertEqual(self.cursor.higher(key), self.tree_set.higher(key))
+            self.assertEqual(self.cursor.lower(key), self.tree_set.lower(key))
+            self.assertEqual(self.cursor.contains(key), self.tree_set.contains(key))
+
+    def test_cursor_survives_modifications(self):
+        key = self.values[100]
+        self.assertTrue(self.cursor.contains(key))
+        self.tree_set.remove(key)
+        self.assertFalse(self.cursor.contains(key))
+        self.assertEqual(self.cursor.floor(key), self.values[99])
+        self.tree_set.add(key)
+        self.assertEqual(self.cursor.floor(key), key)
+        self.tree_set.clear()
+        self.assertIsNone(self.cursor.floor(key))
+        self.assertFalse(self.cursor.contains(key))
+        self.tree_set.add(3)
+        self.assertEqual(self.cursor.ceiling(key - 1000), 3)
+
+    def test_cursor_on_array_backend(self):
+        tree_set = TreeSet(int, self.values, backend="array")
+        cursor = tree_set.cursor()
+        for key in range(-10, 1010, 13):
+            self.assertEqual(cursor.floor(key), self.expected("floor", key))
+            self.assertEqual(cursor.higher(key), self.expected("higher", key))
+
+    def test_cursor_null(self):
+        with self.assertRaises(NullPointerException):
+            self.cursor.floor(None)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+import unittest
+import os
+import random
+import tempfile
+from unittest import mock
+from TreeSet import TreeSet
+from DiskBTree import DiskBTree, NONE
+from Exceptions import UnsupportedOperationException
+
+SMALL = {"page_size": 512, "cache_pages": 64}
+
+def check_disk_btree(test, tree):
+    """
+    Checks the page invariants, reading every page back from the file after the cache is written out:
+    sorted leaves at one depth, valid separators, fill bounds and a complete leaf chain. Returns the
+    keys in order.
+    """
+    for page in tree._cache.values():
+        if page.dirty:
+            tree._write(page)
+    leaves = []
+    def walk(number, low, high, depth, root):
+        page = tree._read(number)
+        if page.leaf:
+            test.assertLessEqual(len(page.keys), tree._leaf_size)
+            if not root:
+                test.assertGreaterEqual(len(page.keys), tree._leaf_size // 2)
+            test.assertTrue(all(a < b for a, b in zip(page.keys, page.keys[1:])))
+            test.assertTrue(all((low is None or low <= key) and (high is None or key < high) for key in page.keys))
+            leaves.append((page, depth))
+            return
+        test.assertLessEqual(len(page.children), tree._node_size)
+        test.assertGreaterEqual(len(page.children), 2 if root else tree._node_size // 2)
+        bounds = [low] + page.keys + [high]
+        for i, child in enumerate(page.children):
+            walk(child, bounds[i], bounds[i + 1], depth + 1, False)
+    walk(tree._root, None, None, 0, True)
+    test.assertEqual(len({depth for _, depth in leaves}), 1)
+    chain = [page for page, _ in leaves]
+    for left, right in zip(chain, chain[1:]):
+        test.assertEqual(left.next, right.number)
+        test.assertEqual(right.prev, left.number)
+    test.assertEqual(chain[0].prev, NONE)
+    test.assertEqual(chain[-1].next, NONE)
+    return [key for page in chain for key in page.keys]
+
+class TestTreeSetDiskBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.values = random.sample(range(-10**6, 10**6), 20000)
+        self.tree_set = TreeSet(int, backend="disk", backend_options=SMALL)
+        for value in self.values:
+            self.tree_set.add(value)
+        self.reference = TreeSet(int, self.values)
+
+    def test_options(self):
+        with self.assertRaises(TypeError):
+            TreeSet(str, backend="disk")
+        with self.assertRaises(ValueError):
+            TreeSet(int, backend="disk", backend_options={"page_size": 100})
+        with self.assertRaises(ValueError):
+            TreeSet(int, backend="disk", backend_options={"cache_pages": 1})
+        with self.assertRaises(OverflowError):
+            self.tree_set.add(2**63)
+        with self.assertRaises(UnsupportedOperationException):
+            TreeSet(int).cacheStats()
+
+    def test_pages_are_written_back(self):
+        stats = self.tree_set.cacheStats()
+        self.assertEqual(stats["cached_pages"], 64)
+        self.assertGreater(stats["file_pages"], 64)
+        self.assertGreater(stats["evictions"], 0)
+        self.assertGreater(stats["writes"], 0)
+        self.assertEqual(check_disk_btree(self, self.tree_set._rb), list(self.reference))
+
+    def test_matches_red_black_tree(self):
+        self.assertEqual(list(self.tree_set), list(self.reference))
+        self.assertEqual(list(reversed(self.tree_set)), list(reversed(self.reference)))
+        for key in random.sample(range(-10**6 - 10, 10**6 + 10), 1000):
+            self.assertEqual(self.tree_set.contains(key), self.reference.contains(key))
+            self.assertEqual(self.tree_set.floor(key), self.reference.floor(key))
+            self.assertEqual(self.tree_set.ceiling(key), self.reference.ceiling(key))
+            self.assertEqual(self.tree_set.higher(key), self.reference.higher(key))
+            self.assertEqual(self.tree_set.lower(key), self.reference.lower(key))
+        self.assertEqual(self.tree_set.first(), self.reference.first())
+        self.assertEqual(self.tree_set.last(), self.reference.last())
+
+    def test_random_operations_keep_invariants(self):
+        model = set(self.values)
+        for step in range(20000):
+            value = random.randint(-10**6, 10**6) if step % 2 else random.choice(self.values)
+            if random.random() < 0.3:
+                self.assertEqual(self.tree_set.add(value), value not in model)
+                model.add(value)
+            else:
+                self.assertEqual(self.tree_set.remove(value), value in model)
+                model.discard(value)
+        self.assertEqual(check_disk_btree(self, self.tree_set._rb), sorted(model))
+        self.assertEqual(self.tree_set.size(), len(model))
+
+    def test_poll_until_empty(self):
+        expected = sorted(self.values)
+        self.assertEqual(self.tree_set.pollFirstN(5000), expected[:5000])
+        self.assertEqual(self.tree_set.pollLastN(5000), expected[-5000:][::-1])
+        while self.tree_set.size() > 1:
+            self.tree_set.pollFirst()
+        self.assertEqual(self.tree_set.pollLast(), expected[-5001])
+        self.assertIsNone(self.tree_set.pollFirst())
+        self.assertIsNone(self.tree_set.floor(0))
+        self.assertEqual(check_disk_btree(self, self.tree_set._rb), [])
+
+    def test_range_scans(self):
+        key = sorted(self.values)[10000]
+        self.assertEqual(list(self.tree_set.iterator(key, False)), list(self.reference.iterator(key, False)))
+        self.assertEqual(list(self.tree_set.descendingIterator(key)), list(self.reference.descendingIterator(key)))
+        self.assertEqual(list(self.tree_set.subSet(-5000, 5000)), list(self.reference.subSet(-5000, 5000)))
+        self.assertEqual([len(batch) for batch in self.tree_set.iter_batches(7000)], [7000, 7000, 6000])
+
+    def test_scans_do_not_evict_the_cache(self):
+        tree = self.tree_set._rb
+        path, leaf = tree._path(self.values[0])
+        hot = {page.number for page, _ in path} | {leaf.number}
+        misses = self.tree_set.cacheStats()["misses"]
+        self.assertEqual(sum(1 for _ in self.tree_set), 20000)
+        self.assertGreater(self.tree_set.cacheStats()["misses"] - misses, 100)
+        self.assertLessEqual(hot, set(tree._cache))
+        hits = self.tree_set.cacheStats()["hits"]
+        self.assertTrue(self.tree_set.contains(self.values[0]))
+        self.assertEqual(self.tree_set.cacheStats()["hits"] - hits, len(hot))
+
+    def test_bulk_load_writes_leaves_in_order(self):
+        tree_set = TreeSet(int, range(100000), backend="disk", backend_options=SMALL)
+        tree = tree_set._rb
+        self.assertEqual(tree.cacheStats()["cached_pages"], 0)
+        self.assertEqual(check_disk_btree(self, tree), list(range(100000)))
+        leaves = [tree._read(tree._root)]
+        while not leaves[0].leaf:
+            leaves = [tree._read(leaves[0].children[0])]
+        self.assertEqual(leaves[0].number, 0)
+        self.assertEqual(leaves[0].next, 1)
+        for size in [0, 1, 60, 61, 62, 100, 3000]:
+            loaded = TreeSet(float, [float(x) for x in range(size)], backend="disk", backend_options=SMALL)
+            self.assertEqual(check_disk_btree(self, loaded._rb), [float(x) for x in range(size)])
+
+    def test_bulk_loads_merge_with_contents(self):
+        tree = self.tree_set._rb
+        # Write the dirty pages back first, so that evictions during the lookups write nothing.
+        check_disk_btree(self, tree)
+        writes = self.tree_set.cacheStats()["writes"]
+        with mock.patch.object(DiskBTree, "load_sorted", side_effect=AssertionError("rebuilt")):
+            self.assertFalse(self.tree_set.addAll(self.values * 2))
+        self.assertIs(self.tree_set._rb, tree)
+        self.assertEqual(self.tree_set.cacheStats()["writes"], writes)
+        batch = list(range(-10**6 - 30000, -10**6)) + self.values[:5000]
+        self.assertTrue(self.tree_set.addAll(batch))
+        self.reference.addAll(batch)
+        self.assertEqual(self.tree_set.size(), 50000)
+        self.assertEqual(check_disk_btree(self, self.tree_set._rb), list(self.reference))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "set.tset")
+            self.tree_set.save(path)
+            loaded = TreeSet.load(path, backend="disk", backend_options=SMALL)
+            self.assertEqual(loaded.size(), 50000)
+            self.assertEqual(check_disk_btree(self, loaded._rb), list(self.reference))
+
+    def test_clone_is_independent(self):
+        clone = self.tree_set.clone()
+        clone.add(10**7)
+        self.tree_set.remove(self.reference.first())
+        self.assertEqual(clone.last(), 10**7)
+        self.assertEqual(clone.first(), self.reference.first())
+        self.assertEqual(clone._rb.page_size, 512)
+        self.assertEqual(check_disk_btree(self, clone._rb), list(self.reference) + [10**7])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+import unittest
+import os
+import random
+import shutil
+import tempfile
+from DurableTreeSet import DurableTreeSet, LOG_HEADER
+from Exceptions import StreamCorruptedException
+
+class TestTreeSetDurable(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = os.path.join(directory.name, "set")
+
+    def open(self, data_type=int, **options):
+        durable = DurableTreeSet(self.directory, data_type, **options)
+        self.addCleanup(durable.close)
+        return durable
+
+    def log_size(self):
+        return os.path.getsize(os.path.join(self.directory, DurableTreeSet.LOG))
+
+    def test_changes_survive_reopening(self):
+        durable = self.open()
+        values = random.sample(range(10000), 500)
+        for value in values:
+            self.assertTrue(durable.add(value))
+        self.assertFalse(durable.add(values[0]))
+        for value in values[:100]:
+            self.assertTrue(durable.remove(value))
+        self.assertFalse(durable.remove(values[0]))
+        self.assertEqual(durable.loggedChanges(), 600)
+        reopened = self.open()
+        self.assertEqual(list(reopened), sorted(values[100:]))
+        self.assertEqual(reopened.recoveryStats()["replayed_records"], 600)
+        self.assertEqual(reopened.recoveryStats()["snapshot_elements"], 0)
+
+    def test_batch_operations_polls_and_clear(self):
+        durable = self.open()
+        self.assertTrue(durable.addAll(range(100)))
+        self.assertTrue(durable.removeAll(x for x in range(0, 100, 3)))
+        self.assertEqual(durable.pollFirst(), 1)
+        self.assertEqual(durable.pollLast(), 98)
+        self.assertEqual(durable.pollFirstN(3), [2, 4, 5])
+        self.assertEqual(durable.pollLastN(2), [97, 95])
+        self.assertEqual(durable.intern(1000), 1000)
+        expected = list(durable)
+        self.assertEqual(self.open().snapshot().size(), len(expected))
+        self.assertEqual(list(self.open()), expected)
+        durable.clear()
+        self.assertEqual(list(self.open()), [])
+
+    def test_group_commit_buffers_until_sync(self):
+        durable = self.open(group_commit=10)
+        empty = self.log_size()
+        for value in range(5):
+            durable.add(value)
+        self.assertEqual(self.log_size(), empty)
+        with DurableTreeSet(self.directory, int) as other:
+            self.assertEqual(list(other), [])
+        for value in range(5, 10):
+            durable.add(value)
+        self.assertGreater(self.log_size(), empty)
+        durable.add(10)
+        durable.sync()
+        self.assertEqual(list(self.open()), list(range(11)))
+
+    def test_commit_interval(self):
+        durable = self.open(group_commit=1000, commit_interval=0)
+        durable.add(1)
+        self.assertEqual(list(self.open()), [1])
+
+    def test_torn_tail_is_truncated(self):
+        durable = self.open()
+        durable.addAll(range(10))
+        durable.add(10)
+        durable.close()
+        path = os.path.join(self.directory, DurableTreeSet.LOG)
+        size = os.path.getsize(path)
+        with open(path, "r+b") as file:
+            file.truncate(size - 1)
+        reopened = self.open()
+        self.assertEqual(list(reopened), list(range(10)))
+        self.assertEqual(reopened.recoveryStats()["replayed_records"], 1)
+        reopened.add(20)
+        self.assertEqual(list(self.open()), list(range(10)) + [20])
+
+    def test_corrupt_record_stops_replay(self):
+        durable = self.open()
+        durable.add(1)
+        durable.add(2)
+        durable.close()
+        path = os.path.join(self.directory, DurableTreeSet.LOG)
+        with open(path, "r+b") as file:
+            file.seek(-1, os.SEEK_END)
+            last = file.read(1)
+            file.seek(-1, os.SEEK_END)
+            file.write(bytes([last[0] ^ 0xFF]))
+        self.assertEqual(list(self.open()), [1])
+
+    def test_compaction(self):
+        durable = self.open(compact_every=50)
+        durable.addAll(range(40))
+        self.assertEqual(durable.loggedChanges(), 40)
+        for value in range(1000, 1010):
+            durable.add(value)
+        self.assertEqual(durable.loggedChanges(), 0)
+        self.assertEqual(self.log_size(), LOG_HEADER.size)
+        for value in range(1010, 1100):
+            durable.add(value)
+        self.assertEqual(durable.loggedChanges(), 40)
+        reopened = self.open()
+        self.assertEqual(list(reopened), list(range(40)) + list(range(1000, 1100)))
+        self.assertEqual(reopened.recoveryStats()["snapshot_elements"], 100)
+        self.assertEqual(reopened.recoveryStats()["replayed_records"], 40)
+
+    def test_replaying_a_compacted_log_is_harmless(self):
+        durable = self.open(compact_every=None)
+        durable.addAll(range(20))
+        durable.remove(5)
+        durable.add(5)
+        durable.clear()
+        durable.addAll([3, 1, 2])
+        durable.remove(2)
+        durable.sync()
+        log = os.path.join(self.directory, DurableTreeSet.LOG)
+        saved = os.path.join(self.directory, "saved.log")
+        shutil.copy(log, saved)
+        durable.compact()
+        self.assertEqual(self.log_size(), LOG_HEADER.size)
+        durable.close()
+        os.replace(saved, log)
+        self.assertEqual(list(self.open()), [1, 3])
+
+    def test_invalid_elements_are_not_logged(self):
+        durable = self.open()
+        with self.assertRaises(TypeError):
+            durable.add("a")
+        self.assertEqual(durable.loggedChanges(), 0)
+        self.assertEqual(list(self.open()), [])
+
+    def test_data_type_mismatch(self):
+        durable = self.open()
+        durable.add(1)
+        durable.compact()
+        with self.assertRaises(TypeError):
+            DurableTreeSet(self.directory, str)
+
+    def test_not_a_log(self):
+        os.makedirs(self.directory)
+        with open(os.path.join(self.directory, DurableTreeSet.LOG), "wb") as file:
+            file.write(b"garbage!garbage!")
+        with self.assertRaises(StreamCorruptedException):
+            DurableTreeSet(self.directory, int)
+
+    def test_invalid_options(self):
+        with self.assertRaises(ValueError):
+            DurableTreeSet(self.directory, int, group_commit=0)
+        with self.assertRaises(ValueError):
+            DurableTreeSet(self.directory, int, compact_every=0)
+
+if __name__ == '__main__':
+    unittest.main()
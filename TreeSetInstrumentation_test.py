@@ -0,0 +1,89 @@
+import unittest
+import math
+import random
+from TreeSet import TreeSet
+from RedBlackTree import RedBlackTree
+from InstrumentedRedBlackTree import InstrumentedRedBlackTree
+from Exceptions import UnsupportedOperationException
+
+class TestTreeSetInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.reports = []
+        self.tree_set = TreeSet(int)
+        self.tree_set.instrument(self.reports.append)
+
+    def test_counts_operations(self):
+        for value in random.sample(range(10000), 1000):
+            self.tree_set.add(value)
+        stats = self.tree_set.treeStats()
+        self.assertEqual(stats["nodes"], 1000)
+        self.assertGreater(stats["comparisons"], 1000)
+        self.assertGreater(stats["rotations"], 0)
+        self.assertGreater(stats["fixup_iterations"], 0)
+        self.assertEqual(len(self.reports), 1000)
+        self.assertEqual({report.operation for report in self.reports}, {"insert"})
+        self.assertEqual(sum(report.comparisons for report in self.reports), stats["comparisons"])
+
+    def test_per_operation_reports(self):
+        self.tree_set.addAll(range(100))
+        self.reports.clear()
+        self.assertTrue(self.tree_set.contains(50))
+        self.assertEqual(self.reports[-1].operation, "contains")
+        self.assertLessEqual(self.reports[-1].comparisons, 2 * 2 * math.log2(101))
+        self.assertEqual(self.reports[-1].rotations, 0)
+        self.assertEqual(self.tree_set.floor(50), 50)
+        self.assertEqual(self.reports[-1].operation, "floor")
+        self.tree_set.remove(10)
+        self.assertEqual(self.reports[-1].operation, "delete")
+        self.assertEqual(self.tree_set.pollFirst(), 0)
+        self.assertEqual(self.reports[-1].operation, "pollFirst")
+        self.assertFalse(self.tree_set.add(20))
+        self.assertEqual(list(self.tree_set), [n for n in range(1, 100) if n != 10])
+        self.assertIs(type(self.tree_set.first()), int)
+
+    def test_shape(self):
+        tree_set = TreeSet(int, random.sample(range(100000), 5000))
+        stats = tree_set.treeStats()
+        self.assertEqual(stats["nodes"], 5000)
+        self.assertLessEqual(stats["height"], 2 * math.log2(5001))
+        self.assertGreater(stats["black_height"], 0)
+        self.assertGreater(stats["node_bytes"], 0)
+        self.assertNotIn("comparisons", stats)
+
+    def test_survives_rebuilds(self):
+        self.tree_set.addAll(range(50))
+        self.tree_set.clear()
+        self.tree_set.addAll(range(1000))
+        self.assertIs(type(self.tree_set._rb), InstrumentedRedBlackTree)
+        self.assertEqual(self.tree_set.treeStats()["nodes"], 1000)
+        self.assertIs(type(self.tree_set.clone()._rb), RedBlackTree)
+
+    def test_survives_clearing_a_view(self):
+        self.tree_set.addAll(range(1000))
+        self.tree_set.subSet(100, 900).clear()
+        self.assertIs(type(self.tree_set._rb), InstrumentedRedBlackTree)
+        comparisons = self.tree_set.treeStats()["comparisons"]
+        self.reports.clear()
+        self.assertTrue(self.tree_set.contains(950))
+        self.assertEqual([report.operation for report in self.reports], ["contains"])
+        self.assertGreater(self.tree_set.treeStats()["comparisons"], comparisons)
+        self.assertEqual(self.tree_set.treeStats()["nodes"], 200)
+
+    def test_uninstrument(self):
+        self.tree_set.add(1)
+        self.tree_set.uninstrument()
+        self.assertIs(type(self.tree_set._rb), RedBlackTree)
+        self.tree_set.add(2)
+        self.assertEqual(len(self.reports), 1)
+        self.assertNotIn("comparisons", self.tree_set.treeStats())
+        self.assertEqual(list(self.tree_set), [1, 2])
+
+    def test_other_backends(self):
+        with self.assertRaises(UnsupportedOperationException):
+            TreeSet(int, backend="array").instrument()
+        with self.assertRaises(UnsupportedOperationException):
+            TreeSet(int, backend="persistent").treeStats()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import random
+from TreeSet import TreeSet
+from ConcurrentTreeSet import ConcurrentTreeSet
+from TreeSetSplitJoin_test import check_tree
+
+class Label(str):
+    pass
+
+class TestTreeSetIntern(unittest.TestCase):
+
+    def test_get_returns_stored_instance(self):
+        for backend in ("rbtree", "array", "persistent"):
+            stored = Label("alpha")
+            tree_set = TreeSet(str, [stored, Label("beta")], backend=backend)
+            self.assertIs(tree_set.get("alpha"), stored)
+            self.assertIsNone(tree_set.get("gamma"))
+            self.assertIsNone(tree_set.get("alp"))
+
+    def test_intern(self):
+        for backend in ("rbtree", "array", "persistent"):
+            tree_set = TreeSet(str, backend=backend)
+            first = "".join(["inter", "ned"])
+            second = "".join(["inter", "ned"])
+            self.assertIsNot(first, second)
+            self.assertIs(tree_set.intern(first), first)
+            self.assertIs(tree_set.intern(second), first)
+            self.assertEqual(tree_set.size(), 1)
+            self.assertIs(tree_set.first(), first)
+
+    def test_add_keeps_caller_object(self):
+        label = Label("x")
+        tree_set = TreeSet(str, [label])
+        tree_set.add(Label("y"))
+        self.assertIs(type(tree_set.first()), Label)
+        self.assertIs(tree_set.first(), label)
+        self.assertIs(TreeSet(int, [True], backend="array").first(), True)
+
+    def test_duplicates_keep_tree_valid(self):
+        values = [random.randint(0, 200) for _ in range(3000)]
+        tree_set = TreeSet(int)
+        canonical = {}
+        for value in values:
+            self.assertIs(tree_set.intern(value), canonical.setdefault(value, value))
+        self.assertEqual(list(tree_set), sorted(canonical))
+        self.assertEqual(tree_set.size(), len(canonical))
+        check_tree(tree_set._rb)
+
+    def test_keyed_and_concurrent(self):
+        tree_set = TreeSet(str, ["apple"], key=len)
+        self.assertEqual(tree_set.get("pearl"), "apple")
+        self.assertEqual(tree_set.intern("fig"), "fig")
+        self.assertEqual(tree_set.intern("kiwi"), "kiwi")
+        self.assertEqual(tree_set.intern("plum"), "kiwi")
+        self.assertEqual(list(tree_set), ["fig", "kiwi", "apple"])
+        concurrent = ConcurrentTreeSet(int, [1, 2])
+        self.assertEqual(concurrent.intern(3), 3)
+        self.assertEqual(concurrent.get(2), 2)
+        self.assertEqual(concurrent.size(), 3)
+
+if __name__ == '__main__':
+    unittest.main()
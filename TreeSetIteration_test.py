@@ -0,0 +1,57 @@
+import unittest
+from TreeSet import TreeSet
+import random
+
+class TestTreeSetIteration(unittest.TestCase):
+
+    def setUp(self):
+        self.values = sorted(random.sample(range(0, 1000), 150))
+        self.sets = [TreeSet(int, self.values), TreeSet(int, self.values, backend="array")]
+
+    def test_seek_ascending(self):
+        for tree_set in self.sets:
+            for key in range(-5, 1005, 9):
+                self.assertEqual(list(tree_set.iterator(key)), [v for v in self.values if v >= key])
+                self.assertEqual(list(tree_set.iterator(key, False)), [v for v in self.values if v > key])
+
+    def test_seek_descending(self):
+        for tree_set in self.sets:
+            for key in range(-5, 1005, 9):
+                self.assertEqual(list(tree_set.descendingIterator(key)), [v for v in reversed(self.values) if v <= key])
+                self.assertEqual(list(tree_set.descendingIterator(key, False)), [v for v in reversed(self.values) if v < key])
+
+    def test_seek_existing_element(self):
+        key = self.values[40]
+        for tree_set in self.sets:
+            self.assertEqual(next(tree_set.iterator(key)), key)
+            self.assertEqual(next(tree_set.iterator(key, False)), self.values[41])
+            self.assertEqual(next(tree_set.descendingIterator(key, False)), self.values[39])
+
+    def test_batches(self):
+        for tree_set in self.sets:
+            for size in (1, 7, 150, 1000):
+                batches = list(tree_set.iter_batches(size))
+                self.assertTrue(all(len(batch) <= size for batch in batches))
+                self.assertEqual([key for batch in batches for key in batch], self.values)
+                batches = list(tree_set.iter_batches(size, reverse=True))
+                self.assertEqual([key for batch in batches for key in batch], list(reversed(self.values)))
+
+    def test_batches_from_element(self):
+        key = self.values[100]
+        for tree_set in self.sets:
+            batches = tree_set.iter_batches(16, fromElement=key, inclusive=False)
+            self.assertEqual([k for batch in batches for k in batch], self.values[101:])
+            batches = tree_set.iter_batches(16, reverse=True, fromElement=key)
+            self.assertEqual([k for batch in batches for k in batch], list(reversed(self.values[:101])))
+
+    def test_empty_and_invalid(self):
+        tree_set = TreeSet(int)
+        self.assertEqual(list(tree_set.iter_batches(4)), [])
+        self.assertEqual(list(tree_set.iterator(3)), [])
+        with self.assertRaises(ValueError):
+            tree_set.iter_batches(0)
+        with self.assertRaises(TypeError):
+            tree_set.iterator("3")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import unittest
+import random
+from TreeSet import TreeSet
+from Exceptions import IllegalArgumentException, UnsupportedOperationException
+from TreeSetSplitJoin_test import check_tree
+
+class Account:
+    comparisons = 0
+
+    def __init__(self, number, owner):
+        self.number = number
+        self.owner = owner
+
+    def __lt__(self, other):
+        Account.comparisons += 1
+        return self.number < other.number
+
+    def __gt__(self, other):
+        Account.comparisons += 1
+        return self.number > other.number
+
+    def __eq__(self, other):
+        Account.comparisons += 1
+        return self.number == other.number
+
+    __hash__ = object.__hash__
+
+class Point:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+def by_length(a, b):
+    return len(a) - len(b) or (a > b) - (a < b)
+
+class TestTreeSetKeyOrder(unittest.TestCase):
+
+    def test_key_skips_element_comparisons(self):
+        accounts = [Account(number, f"owner{number}") for number in random.sample(range(10000), 500)]
+        tree_set = TreeSet(Account, key=lambda account: account.number)
+        Account.comparisons = 0
+        for account in accounts:
+            tree_set.add(account)
+        self.assertTrue(tree_set.contains(accounts[0]))
+        self.assertIs(tree_set.floor(accounts[1]), accounts[1])
+        self.assertEqual(Account.comparisons, 0)
+        self.assertEqual([a.number for a in tree_set], sorted(a.number for a in accounts))
+        self.assertFalse(tree_set.add(Account(accounts[0].number, "someone else")))
+        self.assertEqual(tree_set.size(), 500)
+        check_tree(tree_set._rb)
+
+    def test_key_on_non_comparable_elements(self):
+        points = [Point(x, y) for x, y in random.sample([(x, y) for x in range(30) for y in range(30)], 200)]
+        tree_set = TreeSet(Point, points, key=lambda point: (point.y, point.x))
+        expected = sorted(points, key=lambda point: (point.y, point.x))
+        self.assertEqual(list(tree_set), expected)
+        self.assertEqual(tree_set.first(), expected[0])
+        self.assertEqual(tree_set.select(10), expected[10])
+        self.assertEqual(tree_set.rank(expected[10]), 10)
+        self.assertTrue(tree_set.remove(Point(expected[0].x, expected[0].y)))
+        self.assertEqual(tree_set.pollFirst(), expected[1])
+
+    def test_comparator(self):
+        words = ["pear", "fig", "banana", "kiwi", "apple", "date", "fig"]
+        tree_set = TreeSet(str, words, comparator=by_length)
+        self.assertEqual(list(tree_set), ["fig", "date", "kiwi", "pear", "apple", "banana"])
+        self.assertEqual(tree_set.ceiling("zzzz"), "apple")
+        self.assertEqual(tree_set.lower("aaaa"), "fig")
+        self.assertEqual(list(tree_set.headSet("kiwi")), ["fig", "date"])
+
+    def test_reverse_matches_mirrored_natural_order(self):
+        values = random.sample(range(1000), 300)
+        tree_set = TreeSet(int, values, reverse=True)
+        natural = TreeSet(int, values)
+        self.assertEqual(list(tree_set), list(reversed(natural)))
+        self.assertEqual(list(reversed(tree_set)), list(natural))
+        self.assertEqual(tree_set.first(), natural.last())
+        self.assertEqual(tree_set.last(), natural.first())
+        for key in random.sample(range(-5, 1005), 100):
+            self.assertEqual(tree_set.floor(key), natural.ceiling(key))
+            self.assertEqual(tree_set.ceiling(key), natural.floor(key))
+            self.assertEqual(tree_set.higher(key), natural.lower(key))
+            self.assertEqual(tree_set.lower(key), natural.higher(key))
+            self.assertEqual(tree_set.rank(key), natural.size() - natural.rank(key) - natural.contains(key))
+            self.assertEqual(list(tree_set.iterator(key)), list(natural.descendingIterator(key)))
+        self.assertEqual(tree_set.select(0), natural.last())
+        self.assertEqual(list(tree_set.subSet(700, 300)), list(natural.subSet(301, 701).descendingSet()))
+        with self.assertRaises(IllegalArgumentException):
+            tree_set.subSet(300, 700)
+        cursor = tree_set.cursor()
+        self.assertEqual([cursor.floor(key) for key in (900, 500, 100)], [natural.ceiling(key) for key in (900, 500, 100)])
+        self.assertEqual(tree_set.floor_many([900, 500, 100]), [natural.ceiling(key) for key in (900, 500, 100)])
+        self.assertEqual(tree_set.contains_many(list(range(1000))), natural.contains_many(list(range(1000))))
+
+    def test_cursor_repeats_return_elements(self):
+        words = TreeSet(str, ["a", "bb", "dddd"], key=len)
+        cursor = words.cursor()
+        self.assertEqual([cursor.floor(word) for word in ("xx", "yy", "xx")], ["bb", "bb", "bb"])
+        self.assertEqual([cursor.ceiling(word) for word in ("ccc", "zzz")], ["dddd", "dddd"])
+        self.assertEqual(words.floor_many(["xx", "yy", "xx"]), ["bb", "bb", "bb"])
+        self.assertEqual(words.ceiling_many(["yy", "xx", "zzz"]), ["bb", "bb", "dddd"])
+        backwards = TreeSet(int, range(0, 100, 10), reverse=True)
+        cursor = backwards.cursor()
+        self.assertEqual([cursor.floor(key) for key in (50, 50, 55)], [50, 50, 60])
+        self.assertEqual(backwards.ceiling_many([50, 50, 55]), [50, 50, 50])
+
+    def test_reverse_updates(self):
+        values = random.sample(range(1000), 300)
+        tree_set = TreeSet(int, values, reverse=True)
+        expected = sorted(values, reverse=True)
+        self.assertEqual(tree_set.pollFirst(), expected[0])
+        self.assertEqual(tree_set.pollLast(), expected[-1])
+        self.assertEqual(tree_set.pollFirstN(50), expected[1:51])
+        self.assertEqual(tree_set.pollLastN(50), expected[-2:-52:-1])
+        self.assertEqual(list(tree_set), expected[51:-51])
+        check_tree(tree_set._rb)
+        tree_set.addAll(range(1000, 1100))
+        self.assertEqual(tree_set.first(), 1099)
+        low, found, high = tree_set.split(500)
+        self.assertTrue(all(key > 500 for key in low))
+        self.assertTrue(all(key < 500 for key in high))
+        self.assertEqual(list(low) + ([found] if found is not None else []) + list(high), sorted(expected[51:-51] + list(range(1000, 1100)), reverse=True))
+        self.assertTrue(high.join(low))
+        self.assertEqual(high.first(), 1099)
+
+    def test_set_algebra_keeps_order(self):
+        a = TreeSet(int, range(0, 100, 2), reverse=True)
+        b = TreeSet(int, range(0, 100, 3), reverse=True)
+        self.assertEqual(list(a.union(b)), sorted(set(range(0, 100, 2)) | set(range(0, 100, 3)), reverse=True))
+        self.assertEqual(list(a.intersection(range(0, 100, 3))), list(range(96, -1, -6)))
+        a.removeAll(b)
+        self.assertEqual(list(a), sorted(set(range(0, 100, 2)) - set(range(0, 100, 3)), reverse=True))
+        self.assertTrue(TreeSet(int, [4, 2], reverse=True).isSubset(TreeSet(int, [1, 2, 3, 4])))
+        words = TreeSet(str, ["bb", "a", "ccc"], key=len)
+        self.assertEqual(list(words.union(["dddd", "e"])), ["a", "bb", "ccc", "dddd"])
+        self.assertEqual(list(words.clone()), ["a", "bb", "ccc"])
+
+    def test_invalid_configurations(self):
+        with self.assertRaises(ValueError):
+            TreeSet(str, key=len, comparator=by_length)
+        with self.assertRaises(ValueError):
+            TreeSet(int, backend="array", reverse=True)
+        with self.assertRaises(UnsupportedOperationException):
+            TreeSet(int, [1], reverse=True).save("unused.tset")
+        with self.assertRaises(IllegalArgumentException):
+            TreeSet(int, [1], reverse=True).join(TreeSet(int, [5]))
+
+if __name__ == '__main__':
+    unittest.main()
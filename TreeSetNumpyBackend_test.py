@@ -0,0 +1,99 @@
+import unittest
+import random
+from TreeSet import TreeSet
+from NumpyBlockTree import NumpyBlockTree
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+@unittest.skipUnless(np is not None, "NumPy is not installed")
+class TestTreeSetNumpyBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.values = random.sample(range(-100000, 100000), 5000)
+        self.tree_set = TreeSet(int, backend="numpy")
+        for value in self.values:
+            self.tree_set.add(value)
+        self.reference = TreeSet(int, self.values)
+
+    def test_rejects_other_types(self):
+        with self.assertRaises(TypeError):
+            TreeSet(str, backend="numpy")
+
+    def test_matches_red_black_tree(self):
+        self.assertEqual(list(self.tree_set), list(self.reference))
+        self.assertEqual(list(reversed(self.tree_set)), list(reversed(self.reference)))
+        self.assertGreater(len(self.tree_set._rb._blocks), 1)
+        for key in random.sample(range(-100010, 100010), 500) + [2**70, -2**70]:
+            self.assertEqual(self.tree_set.contains(key), self.reference.contains(key))
+            self.assertEqual(self.tree_set.floor(key), self.reference.floor(key))
+            self.assertEqual(self.tree_set.ceiling(key), self.reference.ceiling(key))
+            self.assertEqual(self.tree_set.higher(key), self.reference.higher(key))
+            self.assertEqual(self.tree_set.lower(key), self.reference.lower(key))
+            self.assertEqual(self.tree_set.rank(key), self.reference.rank(key))
+        for index in range(0, 5000, 97):
+            self.assertEqual(self.tree_set.select(index), self.reference.select(index))
+
+    def test_remove_and_poll(self):
+        for value in self.values[:4000]:
+            self.assertTrue(self.tree_set.remove(value))
+            self.reference.remove(value)
+        self.assertFalse(self.tree_set.remove(self.values[0]))
+        self.assertEqual(list(self.tree_set), list(self.reference))
+        self.assertEqual(self.tree_set.pollFirst(), self.reference.pollFirst())
+        self.assertEqual(self.tree_set.pollLast(), self.reference.pollLast())
+        while not self.tree_set.isEmpty():
+            self.tree_set.pollFirst()
+        self.assertEqual(list(self.tree_set), [])
+        self.assertEqual(self.tree_set.floor(0), None)
+
+    def test_returns_python_numbers(self):
+        tree_set = TreeSet(float, [0.5, 1.5], backend="numpy")
+        self.assertIs(type(tree_set.first()), float)
+        self.assertIs(type(next(iter(tree_set))), float)
+        self.assertIs(type(self.tree_set.floor(0)), int)
+
+    def test_iteration_from(self):
+        key = sorted(self.values)[2500]
+        self.assertEqual(list(self.tree_set.iterator(key)), list(self.reference.iterator(key)))
+        self.assertEqual(list(self.tree_set.descendingIterator(key, False)), list(self.reference.descendingIterator(key, False)))
+        self.assertEqual(list(self.tree_set.subSet(-500, 500)), list(self.reference.subSet(-500, 500)))
+
+    def test_clone_is_independent(self):
+        copy = self.tree_set.clone()
+        copy.add(10**6)
+        self.tree_set.remove(sorted(self.values)[0])
+        self.assertEqual(copy.size(), 5001)
+        self.assertEqual(copy.last(), 10**6)
+        self.assertEqual(self.tree_set.size(), 4999)
+
+    def test_vectorized_queries(self):
+        queries = np.array(random.sample(range(-100010, 100010), 1000))
+        self.assertEqual(self.tree_set.contains_many(queries), [self.reference.contains(int(q)) for q in queries])
+        self.assertEqual(self.tree_set.floor_many(queries), [self.reference.floor(int(q)) for q in queries])
+        self.assertEqual(self.tree_set.ceiling_many(queries), [self.reference.ceiling(int(q)) for q in queries])
+        self.assertEqual(self.tree_set.rank_many(queries), [self.reference.rank(int(q)) for q in queries])
+        self.assertEqual(self.tree_set.contains_many([self.values[0], 10**6]), [True, False])
+        with self.assertRaises(TypeError):
+            self.tree_set.contains_many(np.array([0.5]))
+        with self.assertRaises(TypeError):
+            self.tree_set.floor_many([1, "2"])
+
+    def test_batch_queries_on_other_backends(self):
+        queries = np.array([-5, 0, 7])
+        reference = TreeSet(int, [0, 5, 10])
+        self.assertEqual(reference.contains_many(queries), [False, True, False])
+        self.assertEqual(reference.floor_many(queries), [None, 0, 5])
+        self.assertEqual(reference.ceiling_many(queries), [0, 0, 10])
+        self.assertEqual(reference.rank_many(queries), [0, 0, 2])
+
+    def test_empty(self):
+        tree_set = TreeSet(float, backend="numpy")
+        self.assertEqual(tree_set.contains_many([1.0]), [False])
+        self.assertEqual(tree_set.floor_many([1.0]), [None])
+        self.assertEqual(tree_set.rank_many([1.0]), [0])
+
+if __name__ == '__main__':
+    unittest.main()
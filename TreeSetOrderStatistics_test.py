@@ -0,0 +1,79 @@
+import unittest
+from TreeSet import TreeSet
+from Exceptions import UnsupportedOperationException
+import bisect
+import random
+
+def subtree_size(tree, node):
+    if node == tree.nil:
+        assert node.size == 0
+        return 0
+    size = subtree_size(tree, node.left) + subtree_size(tree, node.right) + 1
+    assert node.size == size
+    return size
+
+class TestTreeSetOrderStatistics(unittest.TestCase):
+
+    def setUp(self):
+        self.values = sorted(random.sample(range(0, 1000), 100))
+        self.tree_set = TreeSet(int, self.values)
+
+    def test_rank(self):
+        for key in range(-5, 1005, 3):
+            self.assertEqual(self.tree_set.rank(key), bisect.bisect_left(self.values, key))
+
+    def test_select_and_indexing(self):
+        for index, value in enumerate(self.values):
+            self.assertEqual(self.tree_set.select(index), value)
+            self.assertEqual(self.tree_set[index], value)
+        self.assertEqual(self.tree_set[-1], self.values[-1])
+        self.assertEqual(self.tree_set[-100], self.values[0])
+        with self.assertRaises(IndexError):
+            self.tree_set[100]
+        with self.assertRaises(IndexError):
+            self.tree_set[-101]
+        with self.assertRaises(TypeError):
+            self.tree_set["0"]
+
+    def test_countRange(self):
+        values = self.values
+        for _ in range(200):
+            low, high = random.randint(-5, 1005), random.randint(-5, 1005)
+            self.assertEqual(self.tree_set.countRange(low, high), len([v for v in values if low <= v < high]))
+            self.assertEqual(self.tree_set.countRange(low, high, False, True), len([v for v in values if low < v <= high]))
+        self.assertEqual(self.tree_set.countRange(values[0], values[0], True, True), 1)
+        self.assertEqual(self.tree_set.countRange(values[0], values[0]), 0)
+
+    def test_sizes_maintained_under_updates(self):
+        model = set(self.values)
+        for _ in range(1500):
+            value = random.randint(0, 1000)
+            if random.random() < 0.5:
+                self.tree_set.add(value)
+                model.add(value)
+            else:
+                self.tree_set.remove(value)
+                model.discard(value)
+        subtree_size(self.tree_set._rb, self.tree_set._rb.root)
+        ordered = sorted(model)
+        for index in range(0, len(ordered), 7):
+            self.assertEqual(self.tree_set[index], ordered[index])
+            self.assertEqual(self.tree_set.rank(ordered[index]), index)
+
+    def test_sizes_after_poll_and_clone(self):
+        self.tree_set.pollFirst()
+        self.tree_set.pollLast()
+        clone = self.tree_set.clone()
+        subtree_size(clone._rb, clone._rb.root)
+        self.assertEqual(clone[0], self.values[1])
+        self.assertEqual(clone[-1], self.values[-2])
+
+    def test_unsupported_backend(self):
+        tree_set = TreeSet(int, self.values, backend="array")
+        with self.assertRaises(UnsupportedOperationException):
+            tree_set.rank(3)
+        with self.assertRaises(UnsupportedOperationException):
+            tree_set[0]
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+from TreeSet import TreeSet
+from PersistentRedBlackTree import NIL
+from RedBlackTree import RED, BLACK
+import random
+
+def black_height(node):
+    if node is NIL:
+        return 1
+    if node.color == RED:
+        assert node.left.color == BLACK and node.right.color == BLACK
+    left = black_height(node.left)
+    assert left == black_height(node.right)
+    assert node.size == node.left.size + node.right.size + 1
+    return left + (node.color == BLACK)
+
+class TestTreeSetPersistent(unittest.TestCase):
+
+    def setUp(self):
+        self.tree_set = TreeSet(int, backend="persistent")
+        self.values = list(range(1, 101))
+        values_random = self.values.copy()
+        random.shuffle(values_random)
+        for value in values_random:
+            self.tree_set.add(value)
+
+    def test_navigation(self):
+        self.assertEqual(self.tree_set.size(), 100)
+        self.assertEqual(self.tree_set.first(), 1)
+        self.assertEqual(self.tree_set.last(), 100)
+        self.assertEqual(self.tree_set.floor(0), None)
+        self.assertEqual(self.tree_set.ceiling(50), 50)
+        self.assertEqual(self.tree_set.higher(50), 51)
+        self.assertEqual(self.tree_set.lower(50), 49)
+        self.assertEqual(self.tree_set.rank(50), 49)
+        self.assertEqual(self.tree_set.select(49), 50)
+
+    def test_remove_keeps_tree_valid(self):
+        for value in self.values[::3]:
+            self.assertTrue(self.tree_set.remove(value))
+            black_height(self.tree_set._rb.root)
+        self.assertFalse(self.tree_set.remove(1))
+        self.assertEqual(list(self.tree_set), [v for v in self.values if (v - 1) % 3])
+
+    def test_clone_shares_nodes(self):
+        snapshot = self.tree_set.clone()
+        self.assertIs(snapshot._rb.root, self.tree_set._rb.root)
+
+    def test_snapshot_unaffected_by_changes(self):
+        snapshot = self.tree_set.clone()
+        for value in range(1, 101, 2):
+            self.tree_set.remove(value)
+        self.tree_set.add(500)
+        self.assertEqual(list(snapshot), self.values)
+        self.assertEqual(snapshot.size(), 100)
+        black_height(snapshot._rb.root)
+        black_height(self.tree_set._rb.root)
+        self.assertEqual(list(self.tree_set), list(range(2, 101, 2)) + [500])
+
+    def test_changes_to_snapshot_do_not_leak(self):
+        snapshot = self.tree_set.clone()
+        snapshot.add(0)
+        snapshot.pollLast()
+        self.assertEqual(list(self.tree_set), self.values)
+        self.assertEqual(list(snapshot), list(range(0, 100)))
+
+    def test_iterator_sees_version_it_started_on(self):
+        iterator = iter(self.tree_set)
+        self.assertEqual(next(iterator), 1)
+        snapshot = self.tree_set.clone()
+        self.tree_set.clear()
+        self.assertEqual(list(iterator), self.values[1:])
+        self.assertEqual(list(snapshot.descendingIterator(50)), list(range(50, 0, -1)))
+
+    def test_bulk_load_and_views(self):
+        tree_set = TreeSet(int, range(1000), backend="persistent")
+        black_height(tree_set._rb.root)
+        view = tree_set.subSet(100, 200)
+        self.assertEqual(view.size(), 100)
+        snapshot = tree_set.clone()
+        view.clear()
+        self.assertEqual(tree_set.size(), 900)
+        self.assertEqual(snapshot.subSet(100, 200).size(), 100)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import random
+from TreeSet import TreeSet
+from ConcurrentTreeSet import ConcurrentTreeSet
+from TreeSetSplitJoin_test import check_tree
+
+def check_ends(tree):
+    keys = list(tree)
+    if keys:
+        assert tree._min.key == keys[0] and tree._max.key == keys[-1]
+    else:
+        assert tree._min is None and tree._max is None
+
+class TestTreeSetPriorityQueue(unittest.TestCase):
+
+    def test_ends_follow_updates(self):
+        tree_set = TreeSet(int)
+        reference = set()
+        for _ in range(2000):
+            value = random.randint(0, 300)
+            if random.random() < 0.6:
+                tree_set.add(value)
+                reference.add(value)
+            else:
+                self.assertEqual(tree_set.remove(value), value in reference)
+                reference.discard(value)
+            check_ends(tree_set._rb)
+        if reference:
+            self.assertEqual(tree_set.first(), min(reference))
+            self.assertEqual(tree_set.last(), max(reference))
+
+    def test_poll_first_and_last(self):
+        values = random.sample(range(1000), 300)
+        tree_set = TreeSet(int, values)
+        expected = sorted(values)
+        while expected:
+            if random.random() < 0.5:
+                self.assertEqual(tree_set.pollFirst(), expected.pop(0))
+            else:
+                self.assertEqual(tree_set.pollLast(), expected.pop())
+            check_ends(tree_set._rb)
+        self.assertEqual(tree_set.pollFirst(), None)
+        self.assertEqual(tree_set.pollLast(), None)
+
+    def test_poll_many(self):
+        for count in (0, 1, 5, 8, 50, 299, 300, 301):
+            for backend in ("rbtree", "array", "persistent"):
+                values = random.sample(range(1000), 300)
+                tree_set = TreeSet(int, values, backend=backend)
+                removed = tree_set.pollFirstN(count)
+                self.assertEqual(removed, sorted(values)[:count])
+                self.assertEqual(list(tree_set), sorted(values)[count:])
+                self.assertEqual(tree_set.size(), max(0, 300 - count))
+                tree_set = TreeSet(int, values, backend=backend)
+                removed = tree_set.pollLastN(count)
+                self.assertEqual(removed, sorted(values, reverse=True)[:count])
+                self.assertEqual(list(tree_set), sorted(values)[:max(0, 300 - count)])
+                self.assertEqual(tree_set.size(), max(0, 300 - count))
+                if backend == "rbtree":
+                    check_tree(tree_set._rb)
+                    check_ends(tree_set._rb)
+
+    def test_usable_after_poll_many(self):
+        tree_set = TreeSet(int, range(100))
+        self.assertEqual(tree_set.pollFirstN(40), list(range(40)))
+        self.assertEqual(tree_set.pollLastN(40), list(range(99, 59, -1)))
+        tree_set.add(0)
+        tree_set.add(1000)
+        self.assertEqual(tree_set.first(), 0)
+        self.assertEqual(tree_set.last(), 1000)
+        self.assertEqual(list(tree_set), [0] + list(range(40, 60)) + [1000])
+        check_tree(tree_set._rb)
+        self.assertEqual(tree_set.pollFirstN(-1), [])
+
+    def test_ends_after_bulk_operations(self):
+        tree_set = TreeSet(int, range(100))
+        low, _, high = tree_set.split(50)
+        self.assertEqual((low.first(), low.last(), high.first(), high.last()), (0, 49, 51, 99))
+        clone = high.clone()
+        self.assertEqual((clone.first(), clone.last()), (51, 99))
+        self.assertTrue(low.join(clone))
+        self.assertEqual((low.first(), low.last()), (0, 99))
+        check_ends(low._rb)
+
+    def test_concurrent(self):
+        tree_set = ConcurrentTreeSet(int, range(10))
+        self.assertEqual(tree_set.pollFirstN(3), [0, 1, 2])
+        self.assertEqual(tree_set.pollLastN(3), [9, 8, 7])
+        self.assertEqual(tree_set.size(), 4)
+
+if __name__ == '__main__':
+    unittest.main()
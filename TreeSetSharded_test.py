@@ -0,0 +1,115 @@
+import unittest
+import random
+from ShardedTreeSet import ShardedTreeSet
+from TreeSet import TreeSet
+from Exceptions import NoSuchElementException, NullPointerException
+
+def is_even(key):
+    return key % 2 == 0
+
+def total(keys):
+    return sum(keys)
+
+class TestShardedTreeSet(unittest.TestCase):
+
+    def setUp(self):
+        self.values = random.sample(range(100000), 5000)
+        self.sharded = ShardedTreeSet(int, self.values, shards=8)
+        self.expected = sorted(self.values)
+
+    def test_contents_spread_over_shards(self):
+        self.assertEqual(self.sharded.size(), 5000)
+        self.assertEqual(list(self.sharded), self.expected)
+        self.assertEqual(list(self.sharded.descendingIterator()), self.expected[::-1])
+        self.assertEqual(len(self.sharded.shardSizes()), 8)
+        self.assertEqual(sum(self.sharded.shardSizes()), 5000)
+
+    def test_navigation_across_shard_boundaries(self):
+        reference = TreeSet(int, self.values)
+        # Empty every other shard so that lookups have to cross into a neighbour; the high skew keeps
+        # the drained shards from being rebalanced away.
+        sharded = ShardedTreeSet(int, self.values, shards=8, skew=8)
+        for shard in sharded._shards[1::2]:
+            for key in list(shard):
+                sharded.remove(key)
+                reference.remove(key)
+        self.assertEqual(sharded.shardSizes()[1::2], [0, 0, 0, 0])
+        for key in list(range(-5, 100005, 997)) + sharded._splitters:
+            self.assertEqual(sharded.floor(key), reference.floor(key))
+            self.assertEqual(sharded.ceiling(key), reference.ceiling(key))
+            self.assertEqual(sharded.higher(key), reference.higher(key))
+            self.assertEqual(sharded.lower(key), reference.lower(key))
+            self.assertEqual(sharded.contains(key), reference.contains(key))
+        self.assertEqual(sharded.first(), reference.first())
+        self.assertEqual(sharded.last(), reference.last())
+        self.assertEqual(list(sharded), list(reference))
+
+    def test_poll_and_empty(self):
+        sharded = ShardedTreeSet(int, range(200), shards=4)
+        self.assertEqual(sharded.pollFirst(), 0)
+        self.assertEqual(sharded.pollLast(), 199)
+        while sharded.pollFirst() is not None:
+            pass
+        self.assertTrue(sharded.isEmpty())
+        with self.assertRaises(NoSuchElementException):
+            sharded.first()
+        with self.assertRaises(NullPointerException):
+            sharded.add(None)
+
+    def test_rebalances_when_skewed(self):
+        sharded = ShardedTreeSet(int, range(1000), shards=4)
+        for key in range(1000, 5000):
+            sharded.add(key)
+        self.assertEqual(list(sharded), list(range(5000)))
+        self.assertLessEqual(max(sharded.shardSizes()), 2 * 5000 / 4)
+
+    def test_rebalances_when_drained(self):
+        sharded = ShardedTreeSet(int, range(8000), shards=4)
+        sharded.rebalance()
+        self.assertEqual(sharded.shardSizes(), [2000] * 4)
+        for key in range(2000, 6000):
+            sharded.remove(key)
+        self.assertEqual(sharded.shardSizes(), [2000, 0, 0, 2000])
+        self.assertEqual(sharded.pollFirst(), 0)
+        self.assertEqual(sharded.shardSizes(), [999, 1000, 1000, 1000])
+        for _ in range(2000):
+            sharded.pollLast()
+        self.assertLessEqual(max(sharded.shardSizes()), 2 * sharded.size() / 4)
+        self.assertEqual(list(sharded), list(range(1, 2000)))
+
+    def test_incremental_growth_creates_shards(self):
+        sharded = ShardedTreeSet(int, shards=4)
+        for key in range(1000):
+            sharded.add(key)
+        self.assertEqual(len(sharded.shardSizes()), 4)
+        self.assertEqual(list(sharded), list(range(1000)))
+
+    def test_set_algebra(self):
+        other = set(random.sample(range(100000), 3000))
+        self.assertEqual(list(self.sharded.union(other)), sorted(set(self.values) | other))
+        self.assertEqual(list(self.sharded.intersection(other)), sorted(set(self.values) & other))
+        self.assertEqual(list(self.sharded.difference(TreeSet(int, other))), sorted(set(self.values) - other))
+        sharded_other = ShardedTreeSet(int, other, shards=3)
+        self.assertEqual(list(self.sharded.symmetricDifference(sharded_other)), sorted(set(self.values) ^ other))
+
+    def test_scans(self):
+        self.assertEqual(list(self.sharded.filter(is_even)), [v for v in self.expected if v % 2 == 0])
+        self.assertEqual(sum(self.sharded.mapShards(total)), sum(self.values))
+
+    def test_process_pool(self):
+        with ShardedTreeSet(int, self.values, shards=4, workers=2) as sharded:
+            sharded.addAll(range(-100, 0))
+            self.assertEqual(list(sharded), list(range(-100, 0)) + self.expected)
+            self.assertEqual(list(sharded.filter(is_even)), [v for v in range(-100, 0, 2)] + [v for v in self.expected if v % 2 == 0])
+            self.assertEqual(list(sharded.intersection(range(-50, 50))), [v for v in range(-50, 50) if v < 0 or v in set(self.values)])
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            ShardedTreeSet(int, shards=0)
+        with self.assertRaises(ValueError):
+            ShardedTreeSet(int, skew=1)
+        with self.assertRaises(TypeError):
+            ShardedTreeSet(int, ["a"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,226 @@
+"""
+The binary file format written by TreeSet.save.
+
+A file is a 32-byte little-endian header, the pickled data type, padding to an 8-byte boundary and
+the payload:
+
+    magic     4s   b"TSET"
+    version   H    VERSION
+    encoding  c    how the elements are stored, see below
+    (pad)     x
+    count     Q    the number of elements
+    payload   Q    the payload length in bytes
+    checksum  I    CRC-32 of everything after the header
+    type      I    the length of the pickled data type
+
+With encoding b"q" (int64) or b"d" (float64) the payload is a plain array of count fixed-width values
+in ascending order. Otherwise each element is a record, a 4-byte length followed by its bytes (UTF-8
+text for b"s", raw bytes for b"b", a pickle for b"p"), and the records are followed by a table of
+count 8-byte record offsets so that a mapped file can be searched without scanning it.
+"""
+import mmap
+import os
+import pickle
+import struct
+import sys
+import zlib
+from array import array
+from Exceptions import StreamCorruptedException
+
+MAGIC = b"TSET"
+VERSION = 1
+HEADER = struct.Struct("<4sHcxQQII")
+LENGTH = struct.Struct("<I")
+
+_FIXED = {b"q": int, b"d": float}
+_DECODERS = {
+    b"s": lambda data: str(data, "utf-8"),
+    b"b": bytes,
+    b"p": pickle.loads,
+}
+
+def _encoding(keys):
+    """
+    Picks the most compact encoding that represents every key exactly.
+    """
+    for code, key_type in ((b"q", int), (b"d", float), (b"s", str), (b"b", bytes)):
+        if all(type(key) is key_type for key in keys):
+            if code == b"q" and keys and not -2**63 <= keys[0] <= keys[-1] < 2**63:
+                break
+            return code
+    return b"p"
+
+def _padding(offset):
+    return -offset % 8
+
+def fsync_directory(path):
+    """
+    Flushes a directory entry change, such as a rename into path's directory, to disk where the
+    platform allows opening directories.
+    """
+    try:
+        descriptor = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+def write(path, data_type, keys, fsync=False):
+    """
+    Writes ascending, distinct keys to path; the file is replaced atomically.
+
+    Args:
+        path (str): The destination file.
+        data_type (type): The TreeSet's data type; must be picklable by reference.
+        keys (list): The elements in ascending order.
+        fsync (bool, optional): Whether to force the file and the rename to disk before returning, so
+            that the new contents survive a crash. Defaults to False.
+    """
+    encoding = _encoding(keys)
+    type_record = pickle.dumps(data_type)
+    if encoding in _FIXED:
+        values = array(encoding.decode(), keys)
+        if sys.byteorder != "little":
+            values.byteswap()
+        payload = values.tobytes()
+    else:
+        if encoding == b"s":
+            records = [key.encode("utf-8") for key in keys]
+        elif encoding == b"b":
+            records = keys
+        else:
+            records = [pickle.dumps(key) for key in keys]
+        offsets = array("Q")
+        chunks = []
+        position = 0
+        for record in records:
+            offsets.append(position)
+            chunks.append(LENGTH.pack(len(record)))
+            chunks.append(record)
+            position += LENGTH.size + len(record)
+        chunks.append(bytes(_padding(position)))
+        if sys.byteorder != "little":
+            offsets.byteswap()
+        chunks.append(offsets.tobytes())
+        payload = b"".join(chunks)
+    body = type_record + bytes(_padding(HEADER.size + len(type_record))) + payload
+    header = HEADER.pack(MAGIC, VERSION, encoding, len(keys), len(payload), zlib.crc32(body), len(type_record))
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(header)
+        file.write(body)
+        if fsync:
+            file.flush()
+            os.fsync(file.fileno())
+    os.replace(temporary, path)
+    if fsync:
+        fsync_directory(path)
+
+class Snapshot:
+    """
+    A saved TreeSet file mapped into memory, exposing its elements as a lazily decoded ascending sequence.
+    """
+
+    def __init__(self, path, verify=True):
+        """
+        Maps and checks a file written by write.
+
+        Args:
+            path (str): The file to open.
+            verify (bool, optional): Whether to check the CRC-32 of the whole file. Defaults to True.
+
+        Raises:
+            StreamCorruptedException: If the header is invalid or the checksum does not match.
+        """
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size < HEADER.size:
+                raise StreamCorruptedException("truncated TreeSet file")
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._open(verify)
+        except BaseException:
+            self._map.close()
+            raise
+
+    def _open(self, verify):
+        buffer = self._map
+        magic, version, encoding, count, payload_size, checksum, type_size = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise StreamCorruptedException("not a TreeSet file")
+        if version != VERSION:
+            raise StreamCorruptedException(f"unsupported TreeSet file version {version}")
+        start = HEADER.size + type_size
+        start += _padding(start)
+        if len(buffer) != start + payload_size:
+            raise StreamCorruptedException("truncated TreeSet file")
+        if verify and zlib.crc32(memoryview(buffer)[HEADER.size:]) != checksum:
+            raise StreamCorruptedException("TreeSet file checksum mismatch")
+        self.data_type = pickle.loads(buffer[HEADER.size:HEADER.size + type_size])
+        self.encoding = encoding
+        self.count = count
+        payload = memoryview(buffer)[start:]
+        if encoding in _FIXED:
+            self.keys = payload.cast(encoding.decode())
+            if sys.byteorder != "little":
+                self.keys = array(encoding.decode(), self.keys)
+                self.keys.byteswap()
+        elif encoding in _DECODERS:
+            table = payload_size - 8 * count
+            offsets = payload[table:].cast("Q")
+            if sys.byteorder != "little":
+                offsets = array("Q", offsets)
+                offsets.byteswap()
+            self.keys = Records(payload, offsets, _DECODERS[encoding])
+        else:
+            raise StreamCorruptedException(f"unknown TreeSet file encoding {encoding!r}")
+
+    def tolist(self):
+        """
+        Decodes every element.
+
+        Returns:
+            list: The elements in ascending order.
+        """
+        keys = self.keys
+        return keys.tolist() if hasattr(keys, "tolist") else list(keys)
+
+    def close(self):
+        """
+        Releases the mapping; sequences obtained from this snapshot must not be used afterwards.
+        """
+        if hasattr(self.keys, "release"):
+            self.keys.release()
+        self._map.close()
+
+class Records:
+    """
+    The elements of a record-encoded file as a read-only sequence, decoding each one when it is accessed.
+    """
+
+    def __init__(self, payload, offsets, decode):
+        self._payload = payload
+        self._offsets = offsets
+        self._decode = decode
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, index):
+        start = self._offsets[index] + LENGTH.size
+        size, = LENGTH.unpack_from(self._payload, start - LENGTH.size)
+        return self._decode(self._payload[start:start + size])
+
+    def __iter__(self):
+        for index in range(len(self._offsets)):
+            yield self[index]
+
+    def __reversed__(self):
+        for index in range(len(self._offsets) - 1, -1, -1):
+            yield self[index]
+
+    def release(self):
+        if isinstance(self._offsets, memoryview):
+            self._offsets.release()
+        self._payload.release()
@@ -0,0 +1,92 @@
+import unittest
+import os
+import random
+import tempfile
+from TreeSet import TreeSet
+from MappedTreeSet import MappedTreeSet
+from Exceptions import StreamCorruptedException, UnsupportedOperationException, NoSuchElementException
+
+class TestTreeSetSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "set.tset")
+
+    def round_trip(self, data_type, values, backend="rbtree"):
+        tree_set = TreeSet(data_type, values)
+        tree_set.save(self.path)
+        loaded = TreeSet.load(self.path, backend=backend)
+        self.assertEqual(list(loaded), list(tree_set))
+        self.assertEqual(loaded.size(), tree_set.size())
+        self.assertEqual(loaded._backend, backend)
+        with TreeSet.load(self.path, mapped=True) as mapped:
+            self.assertEqual(list(mapped), list(tree_set))
+            self.assertEqual(list(reversed(mapped)), list(reversed(tree_set)))
+            for value in values[:20]:
+                self.assertTrue(mapped.contains(value))
+                self.assertEqual(mapped.higher(value), tree_set.higher(value))
+                self.assertEqual(mapped.lower(value), tree_set.lower(value))
+                self.assertEqual(mapped.rank(value), tree_set.rank(value))
+        return loaded
+
+    def test_int(self):
+        self.round_trip(int, random.sample(range(-10**15, 10**15), 500), backend="array")
+
+    def test_float(self):
+        self.round_trip(float, [random.uniform(-1, 1) for _ in range(500)])
+
+    def test_str(self):
+        self.round_trip(str, ["", "é", "a", "zz", "日本"] + [str(random.random()) for _ in range(100)])
+
+    def test_bytes(self):
+        self.round_trip(bytes, [os.urandom(random.randint(0, 10)) for _ in range(100)])
+
+    def test_pickled_records(self):
+        self.round_trip(int, [2**80, -2**80, 0])
+        self.round_trip(tuple, [(1, "a"), (0,), (1, "b")])
+
+    def test_empty(self):
+        loaded = self.round_trip(str, [])
+        self.assertTrue(loaded.isEmpty())
+        with TreeSet.load(self.path, mapped=True) as mapped:
+            with self.assertRaises(NoSuchElementException):
+                mapped.first()
+
+    def test_mapped_navigation(self):
+        TreeSet(int, range(0, 100, 10)).save(self.path)
+        with TreeSet.load(self.path, mapped=True) as mapped:
+            self.assertIsInstance(mapped, MappedTreeSet)
+            self.assertEqual(mapped.floor(15), 10)
+            self.assertEqual(mapped.ceiling(15), 20)
+            self.assertEqual(mapped.floor(-1), None)
+            self.assertEqual(mapped.ceiling(91), None)
+            self.assertEqual(mapped.select(3), 30)
+            self.assertEqual(list(mapped.iterator(30, inclusive=False)), [40, 50, 60, 70, 80, 90])
+            self.assertEqual(list(mapped.descendingIterator(30)), [30, 20, 10, 0])
+            with self.assertRaises(UnsupportedOperationException):
+                mapped.add(5)
+            with self.assertRaises(TypeError):
+                mapped.contains("5")
+
+    def test_corruption_detected(self):
+        TreeSet(int, range(100)).save(self.path)
+        with open(self.path, "r+b") as file:
+            file.seek(-3, os.SEEK_END)
+            file.write(b"\xff")
+        with self.assertRaises(StreamCorruptedException):
+            TreeSet.load(self.path)
+        with open(self.path, "r+b") as file:
+            file.write(b"JUNK")
+        with self.assertRaises(StreamCorruptedException):
+            TreeSet.load(self.path, mapped=True)
+        for size in (0, 10):
+            with open(self.path, "r+b") as file:
+                file.truncate(size)
+            with self.assertRaises(StreamCorruptedException):
+                TreeSet.load(self.path)
+            with self.assertRaises(StreamCorruptedException):
+                TreeSet.load(self.path, mapped=True)
+
+if __name__ == '__main__':
+    unittest.main()
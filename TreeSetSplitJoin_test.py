@@ -0,0 +1,115 @@
+import unittest
+from TreeSet import TreeSet
+from RedBlackTree import RED, BLACK
+from Exceptions import IllegalArgumentException, UnsupportedOperationException
+import random
+
+def check_tree(tree):
+    def black_height(node):
+        if node == tree.nil:
+            return 0
+        if node.color == RED:
+            assert node.left.color == BLACK and node.right.color == BLACK
+        for child in (node.left, node.right):
+            if child != tree.nil:
+                assert child.parent is node
+        assert node.size == node.left.size + node.right.size + 1
+        height = black_height(node.left)
+        assert height == black_height(node.right)
+        return height + (node.color == BLACK)
+    assert tree.root.color == BLACK
+    if tree.root != tree.nil:
+        assert tree.root.parent is None
+    black_height(tree.root)
+
+class TestTreeSetSplitJoin(unittest.TestCase):
+
+    def test_split(self):
+        for _ in range(100):
+            values = random.sample(range(500), random.randint(0, 200))
+            tree_set = TreeSet(int)
+            for value in values:
+                tree_set.add(value)
+            key = random.randint(-5, 505)
+            low, found, high = tree_set.split(key)
+            check_tree(low._rb)
+            check_tree(high._rb)
+            self.assertEqual(list(low), sorted(v for v in values if v < key))
+            self.assertEqual(list(high), sorted(v for v in values if v > key))
+            self.assertEqual(found, key if key in values else None)
+            self.assertEqual(low.size() + high.size() + (found is not None), len(values))
+            self.assertTrue(tree_set.isEmpty())
+            self.assertEqual(list(tree_set), [])
+
+    def test_split_pieces_stay_usable(self):
+        low, found, high = TreeSet(int, range(100)).split(50)
+        self.assertEqual(found, 50)
+        self.assertTrue(low.add(50))
+        self.assertTrue(high.remove(75))
+        self.assertEqual(low.last(), 50)
+        self.assertEqual(high[24], 76)
+        check_tree(low._rb)
+        check_tree(high._rb)
+
+    def test_join(self):
+        for _ in range(100):
+            pivot = random.randint(0, 1000)
+            low = random.sample(range(0, pivot + 1), random.randint(0, min(pivot + 1, 150)))
+            high = random.sample(range(pivot + 1, 1001), random.randint(0, min(1000 - pivot, 150)))
+            left, right = TreeSet(int, low), TreeSet(int, high)
+            if random.random() < 0.5:
+                self.assertEqual(left.join(right), bool(high))
+                joined = left
+            else:
+                self.assertEqual(right.join(left), bool(low))
+                joined = right
+            check_tree(joined._rb)
+            self.assertEqual(list(joined), sorted(low + high))
+            self.assertEqual(joined.size(), len(low) + len(high))
+
+    def test_join_overlapping(self):
+        tree_set = TreeSet(int, [1, 5])
+        with self.assertRaises(IllegalArgumentException):
+            tree_set.join(TreeSet(int, [3]))
+        self.assertEqual(list(tree_set), [1, 5])
+
+    def test_split_then_join_round_trip(self):
+        tree_set = TreeSet(int, range(1000))
+        low, found, high = tree_set.split(400)
+        low.add(found)
+        low.join(high)
+        self.assertEqual(list(low), list(range(1000)))
+        check_tree(low._rb)
+
+    def test_addAll_of_disjoint_range_joins(self):
+        tree_set = TreeSet(int, range(100))
+        other = TreeSet(int, range(200, 210))
+        self.assertTrue(tree_set.addAll(other))
+        self.assertEqual(list(tree_set), list(range(100)) + list(range(200, 210)))
+        self.assertEqual(list(other), list(range(200, 210)))
+        check_tree(tree_set._rb)
+
+    def test_view_clear_removes_range(self):
+        for low, high, low_inclusive, high_inclusive in ((10, 20, True, False), (10, 20, False, True), (15, 15, True, True), (15, 15, True, False), (-5, 50, True, True)):
+            tree_set = TreeSet(int, range(40))
+            tree_set.subSet(low, high, low_inclusive, high_inclusive).clear()
+            expected = [v for v in range(40) if not ((low < v or (low_inclusive and v == low)) and (v < high or (high_inclusive and v == high)))]
+            self.assertEqual(list(tree_set), expected)
+            self.assertEqual(tree_set.size(), len(expected))
+            check_tree(tree_set._rb)
+        tree_set = TreeSet(int, range(40))
+        tree_set.headSet(30).descendingSet().tailSet(10, False).clear()
+        self.assertEqual(list(tree_set), list(range(10, 40)))
+        tree_set = TreeSet(int, range(40), backend="array")
+        tree_set.tailSet(5).clear()
+        self.assertEqual(list(tree_set), list(range(5)))
+
+    def test_unsupported_backend(self):
+        tree_set = TreeSet(int, [1, 2], backend="array")
+        with self.assertRaises(UnsupportedOperationException):
+            tree_set.split(1)
+        with self.assertRaises(UnsupportedOperationException):
+            TreeSet(int).join(tree_set)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from TreeSet import TreeSet
+from Exceptions import NullPointerException, ClassCastException
+
+class Opaque:
+    pass
+
+class TestTreeSetValidation(unittest.TestCase):
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            TreeSet(int, validation="lenient")
+
+    def test_modes_reject_invalid_keys(self):
+        for mode in ("strict", "cached"):
+            tree_set = TreeSet(int, [1, 2, 3], validation=mode)
+            with self.assertRaises(NullPointerException):
+                tree_set.add(None)
+            with self.assertRaises(TypeError):
+                tree_set.contains("1")
+            with self.assertRaises(TypeError):
+                tree_set.floor(1.5)
+            self.assertEqual(tree_set.size(), 3)
+
+    def test_cached_mode_remembers_valid_types(self):
+        tree_set = TreeSet(int, validation="cached")
+        tree_set.add(1)
+        self.assertIn(int, tree_set._valid_types)
+        tree_set.add(True)
+        self.assertEqual(tree_set._valid_types, {int, bool})
+        with self.assertRaises(TypeError):
+            tree_set.add("x")
+        self.assertNotIn(str, tree_set._valid_types)
+
+    def test_cached_mode_rejects_incomparable_type_every_time(self):
+        tree_set = TreeSet(object)
+        for _ in range(2):
+            with self.assertRaises(ClassCastException):
+                tree_set.add(Opaque())
+
+    def test_trusted_mode_skips_checks(self):
+        tree_set = TreeSet(int, [3, 1, 2], validation="trusted")
+        self.assertEqual(list(tree_set), [1, 2, 3])
+        self.assertTrue(tree_set.add(4))
+        self.assertEqual(tree_set.ceiling(4), 4)
+        self.assertEqual(tree_set._valid_types, set())
+
+    def test_batch_validation(self):
+        tree_set = TreeSet(int, [1])
+        with self.assertRaises(NullPointerException):
+            tree_set.addAll([2, 3, None])
+        with self.assertRaises(TypeError):
+            tree_set.addAll([2, "3", 4])
+        self.assertEqual(list(tree_set), [1])
+        self.assertTrue(tree_set.addAll(range(2, 100)))
+        self.assertEqual(tree_set.size(), 99)
+
+    def test_clone_keeps_mode(self):
+        tree_set = TreeSet(int, [1, 2], validation="strict", backend="array")
+        clone = tree_set.clone()
+        self.assertEqual(clone._validation, "strict")
+        self.assertEqual(clone._backend, "array")
+        with self.assertRaises(TypeError):
+            clone.add("3")
+
+if __name__ == '__main__':
+    unittest.main()
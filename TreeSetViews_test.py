@@ -0,0 +1,101 @@
+import unittest
+from TreeSet import TreeSet
+from Exceptions import IllegalArgumentException, NoSuchElementException, NullPointerException
+
+class TestTreeSetViews(unittest.TestCase):
+
+    def setUp(self):
+        self.values = list(range(0, 100, 2))
+        self.tree_set = TreeSet(int, self.values)
+
+    def test_subSet_bounds(self):
+        self.assertEqual(list(self.tree_set.subSet(10, 20)), [10, 12, 14, 16, 18])
+        self.assertEqual(list(self.tree_set.subSet(10, 20, False, True)), [12, 14, 16, 18, 20])
+        self.assertEqual(list(self.tree_set.subSet(11, 19)), [12, 14, 16, 18])
+        self.assertEqual(list(self.tree_set.subSet(11, 11)), [])
+        with self.assertRaises(IllegalArgumentException):
+            self.tree_set.subSet(20, 10)
+
+    def test_head_and_tail(self):
+        self.assertEqual(list(self.tree_set.headSet(6)), [0, 2, 4])
+        self.assertEqual(list(self.tree_set.headSet(6, True)), [0, 2, 4, 6])
+        self.assertEqual(list(self.tree_set.tailSet(92)), [92, 94, 96, 98])
+        self.assertEqual(list(self.tree_set.tailSet(92, False)), [94, 96, 98])
+        self.assertEqual(list(reversed(self.tree_set.tailSet(92))), [98, 96, 94, 92])
+
+    def test_navigation_is_clamped(self):
+        view = self.tree_set.subSet(10, 20)
+        self.assertEqual(view.first(), 10)
+        self.assertEqual(view.last(), 18)
+        self.assertEqual(view.floor(100), 18)
+        self.assertIsNone(view.floor(9))
+        self.assertEqual(view.ceiling(0), 10)
+        self.assertIsNone(view.ceiling(19))
+        self.assertEqual(view.higher(5), 10)
+        self.assertIsNone(view.higher(18))
+        self.assertEqual(view.lower(50), 18)
+        self.assertIsNone(view.lower(10))
+        self.assertTrue(view.contains(12))
+        self.assertFalse(view.contains(20))
+        self.assertEqual(view.size(), 5)
+
+    def test_view_is_live(self):
+        view = self.tree_set.subSet(10, 20)
+        self.tree_set.add(13)
+        self.tree_set.remove(10)
+        self.assertEqual(list(view), [12, 13, 14, 16, 18])
+        self.assertTrue(view.add(15))
+        self.assertTrue(self.tree_set.contains(15))
+        with self.assertRaises(IllegalArgumentException):
+            view.add(20)
+        self.assertFalse(view.remove(30))
+        self.assertTrue(self.tree_set.contains(30))
+        self.assertEqual(view.pollFirst(), 12)
+        self.assertEqual(view.pollLast(), 18)
+        self.assertEqual(self.tree_set.size(), 49)
+        self.tree_set.clear()
+        self.assertTrue(view.isEmpty())
+        self.assertEqual(view.size(), 0)
+        with self.assertRaises(NoSuchElementException):
+            view.first()
+
+    def test_descendingSet(self):
+        view = self.tree_set.descendingSet()
+        self.assertEqual(list(view), list(reversed(self.values)))
+        self.assertEqual(view.first(), 98)
+        self.assertEqual(view.last(), 0)
+        self.assertEqual(view.floor(11), 12)
+        self.assertEqual(view.ceiling(11), 10)
+        self.assertEqual(view.higher(10), 8)
+        self.assertEqual(view.lower(10), 12)
+        self.assertEqual(list(view.headSet(90)), [98, 96, 94, 92])
+        self.assertEqual(list(view.tailSet(4)), [4, 2, 0])
+        self.assertEqual(list(view.subSet(20, 10)), [20, 18, 16, 14, 12])
+        self.assertEqual(list(view.descendingSet()), self.values)
+        self.assertEqual(view.pollFirst(), 98)
+
+    def test_nested_views(self):
+        view = self.tree_set.subSet(10, 40)
+        self.assertEqual(list(view.subSet(20, 30)), [20, 22, 24, 26, 28])
+        self.assertEqual(list(view.headSet(40)), list(range(10, 40, 2)))
+        self.assertEqual(list(view.tailSet(35).descendingSet()), [38, 36])
+        with self.assertRaises(IllegalArgumentException):
+            view.subSet(0, 20)
+        with self.assertRaises(IllegalArgumentException):
+            view.headSet(40, True)
+
+    def test_array_backend_views(self):
+        tree_set = TreeSet(int, self.values, backend="array")
+        view = tree_set.subSet(10, 20, True, True)
+        self.assertEqual(list(view), [10, 12, 14, 16, 18, 20])
+        self.assertEqual(view.size(), 6)
+        self.assertEqual(list(view.descendingSet()), [20, 18, 16, 14, 12, 10])
+
+    def test_null_bounds(self):
+        with self.assertRaises(NullPointerException):
+            self.tree_set.headSet(None)
+        with self.assertRaises(NullPointerException):
+            self.tree_set.subSet(1, 5).floor(None)
+
+if __name__ == '__main__':
+    unittest.main()
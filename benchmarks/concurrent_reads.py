@@ -0,0 +1,99 @@
+"""
+Measures read throughput of a shared set as reader threads are added, with a writer thread
+adding and removing keys in the background.
+
+Compares a TreeSet behind one global mutex with ConcurrentTreeSet in its locked and snapshot_reads
+modes. On a GIL build only one thread runs Python code at a time, so the numbers mostly show lock
+overhead; on a free-threaded build (python3.13t and later) readers of the last two modes scale.
+
+Usage: python benchmarks/concurrent_reads.py [--size N] [--seconds S] [--threads 1,2,4,8]
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from TreeSet import TreeSet
+from ConcurrentTreeSet import ConcurrentTreeSet
+
+class MutexTreeSet:
+    """
+    The baseline: every call serialized behind one lock.
+    """
+
+    def __init__(self, data_type, collection):
+        self._set = TreeSet(data_type, collection)
+        self._lock = threading.Lock()
+
+    def contains(self, key):
+        with self._lock:
+            return self._set.contains(key)
+
+    def add(self, key):
+        with self._lock:
+            return self._set.add(key)
+
+    def remove(self, key):
+        with self._lock:
+            return self._set.remove(key)
+
+def run(factory, size, readers, seconds):
+    tree_set = factory(range(0, 2 * size, 2))
+    stop = threading.Event()
+    counts = [0] * readers
+
+    def read(slot):
+        rng = random.Random(slot)
+        limit = 2 * size
+        contains = tree_set.contains
+        done = 0
+        while not stop.is_set():
+            for _ in range(100):
+                contains(rng.randrange(limit))
+            done += 100
+        counts[slot] = done
+
+    def write():
+        rng = random.Random(-1)
+        while not stop.is_set():
+            key = 2 * rng.randrange(size) + 1
+            tree_set.add(key)
+            tree_set.remove(key)
+            time.sleep(0.001)
+
+    threads = [threading.Thread(target=read, args=(slot,)) for slot in range(readers)]
+    threads.append(threading.Thread(target=write))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / seconds
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--seconds", type=float, default=1.0)
+    parser.add_argument("--threads", default="1,2,4,8")
+    args = parser.parse_args()
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}, {args.size} keys")
+    modes = {
+        "mutex": lambda keys: MutexTreeSet(int, keys),
+        "rwlock": lambda keys: ConcurrentTreeSet(int, keys),
+        "snapshot": lambda keys: ConcurrentTreeSet(int, keys, snapshot_reads=True),
+    }
+    threads = [int(n) for n in args.threads.split(",")]
+    print(f"{'readers':>8}" + "".join(f"{name:>14}" for name in modes) + "   (contains/s)")
+    for readers in threads:
+        rates = [run(factory, args.size, readers, args.seconds) for factory in modes.values()]
+        print(f"{readers:>8}" + "".join(f"{rate:>14,.0f}" for rate in rates))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Measures the "disk" TreeSet backend on a set larger than its page cache: point queries with a uniform
+and a skewed key distribution for each cache size, with the page cache hit rate, and a full sequential
+scan, compared with the in-memory "rbtree" backend.
+
+Usage: python benchmarks/disk.py [--size N] [--queries N] [--cache-pages 64,1024,16384] [--page-size B]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from TreeSet import TreeSet
+
+def queries(tree_set, keys):
+    start = time.perf_counter()
+    contains = tree_set.contains
+    for key in keys:
+        contains(key)
+    return (time.perf_counter() - start) / len(keys) * 1e9
+
+def scan(tree_set, size):
+    start = time.perf_counter()
+    for batch in tree_set.iter_batches(4096):
+        pass
+    return (time.perf_counter() - start) / size * 1e9
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", default="1e6")
+    parser.add_argument("--queries", default="1e5")
+    parser.add_argument("--cache-pages", default="64,1024,16384")
+    parser.add_argument("--page-size", type=int, default=4096)
+    parser.add_argument("--directory", help="where the page files are created")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    size = int(float(args.size))
+    count = int(float(args.queries))
+    uniform = [rng.randrange(2 * size) for _ in range(count)]
+    hot = [rng.randrange(2 * size // 100) for _ in range(count)]
+    workloads = {"uniform": uniform, "1% hot": hot}
+
+    print(f"{'backend':<22} {'workload':<10} {'ns/op':>8} {'hit rate':>9}")
+    reference = TreeSet(int, range(0, 2 * size, 2))
+    for name, keys in workloads.items():
+        print(f"{'rbtree':<22} {name:<10} {queries(reference, keys):>8.0f}")
+    print(f"{'rbtree':<22} {'scan':<10} {scan(reference, size):>8.0f}")
+    for pages in (int(n) for n in args.cache_pages.split(",")):
+        options = {"cache_pages": pages, "page_size": args.page_size, "directory": args.directory}
+        tree_set = TreeSet(int, range(0, 2 * size, 2), backend="disk", backend_options=options)
+        label = f"disk, {pages} pages"
+        for name, keys in workloads.items():
+            before = tree_set.cacheStats()
+            nanoseconds = queries(tree_set, keys)
+            after = tree_set.cacheStats()
+            hits = after["hits"] - before["hits"]
+            rate = hits / (hits + after["misses"] - before["misses"])
+            print(f"{label:<22} {name:<10} {nanoseconds:>8.0f} {rate:>9.1%}")
+        print(f"{label:<22} {'scan':<10} {scan(tree_set, size):>8.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Measures the write throughput and the recovery time of DurableTreeSet.
+
+Writes: random adds into an empty set for each combination of --group-commits and fsync on and off,
+compared with a plain TreeSet. Recovery: opening a set whose directory holds a snapshot of --size
+elements plus a log tail of each of --tails changes, compared with re-adding every element.
+
+Usage: python benchmarks/durable.py [--size N] [--writes N] [--group-commits 1,16,256] [--tails 0,1e4,1e5]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from TreeSet import TreeSet
+from DurableTreeSet import DurableTreeSet
+
+def writes(directory, keys, **options):
+    shutil.rmtree(directory, ignore_errors=True)
+    start = time.perf_counter()
+    with DurableTreeSet(directory, int, compact_every=None, **options) as durable:
+        add = durable.add
+        for key in keys:
+            add(key)
+    return time.perf_counter() - start
+
+def recovery(directory, size, tail, rng):
+    shutil.rmtree(directory, ignore_errors=True)
+    with DurableTreeSet(directory, int, compact_every=None, group_commit=1024, fsync=False) as durable:
+        durable.addAll(range(0, 2 * size, 2))
+        durable.compact()
+        for _ in range(tail):
+            durable.add(2 * rng.randrange(size) + 1)
+    start = time.perf_counter()
+    with DurableTreeSet(directory, int) as durable:
+        stats = durable.recoveryStats()
+    return time.perf_counter() - start, stats
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", default="1e6", help="elements in the snapshot for the recovery runs")
+    parser.add_argument("--writes", default="2e4", help="adds per write run")
+    parser.add_argument("--group-commits", default="1,16,256")
+    parser.add_argument("--tails", default="0,1e4,1e5", help="comma-separated log tail lengths")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    size = int(float(args.size))
+    count = int(float(args.writes))
+    keys = rng.sample(range(10 * count), count)
+    with tempfile.TemporaryDirectory() as root:
+        directory = os.path.join(root, "set")
+
+        start = time.perf_counter()
+        tree_set = TreeSet(int)
+        for key in keys:
+            tree_set.add(key)
+        baseline = time.perf_counter() - start
+        print(f"{'writes':<24} {'adds/s':>12}")
+        print(f"{'TreeSet (in memory)':<24} {count / baseline:>12,.0f}")
+        for fsync in (False, True):
+            for group in (int(n) for n in args.group_commits.split(",")):
+                seconds = writes(directory, keys, group_commit=group, fsync=fsync)
+                label = f"group {group}, fsync {'on' if fsync else 'off'}"
+                print(f"{label:<24} {count / seconds:>12,.0f}")
+
+        start = time.perf_counter()
+        TreeSet(int, range(0, 2 * size, 2))
+        rebuild = time.perf_counter() - start
+        print(f"\n{'recovery of ' + str(size):<24} {'log tail':>10} {'seconds':>10}")
+        print(f"{'TreeSet(range) rebuild':<24} {'':>10} {rebuild:>10.3f}")
+        for tail in (int(float(n)) for n in args.tails.split(",")):
+            seconds, stats = recovery(directory, size, tail, rng)
+            print(f"{'snapshot + log':<24} {stats['replayed_records']:>10} {seconds:>10.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+Times every TreeSet operation over a grid of sizes, key distributions and backends, records peak
+memory with tracemalloc, and writes the results as JSON so that two commits can be compared.
+
+Operations: add, addAll, remove, contains, floor, ceiling, higher, lower, pollFirst, pollLast,
+iterate and clone. Distributions: ascending, descending, random and clustered (runs of 100
+consecutive keys at random places, inserted run by run). Half of the query keys are present and
+half are not.
+
+Examples:
+    python benchmarks/suite.py --sizes 1e3,1e4,1e5 --output before.json
+    python benchmarks/suite.py --sizes 1e3,1e4,1e5 --output after.json --compare before.json
+    python benchmarks/suite.py --sizes 1e7 --operations addAll,contains,iterate --no-memory
+
+Each timing is the best of --repeat runs. Memory is measured in a separate run under tracemalloc,
+which is slow, so --no-memory is worth using for the largest sizes. With --compare, operations that
+became slower than --threshold times the baseline are listed and the exit status is 1. When several
+backends are given, each one's time is also shown as a ratio of the first backend's, e.g.
+
+    python benchmarks/suite.py --backends rbtree,btree --node-size 128 --no-memory
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from TreeSet import TreeSet
+
+CLUSTER = 100
+
+BACKEND_OPTIONS = {}
+
+def make_keys(distribution, size, rng):
+    """
+    Returns size distinct even ints in the insertion order of the distribution.
+    """
+    if distribution == "ascending":
+        return list(range(0, 2 * size, 2))
+    if distribution == "descending":
+        return list(range(2 * size - 2, -1, -2))
+    if distribution == "random":
+        keys = list(range(0, 2 * size, 2))
+        rng.shuffle(keys)
+        return keys
+    if distribution == "clustered":
+        clusters = -(-size // CLUSTER)
+        starts = rng.sample(range(clusters * 10), clusters)
+        keys = []
+        for start in starts:
+            base = 2 * start * CLUSTER
+            keys.extend(range(base, base + 2 * CLUSTER, 2))
+        return keys[:size]
+    raise ValueError(f"unknown distribution {distribution!r}")
+
+def make_queries(keys, count, rng):
+    """
+    Returns count query keys, half of them present in keys and half of them (odd) absent.
+    """
+    hits = [rng.choice(keys) for _ in range(count // 2)]
+    misses = [rng.choice(keys) + 1 for _ in range(count - count // 2)]
+    queries = hits + misses
+    rng.shuffle(queries)
+    return queries
+
+def new_set(backend):
+    return TreeSet(int, backend=backend, backend_options=BACKEND_OPTIONS.get(backend))
+
+def build(backend, keys):
+    tree_set = new_set(backend)
+    tree_set.addAll(keys)
+    return tree_set
+
+def prepare(operation, backend, keys, queries):
+    """
+    Builds the untimed state for one run of an operation.
+
+    Returns:
+        tuple: A zero-argument callable to time and the number of operations it performs.
+    """
+    if operation == "add":
+        tree_set = new_set(backend)
+        def run():
+            add = tree_set.add
+            for key in keys:
+                add(key)
+        return run, len(keys)
+    if operation == "addAll":
+        return lambda: build(backend, keys), len(keys)
+    tree_set = build(backend, keys)
+    if operation == "remove":
+        def run():
+            remove = tree_set.remove
+            for key in keys:
+                remove(key)
+        return run, len(keys)
+    if operation in ("contains", "floor", "ceiling", "higher", "lower"):
+        method = getattr(tree_set, operation)
+        def run():
+            for key in queries:
+                method(key)
+        return run, len(queries)
+    if operation in ("pollFirst", "pollLast"):
+        method = getattr(tree_set, operation)
+        def run():
+            for _ in range(len(keys)):
+                method()
+        return run, len(keys)
+    if operation == "iterate":
+        def run():
+            for _ in tree_set:
+                pass
+        return run, len(keys)
+    if operation == "clone":
+        return tree_set.clone, 1
+    raise ValueError(f"unknown operation {operation!r}")
+
+def measure(operation, backend, keys, queries, repeat, memory):
+    best = None
+    for _ in range(repeat):
+        run, ops = prepare(operation, backend, keys, queries)
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    peak = None
+    if memory:
+        run, ops = prepare(operation, backend, keys, queries)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {
+        "seconds": best,
+        "ops": ops,
+        "ns_per_op": best / ops * 1e9,
+        "peak_bytes": peak,
+    }
+
+def metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "commit": commit,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "backend_options": BACKEND_OPTIONS,
+    }
+
+def key(result):
+    return result["operation"], result["backend"], result["distribution"], result["size"]
+
+def compare(results, baseline_path, threshold):
+    """
+    Prints the time ratio of each result against a baseline file and returns the regressions.
+    """
+    with open(baseline_path) as file:
+        baseline = {key(result): result for result in json.load(file)["results"]}
+    regressions = []
+    print(f"\n{'operation':<10} {'backend':<10} {'distribution':<12} {'size':>10} {'ratio':>8}")
+    for result in results:
+        old = baseline.get(key(result))
+        if old is None:
+            continue
+        ratio = result["seconds"] / old["seconds"]
+        flag = "  SLOWER" if ratio > threshold else ""
+        print(f"{result['operation']:<10} {result['backend']:<10} {result['distribution']:<12} {result['size']:>10} {ratio:>8.2f}{flag}")
+        if flag:
+            regressions.append(result)
+    return regressions
+
+def compare_backends(results, backends):
+    """
+    Prints the time of each backend as a ratio of the first backend's on the same run.
+    """
+    times = {key(result): result["seconds"] for result in results}
+    print(f"\n{'operation':<10} {'distribution':<12} {'size':>10} " + " ".join(f"{backend:>10}" for backend in backends[1:])
+          + f"   (time relative to {backends[0]})")
+    for result in results:
+        if result["backend"] != backends[0]:
+            continue
+        ratios = []
+        for backend in backends[1:]:
+            other = times.get((result["operation"], backend, result["distribution"], result["size"]))
+            ratios.append("" if other is None else f"{other / result['seconds']:.2f}")
+        print(f"{result['operation']:<10} {result['distribution']:<12} {result['size']:>10} "
+              + " ".join(f"{ratio:>10}" for ratio in ratios))
+
+OPERATIONS = ["add", "addAll", "remove", "contains", "floor", "ceiling", "higher", "lower",
+              "pollFirst", "pollLast", "iterate", "clone"]
+DISTRIBUTIONS = ["ascending", "descending", "random", "clustered"]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1e3,1e4,1e5", help="comma-separated sizes, e.g. 1e3,1e4,1e7")
+    parser.add_argument("--distributions", default=",".join(DISTRIBUTIONS))
+    parser.add_argument("--operations", default=",".join(OPERATIONS))
+    parser.add_argument("--backends", default="rbtree", help=f"comma-separated, from {sorted(TreeSet._BACKENDS)}")
+    parser.add_argument("--node-size", type=int, help="keys per node of the btree backend")
+    parser.add_argument("--queries", type=int, default=100_000, help="maximum number of queries per run")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", dest="memory", action="store_false")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="a previous JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.10)
+    args = parser.parse_args()
+
+    sizes = [int(float(size)) for size in args.sizes.split(",")]
+    backends = args.backends.split(",")
+    if args.node_size is not None:
+        BACKEND_OPTIONS["btree"] = {"node_size": args.node_size}
+    results = []
+    print(f"{'operation':<10} {'backend':<10} {'distribution':<12} {'size':>10} {'ns/op':>10} {'peak MB':>9}")
+    for backend in backends:
+        for distribution in args.distributions.split(","):
+            for size in sizes:
+                rng = random.Random(args.seed)
+                keys = make_keys(distribution, size, rng)
+                queries = make_queries(keys, min(size, args.queries), rng)
+                for operation in args.operations.split(","):
+                    result = {"operation": operation, "backend": backend, "distribution": distribution, "size": size}
+                    result.update(measure(operation, backend, keys, queries, args.repeat, args.memory))
+                    results.append(result)
+                    peak = "" if result["peak_bytes"] is None else f"{result['peak_bytes'] / 2**20:.2f}"
+                    print(f"{operation:<10} {backend:<10} {distribution:<12} {size:>10} {result['ns_per_op']:>10.0f} {peak:>9}")
+
+    if len(backends) > 1:
+        compare_backends(results, backends)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"meta": metadata(), "results": results}, file, indent=1)
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()